@@ -44,12 +44,17 @@ String current_course = "";
 String current_lecturer = "";
 String current_session_id = "";
 
+// Configuration version held by this device (server replies "unchanged"/304 until it moves)
+long config_version = 0;
+String config_etag = "";
+
 // Attendance tracking
 struct AttendanceRecord {
   String matric_number;
   String student_name;
   String timestamp;
   String device_mac;
+  String idempotency_key;  // sent with every retry so the server applies it once
 };
 
 std::vector<AttendanceRecord> attendance_log;
@@ -418,6 +423,7 @@ void handleSubmitAttendance() {
   record.student_name = student_name;
   record.timestamp = getCurrentTimestamp();
   record.device_mac = WiFi.macAddress();
+  record.idempotency_key = device_id + "-" + String(esp_random(), HEX) + String(millis(), HEX);
   
   attendance_log.push_back(record);
   
@@ -502,17 +508,26 @@ void sendHeartbeat() {
   http.begin(SERVER_URL + "/admin-panel/api/esp32/heartbeat/");
   http.addHeader("Content-Type", "application/json");
   http.addHeader("X-API-Key", API_KEY);
+  if (config_etag.length() > 0) {
+    http.addHeader("If-None-Match", config_etag);
+  }
+  const char* responseHeaders[] = {"ETag"};
+  http.collectHeaders(responseHeaders, 1);
   
   DynamicJsonDocument doc(256);
   doc["device_id"] = device_id;
   doc["timestamp"] = getCurrentTimestamp();
+  doc["config_version"] = config_version;
   
   String jsonString;
   serializeJson(doc, jsonString);
   
   int httpResponseCode = http.POST(jsonString);
   
-  if (httpResponseCode > 0) {
+  if (httpResponseCode == 304) {
+    // Configuration unchanged - nothing to parse
+    Serial.println("Heartbeat sent successfully (config unchanged)");
+  } else if (httpResponseCode > 0) {
     String response = http.getString();
     Serial.println("Heartbeat sent successfully");
     
@@ -524,6 +539,8 @@ void sendHeartbeat() {
       // Check if we received configuration data
       if (responseDoc.containsKey("configuration")) {
         JsonObject config = responseDoc["configuration"];
+        config_version = responseDoc["config_version"] | 0L;
+        config_etag = http.header("ETag");
         
         if (config["active_session"] == true) {
           // Apply active session configuration
@@ -644,6 +661,7 @@ bool sendAttendanceToServer(AttendanceRecord& record) {
   http.begin(SERVER_URL + "/admin-panel/api/attendance/submit/");
   http.addHeader("Content-Type", "application/json");
   http.addHeader("X-API-Key", API_KEY);
+  http.addHeader("Idempotency-Key", record.idempotency_key);
   
   DynamicJsonDocument doc(512);
   doc["session_id"] = current_session_id;
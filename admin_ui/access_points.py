@@ -0,0 +1,256 @@
+"""
+📶 Access point pools for large lecture halls
+
+An ESP32 soft-AP only takes a handful of stations at once, so one gateway per
+session makes a large class queue outside a single access point. A network
+session can therefore span a pool of devices: the device it was started on
+(``NetworkSession.esp32_device``) plus any number of SessionAccessPoint rows.
+
+- Every device in the pool resolves to the same session (see
+  admin_ui/session_registry.py), so marks from any of them land in the same
+  attendance session. Rate limits are per device, so each extra gateway adds
+  its own share of throughput.
+- Gateways report how many stations they hold (``station_count`` in the
+  heartbeat, or the size of a presence report). ``GET api/esp32/pool/`` lists the
+  pool with those loads and recommends the least loaded access point that has
+  room, so a full gateway's captive portal can send students to another SSID.
+- Presence checks look at the whole pool: a student connected to any of its
+  access points is present.
+- A student has one record per attendance session, enforced by a unique
+  constraint. A short cache lock per (session, student) turns most concurrent
+  marks from two access points away before they reach the database.
+
+Configured through ``settings.ACCESS_POINT_POOL``:
+
+    ACCESS_POINT_POOL = {
+        'CAPACITY': 8,            # stations one access point is expected to hold
+        'MAX_SIZE': 4,            # access points a session may start with
+        'LOAD_TTL': 120,          # seconds a reported station count stays valid
+        'MARK_LOCK_TIMEOUT': 10,
+    }
+"""
+import math
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Q
+
+from .heartbeats import update_device_fields
+from .models import ESP32Device, NetworkSession, SessionAccessPoint
+from .session_registry import invalidate_active_session, registry_cache
+
+DEFAULTS = {
+    'CAPACITY': 8,
+    'MAX_SIZE': 4,
+    'LOAD_TTL': 120,
+    'MARK_LOCK_TIMEOUT': 10,
+}
+
+KEY_PREFIX = 'esp32_pool'
+
+
+def pool_setting(name):
+    return getattr(settings, 'ACCESS_POINT_POOL', {}).get(name, DEFAULTS[name])
+
+
+def _load_key(device_id):
+    return f'{KEY_PREFIX}:load:{device_id}'
+
+
+# 📊 Station load
+
+def record_station_count(device_id, count):
+    """Remember how many stations a device reported; ignored unless it is a non-negative integer"""
+    if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+        return
+    registry_cache().set(_load_key(device_id), count, pool_setting('LOAD_TTL'))
+
+
+async def arecord_station_count(device_id, count):
+    """Async version of record_station_count()"""
+    if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+        return
+    await registry_cache().aset(_load_key(device_id), count, pool_setting('LOAD_TTL'))
+
+
+def station_counts(device_ids):
+    """{device_id: stations last reported} for devices with a recent report"""
+    counts = registry_cache().get_many([_load_key(device_id) for device_id in device_ids])
+    return {device_id: counts[_load_key(device_id)] for device_id in device_ids if _load_key(device_id) in counts}
+
+
+def pool_status(active_session):
+    """The access points of a session with their load, and the one new students should join"""
+    pool = active_session.get('pool') or [active_session['device_id']]
+    devices = {
+        device['device_id']: device
+        for device in ESP32Device.objects.filter(device_id__in=pool).values('device_id', 'device_name', 'ssid')
+    }
+    counts = station_counts(pool)
+    capacity = pool_setting('CAPACITY')
+
+    access_points = []
+    for device_id in pool:
+        device = devices.get(device_id, {})
+        access_points.append({
+            'device_id': device_id,
+            'device_name': device.get('device_name'),
+            'ssid': device.get('ssid'),
+            'primary': device_id == active_session.get('primary_device_id', pool[0]),
+            'stations': counts.get(device_id),
+            'capacity': capacity,
+        })
+
+    # Devices that have not reported yet count as empty
+    with_room = [ap for ap in access_points if (ap['stations'] or 0) < capacity]
+    recommended = min(with_room, key=lambda ap: ap['stations'] or 0) if with_room else None
+    return {
+        'session_id': active_session['id'],
+        'access_points': access_points,
+        'recommended': recommended,
+        'total_stations': sum(ap['stations'] or 0 for ap in access_points),
+        'total_capacity': capacity * len(access_points),
+    }
+
+
+def session_pool_status(network_session):
+    """pool_status() for a NetworkSession instance, active or not"""
+    primary = network_session.esp32_device.device_id
+    return pool_status({
+        'id': network_session.id,
+        'device_id': primary,
+        'primary_device_id': primary,
+        'pool': [primary] + list(network_session.access_points.values_list('esp32_device__device_id', flat=True)),
+    })
+
+
+# 🏗️ Building a pool
+
+def pool_size_for(enrolled_count):
+    """Access points a class of this size needs, within MAX_SIZE"""
+    return max(1, min(pool_setting('MAX_SIZE'), math.ceil(enrolled_count / pool_setting('CAPACITY'))))
+
+
+def busy_device_ids():
+    """Devices already serving an active session, as primary or pool member"""
+    return set(NetworkSession.objects.filter(is_active=True).values_list('esp32_device_id', flat=True)) | set(
+        SessionAccessPoint.objects.filter(network_session__is_active=True).values_list('esp32_device_id', flat=True)
+    )
+
+
+def pool_ssid(base_ssid, number):
+    """SSID of the n-th access point of a session (the first keeps the base SSID)"""
+    if number <= 1:
+        return base_ssid
+    suffix = f'_{number}'
+    return base_ssid[:32 - len(suffix)] + suffix
+
+
+def add_access_points(network_session, devices, **fields):
+    """
+    Add devices to a session's pool; returns the SessionAccessPoint rows created.
+    `fields` are applied to each device (an 'ssid' gets a per-access-point suffix).
+    """
+    number = network_session.access_points.count() + 1
+    access_points = []
+    for device in devices:
+        number += 1
+        if fields:
+            device_fields = dict(fields)
+            if 'ssid' in device_fields:
+                device_fields['ssid'] = pool_ssid(device_fields['ssid'], number)
+            update_device_fields(device, **device_fields)
+        access_points.append(SessionAccessPoint.objects.create(network_session=network_session, esp32_device=device))
+    return access_points
+
+
+def session_device_ids(network_sessions):
+    """device_id of every device serving the given sessions (a queryset or list of NetworkSession)"""
+    return set(ESP32Device.objects.filter(
+        Q(networksession__in=network_sessions) | Q(session_access_points__network_session__in=network_sessions)
+    ).values_list('device_id', flat=True))
+
+
+def invalidate_session_pools(network_sessions):
+    """Drop cached snapshots for every device of the given sessions (call after a bulk update() ends them)"""
+    invalidate_active_session(*session_device_ids(network_sessions))
+
+
+# 🛰️ Presence across the pool
+
+def pool_device_ids(active_session, device_id):
+    """Devices whose presence counts for `device_id`: its session's pool, or just itself"""
+    return (active_session or {}).get('pool') or [device_id]
+
+
+def _merge_snapshots(snapshots):
+    if not snapshots:
+        return None
+    return {
+        'timestamp': max(snapshot.get('timestamp') or '' for snapshot in snapshots.values()) or None,
+        'device_count': sum(snapshot.get('device_count', 0) for snapshot in snapshots.values()),
+        'access_points': {device_id: snapshot.get('device_count', 0) for device_id, snapshot in snapshots.items()},
+    }
+
+
+def pool_presence_snapshot(presence_store, device_ids):
+    """Presence summed over a pool, or None when no access point has live data"""
+    return _merge_snapshots(presence_store.get_snapshots(device_ids, include_members=False))
+
+
+async def apool_presence_snapshot(presence_store, device_ids):
+    """Async version of pool_presence_snapshot()"""
+    snapshots = {}
+    for device_id in device_ids:
+        snapshot = await presence_store.aget_snapshot(device_id, include_members=False)
+        if snapshot:
+            snapshots[device_id] = snapshot
+    return _merge_snapshots(snapshots)
+
+
+def pool_present_members(presence_store, device_ids, mac_addresses):
+    """Subset of mac_addresses connected to any access point of the pool"""
+    present = set()
+    remaining = list(mac_addresses)
+    for device_id in device_ids:
+        if not remaining:
+            break
+        found = presence_store.present_members(device_id, remaining)
+        present.update(found)
+        remaining = [mac_address for mac_address in remaining if mac_address not in found]
+    return present
+
+
+async def apool_present_members(presence_store, device_ids, mac_addresses):
+    """Async version of pool_present_members()"""
+    present = set()
+    remaining = list(mac_addresses)
+    for device_id in device_ids:
+        if not remaining:
+            break
+        found = await presence_store.apresent_members(device_id, remaining)
+        present.update(found)
+        remaining = [mac_address for mac_address in remaining if mac_address not in found]
+    return present
+
+
+# 🔒 One mark at a time per student
+
+@contextmanager
+def mark_lock(session_id, student_id):
+    """
+    Yields True for the one request allowed to record this student in this network
+    session right now; False means another access point is recording them.
+
+    Only a fast path: the lock lives in the registry cache, which may be per
+    process. The unique (attendance session, student) constraint on
+    AttendanceRecord is what keeps a student to one record.
+    """
+    cache = registry_cache()
+    key = f'{KEY_PREFIX}:mark:{session_id}:{student_id}'
+    acquired = cache.add(key, 1, timeout=pool_setting('MARK_LOCK_TIMEOUT'))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(key)
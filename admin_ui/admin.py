@@ -2,8 +2,12 @@ from django.contrib import admin
 from .models import (
     Course, AssignedCourse, Student, FingerprintStudent, 
     CourseEnrollment, AttendanceSession, AttendanceRecord,
-    ESP32Device, NetworkSession, ConnectedDevice
+    ESP32Device, NetworkSession, ConnectedDevice, PresenceSnapshot, AttendanceSessionSummary,
+    CourseAttendanceSummary, StudentCourseAttendanceSummary, DeviceCommand, DeviceCredential,
+    DeviceSyncStream, RosterChange, SessionAccessPoint, PresenceTimeline
 )
+from .device_commands import queue_command
+from .presence_history import decode_intervals
 
 # Course Management
 @admin.register(Course)
@@ -55,6 +59,7 @@ class ESP32DeviceAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'created_at']
     search_fields = ['device_id', 'device_name', 'ssid', 'location']
     readonly_fields = ['last_seen', 'last_heartbeat']
+    actions = ['flush_buffer', 'issue_credentials']
     
     fieldsets = (
         ('Basic Information', {
@@ -69,6 +74,59 @@ class ESP32DeviceAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.action(description='Ask selected devices to upload their buffered events')
+    def flush_buffer(self, request, queryset):
+        for device in queryset:
+            queue_command(device, 'flush_buffer')
+        self.message_user(request, f'flush_buffer queued for {queryset.count()} device(s).')
+
+    @admin.action(description='Issue signing credentials to selected devices that have none')
+    def issue_credentials(self, request, queryset):
+        issued = 0
+        for device in queryset.filter(credential__isnull=True):
+            DeviceCredential.objects.create(esp32_device=device)
+            issued += 1
+        self.message_user(request, f'Issued credentials to {issued} device(s).')
+
+@admin.register(DeviceCredential)
+class DeviceCredentialAdmin(admin.ModelAdmin):
+    list_display = ['esp32_device', 'is_active', 'created_at', 'rotated_at']
+    list_filter = ['is_active']
+    search_fields = ['esp32_device__device_id']
+    readonly_fields = ['created_at', 'rotated_at']
+    actions = ['rotate_secret']
+
+    @admin.action(description='Rotate secrets (devices must be re-provisioned)')
+    def rotate_secret(self, request, queryset):
+        for credential in queryset:
+            credential.rotate()
+        self.message_user(request, f'Rotated {queryset.count()} credential(s).')
+
+@admin.register(DeviceCommand)
+class DeviceCommandAdmin(admin.ModelAdmin):
+    list_display = ['esp32_device', 'command', 'created_at', 'delivered_at', 'expires_at']
+    list_filter = ['command', 'created_at']
+    search_fields = ['esp32_device__device_id']
+    readonly_fields = ['created_at', 'delivered_at']
+
+@admin.register(DeviceSyncStream)
+class DeviceSyncStreamAdmin(admin.ModelAdmin):
+    list_display = ['esp32_device', 'stream', 'last_sequence', 'updated_at']
+    search_fields = ['esp32_device__device_id', 'stream']
+    readonly_fields = ['updated_at']
+
+@admin.register(RosterChange)
+class RosterChangeAdmin(admin.ModelAdmin):
+    list_display = ['id', 'course', 'session', 'semester', 'matric_no', 'action', 'created_at']
+    list_filter = ['action', 'session', 'semester']
+    search_fields = ['course__code', 'matric_no']
+    readonly_fields = ['created_at']
+
+class SessionAccessPointInline(admin.TabularInline):
+    model = SessionAccessPoint
+    extra = 0
+    readonly_fields = ['added_at']
+
 @admin.register(NetworkSession)
 class NetworkSessionAdmin(admin.ModelAdmin):
     list_display = ['course', 'lecturer', 'esp32_device', 'session', 'semester', 'date', 'is_active']
@@ -86,9 +144,45 @@ class NetworkSessionAdmin(admin.ModelAdmin):
             'fields': ('start_time', 'end_time', 'is_active')
         }),
     )
+    # Extra access points for large classes
+    inlines = [SessionAccessPointInline]
 
 @admin.register(ConnectedDevice)
 class ConnectedDeviceAdmin(admin.ModelAdmin):
     list_display = ['network_session', 'mac_address', 'device_name', 'ip_address', 'is_connected', 'connected_at']
     list_filter = ['is_connected', 'connected_at']
     search_fields = ['mac_address', 'device_name', 'network_session__course__code']
+
+@admin.register(PresenceSnapshot)
+class PresenceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['device_id', 'device_count', 'last_sequence', 'updated_at', 'checkpoint_at', 'expires_at']
+    search_fields = ['device_id']
+    readonly_fields = ['device_id', 'device_count', 'updated_at', 'expires_at']
+
+@admin.register(PresenceTimeline)
+class PresenceTimelineAdmin(admin.ModelAdmin):
+    list_display = ['network_session', 'mac_hash', 'seconds_present', 'open_since', 'updated_at']
+    search_fields = ['mac_hash', 'network_session__course__code']
+    exclude = ['intervals']
+    readonly_fields = ['network_session', 'mac_hash', 'interval_list', 'open_since', 'seconds_present', 'updated_at']
+
+    @admin.display(description='Intervals (seconds from session start)')
+    def interval_list(self, obj):
+        return ', '.join(f'{start}-{end}' for start, end in decode_intervals(obj.intervals)) or '-'
+
+@admin.register(AttendanceSessionSummary)
+class AttendanceSessionSummaryAdmin(admin.ModelAdmin):
+    list_display = ['attendance_session', 'total_count', 'present_count', 'absent_count', 'updated_at']
+    readonly_fields = ['attendance_session', 'total_count', 'present_count', 'absent_count', 'updated_at']
+
+@admin.register(CourseAttendanceSummary)
+class CourseAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['course', 'session', 'semester', 'enrolled_count', 'session_count', 'present_count', 'absent_count']
+    list_filter = ['session', 'semester']
+    search_fields = ['course__code']
+
+@admin.register(StudentCourseAttendanceSummary)
+class StudentCourseAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'course', 'session', 'semester', 'present_count', 'absent_count', 'total_count']
+    list_filter = ['session', 'semester']
+    search_fields = ['student__matric_no', 'course__code']
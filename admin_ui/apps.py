@@ -1,6 +1,23 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
 class AdminUiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_ui'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+
+        if self._serving():
+            from .attendance_spool import recover_attendance_spool
+            recover_attendance_spool()
+
+    @staticmethod
+    def _serving():
+        """True in a web server process, False for other management commands and runserver's reloader"""
+        if os.path.basename(sys.argv[0]) not in ('manage.py', 'django-admin', '__main__.py'):
+            return True  # gunicorn, uvicorn, daphne, ...
+        return sys.argv[1:2] == ['runserver'] and os.environ.get('RUN_MAIN') == 'true'
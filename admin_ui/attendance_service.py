@@ -0,0 +1,232 @@
+"""
+📋 Roster attendance engine
+
+Loads a course roster together with its existing attendance records and the
+network state in a constant number of queries, and writes a whole class's
+attendance with bulk_create/bulk_update instead of one get_or_create + save
+per student.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+
+from .attendance_stats import apply_record_changes
+from .models import (
+    Student, CourseEnrollment, AttendanceRecord, AttendanceSession, NetworkSession, ConnectedDevice
+)
+
+ATTENDANCE_STATUSES = ('present', 'absent')
+
+
+def retry_on_record_conflict(write):
+    """
+    Run a bulk attendance write once more when another writer recorded one of its
+    students between the read and the insert; the second run sees that record.
+    """
+    @wraps(write)
+    def wrapper(*args, **kwargs):
+        try:
+            return write(*args, **kwargs)
+        except IntegrityError:
+            return write(*args, **kwargs)
+    return wrapper
+
+
+def create_record(**fields):
+    """
+    Create one AttendanceRecord; None when the student already has a record in
+    that attendance session (one written since the caller's check wins).
+    """
+    try:
+        with transaction.atomic():
+            return AttendanceRecord.objects.create(**fields)
+    except IntegrityError:
+        return None
+
+
+async def acreate_record(**fields):
+    """Async version of create_record()"""
+    return await sync_to_async(create_record)(**fields)
+
+
+def get_or_create_attendance_session(defaults=None, **lookup):
+    """
+    AttendanceSession.objects.get_or_create() that tolerates duplicates: nothing
+    keeps two concurrent first marks from both creating the day's session, and the
+    oldest one wins instead of get() raising MultipleObjectsReturned.
+    """
+    attendance_session = AttendanceSession.objects.filter(**lookup).order_by('id').first()
+    if attendance_session is not None:
+        return attendance_session, False
+    return AttendanceSession.objects.create(**lookup, **(defaults or {})), True
+
+
+async def aget_or_create_attendance_session(defaults=None, **lookup):
+    """Async version of get_or_create_attendance_session()"""
+    return await sync_to_async(get_or_create_attendance_session)(defaults, **lookup)
+
+
+def enrolled_students(course, session, semester):
+    """Students enrolled in a course for a session/semester, ordered by name"""
+    return Student.objects.filter(
+        courseenrollment__course=course,
+        courseenrollment__session=session,
+        courseenrollment__semester=semester
+    ).distinct().order_by('name')
+
+
+def get_network_state(course, date):
+    """
+    Return (network_verified, esp32_device) for a course on a date.
+
+    Same rule as verify_network_attendance: a student counts as verified when the
+    course has an active network session that day with at least one connected device.
+    The answer does not depend on the student, so it is computed once per roster.
+    """
+    network_session = NetworkSession.objects.filter(
+        course=course,
+        date=date,
+        is_active=True
+    ).select_related('esp32_device').first()
+
+    if not network_session:
+        return False, None
+
+    connected = ConnectedDevice.objects.filter(
+        network_session=network_session,
+        is_connected=True
+    ).exists()
+    return connected, network_session.esp32_device
+
+
+def existing_records(attendance_session):
+    """Return {matric_no: [AttendanceRecord, ...]} for an attendance session"""
+    records = {}
+    for record in AttendanceRecord.objects.filter(attendance_session=attendance_session):
+        records.setdefault(record.student_id, []).append(record)
+    return records
+
+
+@retry_on_record_conflict
+def save_roster_attendance(attendance_session, students, statuses, marked_by, network_state=(False, None)):
+    """
+    Create or update one attendance record per student.
+
+    statuses maps matric_no to 'present'/'absent'; students missing from it are
+    marked absent. Present students get the network verification from
+    network_state, absent students keep whatever verification they already had.
+    Returns {'created': n, 'updated': n}.
+    """
+    network_verified, esp32_device = network_state
+
+    with transaction.atomic():
+        records = existing_records(attendance_session)
+        to_create, to_update, changes = [], [], []
+
+        for student in students:
+            status = statuses.get(student.matric_no, 'absent')
+            student_records = records.get(student.matric_no)
+
+            if not student_records:
+                record = AttendanceRecord(
+                    attendance_session=attendance_session,
+                    student=student,
+                    status=status,
+                    marked_by=marked_by
+                )
+                if status == 'present':
+                    record.network_verified = network_verified
+                    record.esp32_device = esp32_device
+                to_create.append(record)
+                changes.append((attendance_session.id, student.matric_no, None, status))
+                continue
+
+            for record in student_records:
+                changes.append((attendance_session.id, student.matric_no, record.status, status))
+                record.status = status
+                record.marked_by = marked_by
+                if status == 'present':
+                    record.network_verified = network_verified
+                    record.esp32_device = esp32_device
+                to_update.append(record)
+
+        if to_create:
+            AttendanceRecord.objects.bulk_create(to_create)
+        if to_update:
+            AttendanceRecord.objects.bulk_update(
+                to_update,
+                ['status', 'marked_by', 'network_verified', 'esp32_device']
+            )
+        apply_record_changes(changes)
+
+    return {'created': len(to_create), 'updated': len(to_update)}
+
+
+@retry_on_record_conflict
+def bulk_mark_attendance(attendance_session, submitted, marked_by):
+    """
+    Upsert attendance for the students submitted on a marking form.
+
+    submitted maps matric_no to a status. Matric numbers are validated against the
+    session's enrolment in one query; unknown students and invalid statuses are
+    rejected rather than written. Records whose status already matches are left
+    untouched. Returns a diff:
+
+        {'created': [matric_no, ...],
+         'updated': [{'matric_no', 'from', 'to'}, ...],
+         'unchanged': [matric_no, ...],
+         'rejected': [{'matric_no', 'reason'}, ...]}
+    """
+    diff = {'created': [], 'updated': [], 'unchanged': [], 'rejected': []}
+
+    enrolled = set(CourseEnrollment.objects.filter(
+        student_id__in=list(submitted),
+        course=attendance_session.course,
+        session=attendance_session.session,
+        semester=attendance_session.semester
+    ).values_list('student_id', flat=True))
+
+    with transaction.atomic():
+        records = existing_records(attendance_session)
+        to_create, to_update, changes = [], [], []
+
+        for matric_no, status in submitted.items():
+            if matric_no not in enrolled:
+                diff['rejected'].append({'matric_no': matric_no, 'reason': 'Student not enrolled in this course'})
+                continue
+            if status not in ATTENDANCE_STATUSES:
+                diff['rejected'].append({'matric_no': matric_no, 'reason': f'Invalid status: {status}'})
+                continue
+
+            student_records = records.get(matric_no)
+            if not student_records:
+                to_create.append(AttendanceRecord(
+                    attendance_session=attendance_session,
+                    student_id=matric_no,
+                    status=status,
+                    network_verified=False,
+                    marked_by=marked_by
+                ))
+                diff['created'].append(matric_no)
+                changes.append((attendance_session.id, matric_no, None, status))
+                continue
+
+            changed = [record for record in student_records if record.status != status]
+            if not changed:
+                diff['unchanged'].append(matric_no)
+                continue
+            diff['updated'].append({'matric_no': matric_no, 'from': changed[0].status, 'to': status})
+            for record in changed:
+                changes.append((attendance_session.id, matric_no, record.status, status))
+                record.status = status
+                record.marked_by = marked_by
+                to_update.append(record)
+
+        if to_create:
+            AttendanceRecord.objects.bulk_create(to_create)
+        if to_update:
+            AttendanceRecord.objects.bulk_update(to_update, ['status', 'marked_by'])
+        apply_record_changes(changes)
+
+    return diff
@@ -0,0 +1,432 @@
+"""
+📥 Write-behind spool for device attendance marks
+
+A student's captive-portal request stays open while the ESP32 waits for the
+attendance API. With the spool enabled, the device endpoints only validate a
+mark (cached session context plus a couple of reads), append it to a local
+durable spool and answer straight away. An applier drains the spool into
+AttendanceSession/AttendanceRecord in batches.
+
+The spool is a SQLite file in WAL mode with ``synchronous=FULL``. A mark is on
+disk before the device hears "success", and survives a crash of the web
+process. Each mark carries a key (course, lecturer, term, date, student)
+identifying the AttendanceRecord it produces:
+
+* While a mark is pending, a second mark with the same key is folded into it
+  instead of queued twice.
+* The applier skips students who already have a record in the attendance
+  session. A batch that was written to the database but not yet marked
+  applied in the spool (crash in between) is therefore a no-op when it is
+  retried.
+
+So every (attendance session, student) pair is written exactly once.
+
+Only one applier drains a spool at a time; it holds a lease row that expires
+if the process dies. The applier runs as a daemon thread in the web process
+(``APPLIER = 'thread'``) or as ``manage.py apply_attendance_spool`` on the same
+host (``APPLIER = 'command'``). The thread starts with the first mark, or at
+process start when marks from before a crash or restart are still pending.
+
+Configured through ``settings.ATTENDANCE_SPOOL``:
+
+    ATTENDANCE_SPOOL = {
+        'ENABLED': False,
+        'PATH': BASE_DIR / 'attendance_spool.sqlite3',
+        'BATCH_SIZE': 200,
+        'INTERVAL': 1,          # seconds between applier passes when idle
+        'APPLIER': 'thread',    # or 'command'
+        'RETENTION': 86400,     # seconds applied marks are kept for inspection
+    }
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .attendance_service import retry_on_record_conflict
+from .attendance_stats import apply_record_changes
+from .models import AttendanceRecord, AttendanceSession, Course, Student
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'PATH': 'attendance_spool.sqlite3',
+    'BATCH_SIZE': 200,
+    'INTERVAL': 1,
+    'APPLIER': 'thread',
+    'RETENTION': 86400,
+}
+
+# An applier that stops renewing its lease for this long is presumed dead
+LEASE_SECONDS = 30
+
+SESSION_FIELDS = ('course_id', 'lecturer_id', 'session', 'semester', 'date')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS marks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mark_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    applied_at REAL,
+    error TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS marks_pending_key ON marks (mark_key) WHERE applied_at IS NULL;
+CREATE INDEX IF NOT EXISTS marks_applied_at ON marks (applied_at);
+CREATE TABLE IF NOT EXISTS lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def spool_setting(name):
+    return getattr(settings, 'ATTENDANCE_SPOOL', {}).get(name, DEFAULTS[name])
+
+
+def spool_enabled():
+    return bool(spool_setting('ENABLED'))
+
+
+def mark_key(mark):
+    return ':'.join(str(mark[field]) for field in SESSION_FIELDS + ('student_id',))
+
+
+class AttendanceSpool:
+    """Append-only SQLite journal of attendance marks waiting to be applied"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit; every write below is one statement or an explicit transaction
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=FULL')
+            self._local.connection = connection
+        with self._ready_lock:
+            if not self._ready:
+                connection.executescript(SCHEMA)
+                self._ready = True
+        return connection
+
+    def append(self, mark, update_pending=False):
+        """
+        Durably queue a mark. A pending mark with the same key is kept (returns False),
+        or replaced by this one when update_pending is True (returns True).
+        """
+        payload = json.dumps(mark, default=str)
+        conflict = (
+            'DO UPDATE SET payload = excluded.payload, revision = revision + 1' if update_pending else 'DO NOTHING'
+        )
+        cursor = self._connection().execute(
+            'INSERT INTO marks (mark_key, payload, created_at) VALUES (?, ?, ?) '
+            f'ON CONFLICT (mark_key) WHERE applied_at IS NULL {conflict}',
+            (mark_key(mark), payload, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def is_pending(self, mark):
+        return self._connection().execute(
+            'SELECT 1 FROM marks WHERE mark_key = ? AND applied_at IS NULL', (mark_key(mark),)
+        ).fetchone() is not None
+
+    def pending(self, limit):
+        """Oldest marks not applied yet as (id, revision, mark); failed marks are left for inspection"""
+        rows = self._connection().execute(
+            'SELECT id, revision, payload FROM marks WHERE applied_at IS NULL AND error IS NULL ORDER BY id LIMIT ?',
+            (limit,)
+        ).fetchall()
+        return [(row_id, revision, json.loads(payload)) for row_id, revision, payload in rows]
+
+    def mark_applied(self, revisions):
+        """
+        Mark {id: revision} applied. A mark replaced while it was being applied keeps
+        its new revision pending and is applied again on the next pass.
+        """
+        applied_at = time.time()
+        self._connection().executemany(
+            'UPDATE marks SET applied_at = ? WHERE id = ? AND revision = ?',
+            [(applied_at, row_id, revision) for row_id, revision in revisions.items()]
+        )
+
+    def mark_failed(self, failures):
+        """Set aside marks that can never be applied: {id: reason}"""
+        if failures:
+            self._connection().executemany(
+                'UPDATE marks SET error = ? WHERE id = ?',
+                [(reason, row_id) for row_id, reason in failures.items()]
+            )
+
+    def purge(self, older_than):
+        """Delete marks applied more than `older_than` seconds ago; returns how many"""
+        return self._connection().execute(
+            'DELETE FROM marks WHERE applied_at < ?', (time.time() - older_than,)
+        ).rowcount
+
+    def acquire_lease(self, owner, seconds=LEASE_SECONDS):
+        """Take or renew the applier lease; returns True when `owner` holds it"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            'INSERT INTO lease (id, owner, expires_at) VALUES (1, ?, ?) '
+            'ON CONFLICT (id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE lease.owner = excluded.owner OR lease.expires_at < ?',
+            (owner, now + seconds, now)
+        )
+        row = connection.execute('SELECT owner FROM lease WHERE id = 1').fetchone()
+        return row is not None and row[0] == owner
+
+    def release_lease(self, owner):
+        self._connection().execute('DELETE FROM lease WHERE id = 1 AND owner = ?', (owner,))
+
+    def stats(self):
+        """Queue depth and lag of the spool"""
+        depth, oldest, failed = self._connection().execute(
+            'SELECT '
+            'COUNT(CASE WHEN error IS NULL THEN 1 END), '
+            'MIN(CASE WHEN error IS NULL THEN created_at END), '
+            'COUNT(error) '
+            'FROM marks WHERE applied_at IS NULL'
+        ).fetchone()
+        return {
+            'depth': depth,
+            'lag_seconds': round(time.time() - oldest, 3) if oldest else 0.0,
+            'failed': failed,
+        }
+
+
+_spool = None
+_spool_pid = None
+_spool_lock = threading.Lock()
+
+
+def spool_path():
+    path = spool_setting('PATH')
+    return path if os.path.isabs(path) else os.path.join(settings.BASE_DIR, path)
+
+
+def get_attendance_spool():
+    """Return the configured spool (created once per process, starts the applier thread if configured)"""
+    global _spool, _spool_pid
+    with _spool_lock:
+        # A forked worker (gunicorn --preload) inherits the spool but not the applier thread
+        if _spool is None or _spool_pid != os.getpid():
+            _spool = AttendanceSpool(spool_path())
+            _spool_pid = os.getpid()
+            if spool_setting('APPLIER') == 'thread':
+                SpoolApplier(_spool).start_thread()
+        return _spool
+
+
+def recover_attendance_spool():
+    """
+    Start the applier thread at process start when marks from before a crash or
+    restart are still pending, instead of waiting for the next device mark.
+    Returns True if it was started.
+    """
+    if not spool_enabled() or spool_setting('APPLIER') != 'thread' or not os.path.exists(spool_path()):
+        return False
+    if not AttendanceSpool(spool_path()).stats()['depth']:
+        return False
+    get_attendance_spool()
+    return True
+
+
+def spool_mark(student_id, course_id, lecturer_id, session, semester, day=None, esp32_device_id=None,
+               device_mac=None, update_existing=False, network_verified=True, check_recorded=True):
+    """
+    Queue a validated 'present' mark. Returns False if the student is already
+    marked (or queued) in that attendance session, unless update_existing is set,
+    in which case the newest mark overwrites the record like a sync re-mark would.
+    check_recorded=False skips the database check for an existing record and
+    leaves it to the applier, which skips students already recorded.
+    """
+    mark = {
+        'student_id': student_id,
+        'course_id': course_id,
+        'lecturer_id': lecturer_id,
+        'session': session,
+        'semester': semester,
+        'date': (day or timezone.now().date()).isoformat(),
+        'esp32_device_id': esp32_device_id,
+        'device_mac': device_mac,
+        'update_existing': update_existing,
+        'network_verified': network_verified,
+        'marked_at': timezone.now().isoformat(),
+    }
+    spool = get_attendance_spool()
+    if update_existing:
+        return spool.append(mark, update_pending=True)
+    if check_recorded and _recorded(mark):
+        return False
+    return spool.append(mark)
+
+
+def _recorded(mark):
+    return AttendanceRecord.objects.filter(
+        student_id=mark['student_id'],
+        attendance_session__course_id=mark['course_id'],
+        attendance_session__lecturer_id=mark['lecturer_id'],
+        attendance_session__session=mark['session'],
+        attendance_session__semester=mark['semester'],
+        attendance_session__date=mark['date'],
+    ).exists()
+
+
+# ⚙️ Applying marks
+
+def _session_key(mark):
+    return (mark['course_id'], mark['lecturer_id'], mark['session'], mark['semester'], date.fromisoformat(mark['date']))
+
+
+def _attendance_sessions(keys):
+    """Return {session key: AttendanceSession id}, creating the sessions that do not exist yet"""
+    condition = Q()
+    for key in keys:
+        condition |= Q(**dict(zip(SESSION_FIELDS, key)))
+    sessions = {}
+    for row in AttendanceSession.objects.filter(condition).order_by('id').values('id', *SESSION_FIELDS):
+        sessions.setdefault(tuple(row[field] for field in SESSION_FIELDS), row['id'])
+    for key in keys - set(sessions):
+        # create() so the term's session count is kept by the signal handlers
+        sessions[key] = AttendanceSession.objects.create(**dict(zip(SESSION_FIELDS, key))).id
+    return sessions
+
+
+@retry_on_record_conflict
+def apply_marks(rows):
+    """
+    Write spooled marks to the database in one transaction.
+
+    rows is a list of (spool id, mark). Returns (applied ids, {id: reason} for
+    marks that can never be applied, e.g. because the student was deleted).
+    """
+    failures = {}
+    valid = []
+    students = set(Student.objects.filter(
+        matric_no__in={mark['student_id'] for _, mark in rows}
+    ).values_list('matric_no', flat=True))
+    courses = set(Course.objects.filter(
+        id__in={mark['course_id'] for _, mark in rows}
+    ).values_list('id', flat=True))
+    for row_id, mark in rows:
+        if mark['student_id'] not in students:
+            failures[row_id] = f"Student {mark['student_id']} not found"
+        elif mark['course_id'] not in courses:
+            failures[row_id] = f"Course {mark['course_id']} not found"
+        else:
+            valid.append((row_id, mark))
+    if not valid:
+        return [], failures
+
+    with transaction.atomic():
+        sessions = _attendance_sessions({_session_key(mark) for _, mark in valid})
+
+        # Latest mark per (attendance session, student); the spool is in arrival order
+        latest = {}
+        for _, mark in valid:
+            latest[(sessions[_session_key(mark)], mark['student_id'])] = mark
+
+        existing = {}
+        for record in AttendanceRecord.objects.filter(
+            attendance_session_id__in=set(sessions.values()),
+            student_id__in={student_id for _, student_id in latest}
+        ).order_by('id'):
+            existing.setdefault((record.attendance_session_id, record.student_id), record)
+
+        new_records, updated_records, changes = [], [], []
+        for (session_id, student_id), mark in latest.items():
+            record = existing.get((session_id, student_id))
+            if record is None:
+                new_records.append(AttendanceRecord(
+                    attendance_session_id=session_id,
+                    student_id=student_id,
+                    status='present',
+                    # Marks spooled before the field existed all came from devices
+                    network_verified=mark.get('network_verified', True),
+                    device_mac=mark['device_mac'],
+                    esp32_device_id=mark['esp32_device_id'],
+                ))
+                changes.append((session_id, student_id, None, 'present'))
+            elif mark['update_existing']:
+                changes.append((session_id, student_id, record.status, 'present'))
+                record.status = 'present'
+                record.network_verified = mark.get('network_verified', True)
+                record.device_mac = mark['device_mac']
+                record.esp32_device_id = mark['esp32_device_id']
+                updated_records.append(record)
+
+        AttendanceRecord.objects.bulk_create(new_records)
+        if updated_records:
+            AttendanceRecord.objects.bulk_update(
+                updated_records, ['status', 'network_verified', 'device_mac', 'esp32_device']
+            )
+        # Bulk writes send no signals
+        apply_record_changes(changes)
+
+    return [row_id for row_id, _ in valid], failures
+
+
+class SpoolApplier:
+    """Drains a spool into the database while it holds the spool's lease"""
+
+    def __init__(self, spool, batch_size=None, interval=None):
+        self.spool = spool
+        self.batch_size = batch_size or spool_setting('BATCH_SIZE')
+        self.interval = interval or spool_setting('INTERVAL')
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._last_purge = 0.0
+
+    def drain(self):
+        """Apply pending marks until the spool is empty; returns how many were applied"""
+        applied = 0
+        while self.spool.acquire_lease(self.owner):
+            rows = self.spool.pending(self.batch_size)
+            if not rows:
+                break
+            revisions = {row_id: revision for row_id, revision, _ in rows}
+            applied_ids, failures = apply_marks([(row_id, mark) for row_id, _, mark in rows])
+            self.spool.mark_applied({row_id: revisions[row_id] for row_id in applied_ids})
+            self.spool.mark_failed(failures)
+            for row_id, reason in failures.items():
+                logger.warning('Attendance spool mark %s set aside: %s', row_id, reason)
+            applied += len(applied_ids)
+        if time.monotonic() - self._last_purge > 3600:
+            self.spool.purge(spool_setting('RETENTION'))
+            self._last_purge = time.monotonic()
+        return applied
+
+    def run_forever(self, stop_event=None):
+        while not (stop_event and stop_event.is_set()):
+            try:
+                self.drain()
+            except Exception:
+                # The marks stay in the spool and are retried on the next pass
+                logger.exception('Attendance spool applier pass failed')
+            finally:
+                # Each pass may have opened a database connection in this thread
+                close_old_connections()
+            time.sleep(self.interval)
+
+    def start_thread(self):
+        thread = threading.Thread(target=self.run_forever, name='attendance-spool-applier', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,323 @@
+"""
+📊 Attendance statistics
+
+Dashboards read present/absent/enrolled figures from three materialized summary
+tables instead of counting raw AttendanceRecord and CourseEnrollment rows:
+
+    AttendanceSessionSummary          one row per attendance session
+    CourseAttendanceSummary           one row per course + session + semester
+    StudentCourseAttendanceSummary    one row per student + course + session + semester
+
+Writes keep them current incrementally: every record change is turned into a
+(total, present, absent) delta that is added to the matching rows with F()
+expressions, grouped so a whole class costs a handful of UPDATEs. A row that does
+not exist yet is built from the raw data the first time it is needed, and
+``manage.py rebuild_attendance_summaries`` recomputes everything from scratch.
+
+Single-record writes are picked up by the signal handlers in admin_ui/signals.py;
+bulk writes (which send no signals) call apply_record_changes() themselves.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+
+from .models import (
+    AttendanceSession, AttendanceRecord, CourseEnrollment,
+    AttendanceSessionSummary, CourseAttendanceSummary, StudentCourseAttendanceSummary
+)
+
+SESSION_KEY = ('attendance_session_id',)
+COURSE_KEY = ('course_id', 'session', 'semester')
+STUDENT_KEY = ('student_id', 'course_id', 'session', 'semester')
+
+
+def _keys_q(key_fields, keys, prefix=''):
+    """Q matching any of the given key tuples, grouped on all but the first field"""
+    first, rest = key_fields[0], key_fields[1:]
+    grouped = defaultdict(list)
+    for key in keys:
+        grouped[key[1:]].append(key[0])
+
+    q = Q(pk__in=[])
+    for rest_values, first_values in grouped.items():
+        q |= Q(**{f'{prefix}{first}__in': first_values}, **{
+            f'{prefix}{field}': value for field, value in zip(rest, rest_values)
+        })
+    return q
+
+
+def _record_counts():
+    return {
+        'total': Count('id'),
+        'present': Count('id', filter=Q(status='present')),
+        'absent': Count('id', filter=Q(status='absent')),
+    }
+
+
+# 🏗️ Building summaries from raw data
+
+def count_session_records(session_ids):
+    """Return {session_id: {'total', 'present', 'absent'}} using a single grouped query"""
+    counts = {session_id: {'total': 0, 'present': 0, 'absent': 0} for session_id in session_ids}
+    rows = AttendanceRecord.objects.filter(
+        attendance_session_id__in=list(counts)
+    ).values('attendance_session_id').annotate(**_record_counts()).order_by()
+    for row in rows:
+        counts[row['attendance_session_id']] = {
+            'total': row['total'],
+            'present': row['present'],
+            'absent': row['absent'],
+        }
+    return counts
+
+
+def build_session_summaries(keys):
+    return [
+        AttendanceSessionSummary(
+            attendance_session_id=session_id,
+            total_count=counts['total'],
+            present_count=counts['present'],
+            absent_count=counts['absent']
+        )
+        for session_id, counts in count_session_records(key[0] for key in keys).items()
+    ]
+
+
+def build_course_summaries(keys):
+    summaries = {
+        key: CourseAttendanceSummary(course_id=key[0], session=key[1], semester=key[2])
+        for key in keys
+    }
+    if not summaries:
+        return []
+
+    for row in CourseEnrollment.objects.filter(_keys_q(COURSE_KEY, summaries)).values(
+            *COURSE_KEY).annotate(enrolled=Count('id')).order_by():
+        summaries[tuple(row[field] for field in COURSE_KEY)].enrolled_count = row['enrolled']
+
+    for row in AttendanceSession.objects.filter(_keys_q(COURSE_KEY, summaries)).values(
+            *COURSE_KEY).annotate(sessions=Count('id')).order_by():
+        summaries[tuple(row[field] for field in COURSE_KEY)].session_count = row['sessions']
+
+    record_fields = [f'attendance_session__{field}' for field in COURSE_KEY]
+    for row in AttendanceRecord.objects.filter(_keys_q(COURSE_KEY, summaries, 'attendance_session__')).values(
+            *record_fields).annotate(**_record_counts()).order_by():
+        summary = summaries[tuple(row[field] for field in record_fields)]
+        summary.total_count, summary.present_count, summary.absent_count = row['total'], row['present'], row['absent']
+
+    return list(summaries.values())
+
+
+def build_student_summaries(keys):
+    summaries = {
+        key: StudentCourseAttendanceSummary(student_id=key[0], course_id=key[1], session=key[2], semester=key[3])
+        for key in keys
+    }
+    if not summaries:
+        return []
+
+    # Build the lookup with the student field unprefixed and the term fields on the session
+    q = Q(pk__in=[])
+    grouped = defaultdict(list)
+    for key in summaries:
+        grouped[key[1:]].append(key[0])
+    for (course_id, session, semester), student_ids in grouped.items():
+        q |= Q(
+            student_id__in=student_ids,
+            attendance_session__course_id=course_id,
+            attendance_session__session=session,
+            attendance_session__semester=semester
+        )
+
+    for row in AttendanceRecord.objects.filter(q).values(
+            'student_id', 'attendance_session__course_id',
+            'attendance_session__session', 'attendance_session__semester'
+    ).annotate(**_record_counts()).order_by():
+        summary = summaries[(
+            row['student_id'], row['attendance_session__course_id'],
+            row['attendance_session__session'], row['attendance_session__semester']
+        )]
+        summary.total_count, summary.present_count, summary.absent_count = row['total'], row['present'], row['absent']
+
+    return list(summaries.values())
+
+
+SUMMARY_LEVELS = {
+    'session': (AttendanceSessionSummary, SESSION_KEY, build_session_summaries),
+    'course': (CourseAttendanceSummary, COURSE_KEY, build_course_summaries),
+    'student': (StudentCourseAttendanceSummary, STUDENT_KEY, build_student_summaries),
+}
+
+
+def _materialize(level, keys):
+    """Return {key: summary} for the given keys, building and storing any that are missing"""
+    model, key_fields, build = SUMMARY_LEVELS[level]
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    summaries = {
+        tuple(getattr(summary, field) for field in key_fields): summary
+        for summary in model.objects.filter(_keys_q(key_fields, keys))
+    }
+    missing = keys - set(summaries)
+    if missing:
+        new_summaries = build(missing)
+        # A concurrent request may have stored the same summary first
+        model.objects.bulk_create(new_summaries, ignore_conflicts=True)
+        summaries.update({
+            tuple(getattr(summary, field) for field in key_fields): summary
+            for summary in new_summaries
+        })
+    return summaries
+
+
+# ✏️ Incremental maintenance
+
+def _apply_deltas(level, deltas):
+    """
+    Add {key: {field: change}} to existing summary rows. Rows that do not exist yet
+    are built from the (already updated) raw data instead.
+    """
+    model, key_fields, build = SUMMARY_LEVELS[level]
+    deltas = {
+        key: {field: change for field, change in delta.items() if change}
+        for key, delta in deltas.items()
+    }
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    existing = set(model.objects.filter(_keys_q(key_fields, deltas)).values_list(*key_fields))
+
+    # Rows receiving the same change are updated together
+    grouped = defaultdict(list)
+    for key in existing:
+        grouped[tuple(sorted(deltas[key].items()))].append(key)
+    for delta, keys in grouped.items():
+        model.objects.filter(_keys_q(key_fields, keys)).update(
+            **{field: F(field) + change for field, change in delta}
+        )
+
+    missing = set(deltas) - existing
+    if missing:
+        model.objects.bulk_create(build(missing), ignore_conflicts=True)
+
+
+def _status_delta(old_status, new_status):
+    delta = defaultdict(int)
+    if old_status is not None:
+        delta['total_count'] -= 1
+        if old_status in ('present', 'absent'):
+            delta[f'{old_status}_count'] -= 1
+    if new_status is not None:
+        delta['total_count'] += 1
+        if new_status in ('present', 'absent'):
+            delta[f'{new_status}_count'] += 1
+    return delta
+
+
+def apply_record_changes(changes):
+    """
+    Update all summaries for a batch of attendance record writes.
+
+    changes is an iterable of (attendance_session_id, student_id, old_status, new_status)
+    where old_status is None for new records and new_status is None for deleted ones.
+    Call it after the records themselves have been written.
+    """
+    changes = [change for change in changes if change[2] != change[3]]
+    if not changes:
+        return
+
+    terms = {
+        session_id: (course_id, session, semester)
+        for session_id, course_id, session, semester in AttendanceSession.objects.filter(
+            id__in={change[0] for change in changes}
+        ).values_list('id', *COURSE_KEY)
+    }
+
+    session_deltas = defaultdict(lambda: defaultdict(int))
+    course_deltas = defaultdict(lambda: defaultdict(int))
+    student_deltas = defaultdict(lambda: defaultdict(int))
+    for session_id, student_id, old_status, new_status in changes:
+        term = terms.get(session_id)
+        if term is None:
+            continue
+        for field, change in _status_delta(old_status, new_status).items():
+            session_deltas[(session_id,)][field] += change
+            course_deltas[term][field] += change
+            student_deltas[(student_id,) + term][field] += change
+
+    _apply_deltas('session', session_deltas)
+    _apply_deltas('course', course_deltas)
+    _apply_deltas('student', student_deltas)
+
+
+def apply_term_change(course_id, session, semester, enrolled=0, sessions=0):
+    """Adjust a course term's enrolment and attendance-session counts"""
+    _apply_deltas('course', {
+        (course_id, session, semester): {'enrolled_count': enrolled, 'session_count': sessions}
+    })
+
+
+def invalidate_summaries(session_ids=(), terms=()):
+    """Drop stored summaries (they are rebuilt on the next read); used for cascading deletes"""
+    if session_ids:
+        AttendanceSessionSummary.objects.filter(attendance_session_id__in=list(session_ids)).delete()
+    if terms:
+        CourseAttendanceSummary.objects.filter(_keys_q(COURSE_KEY, terms)).delete()
+        StudentCourseAttendanceSummary.objects.filter(_keys_q(COURSE_KEY, terms)).delete()
+
+
+def rebuild_summaries():
+    """Recompute every summary from raw data; returns the number of rows per level"""
+    session_keys = {(session_id,) for session_id in AttendanceSession.objects.values_list('id', flat=True)}
+    course_keys = set(AttendanceSession.objects.values_list(*COURSE_KEY).distinct()) | set(
+        CourseEnrollment.objects.values_list(*COURSE_KEY).distinct()
+    )
+    student_keys = set(AttendanceRecord.objects.values_list(
+        'student_id', 'attendance_session__course_id',
+        'attendance_session__session', 'attendance_session__semester'
+    ).distinct())
+
+    rebuilt = {}
+    for level, keys in (('session', session_keys), ('course', course_keys), ('student', student_keys)):
+        model, key_fields, build = SUMMARY_LEVELS[level]
+        model.objects.all().delete()
+        summaries = build(keys)
+        model.objects.bulk_create(summaries, batch_size=500)
+        rebuilt[level] = len(summaries)
+    return rebuilt
+
+
+# 📖 Reads
+
+def get_session_summaries(session_ids):
+    """Return {session_id: AttendanceSessionSummary}, materializing any that are missing"""
+    return {key[0]: summary for key, summary in _materialize('session', {(i,) for i in session_ids}).items()}
+
+
+def get_course_summaries(terms):
+    """Return {(course_id, session, semester): CourseAttendanceSummary}"""
+    return _materialize('course', terms)
+
+
+def get_student_summaries(keys):
+    """Return {(student_id, course_id, session, semester): StudentCourseAttendanceSummary}"""
+    return _materialize('student', keys)
+
+
+def attach_session_stats(sessions):
+    """
+    Set total_count/total_students, present_count, absent_count and attendance_rate
+    on each AttendanceSession in sessions (a page or a small slice, not a full queryset)
+    """
+    sessions = list(sessions)
+    summaries = get_session_summaries(session.id for session in sessions)
+    for session in sessions:
+        summary = summaries[session.id]
+        session.total_count = session.total_students = summary.total_count
+        session.present_count = summary.present_count
+        session.absent_count = summary.absent_count
+        session.attendance_rate = summary.attendance_rate
+    return sessions
@@ -0,0 +1,53 @@
+"""
+🩺 System checks for caches that must be shared between workers
+
+Nonces, the session registry, rate limits and idempotency keys all live in a
+Django cache. The default is Django's LocMemCache, which each worker process
+keeps to itself: fine for one process, but with several workers a replayed
+nonce, a retried request or a session change can reach a worker that never saw
+the original. These checks warn about that outside DEBUG; point the setting at
+a shared cache (Redis/Memcached) to silence them.
+"""
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+from .device_credentials import auth_mode, auth_setting
+from .device_rate_limit import limiter_cache, rate_limit_setting
+from .idempotency import idempotency_cache
+from .session_registry import registry_cache
+
+
+def _per_process(get_cache):
+    try:
+        return isinstance(get_cache(), LocMemCache)
+    except InvalidCacheBackendError:
+        return False  # Reported when the cache is first used
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+
+    uses = [
+        ("DEVICE_AUTH['NONCE_CACHE']", lambda: caches[auth_setting('NONCE_CACHE')], auth_mode() != 'off',
+         'a replayed signed request is accepted by any worker that did not see the nonce', 'admin_ui.W001'),
+        ("ACTIVE_SESSION_REGISTRY['CACHE']", registry_cache, True,
+         'a session ended on one worker stays active on the others until the TTL, and mark locks only hold within a worker',
+         'admin_ui.W002'),
+        ("DEVICE_RATE_LIMIT['CACHE']", limiter_cache, rate_limit_setting('ENABLED'),
+         'each worker counts requests on its own, multiplying the limits', 'admin_ui.W003'),
+        ("DEVICE_IDEMPOTENCY['CACHE']", idempotency_cache, True,
+         'a retry reaching another worker runs the request again', 'admin_ui.W004'),
+    ]
+    return [
+        Warning(
+            f'{setting} is a per-process LocMemCache, so with several workers {consequence}.',
+            hint='Point it at a shared cache (Redis/Memcached), or run a single worker.',
+            id=check_id,
+        )
+        for setting, get_cache, active, consequence, check_id in uses
+        if active and _per_process(get_cache)
+    ]
@@ -0,0 +1,213 @@
+"""
+📬 Long-poll command channel for ESP32 devices
+
+Instead of learning about a new session or configuration on its next heartbeat,
+a gateway parks ``GET /api/esp32/commands/?device_id=...&after=<last id>`` and
+the request returns as soon as a command for it is queued (start_session,
+end_session, reconfigure, flush_buffer, roster_update) or after a bounded timeout.
+
+Commands are DeviceCommand rows, so they survive restarts and reach workers in
+other processes. Delivery is at-least-once: a device sends the id of the last
+command it applied as ``after``, which acknowledges everything up to it.
+
+A parked request is a coroutine waiting on an asyncio.Event, so one ASGI worker
+holds thousands of them. Commands queued in the same process wake their device
+at once; one small query per ``POLL_INTERVAL`` and event loop picks up commands
+queued by other processes (e.g. the gunicorn workers serving lecturer pages).
+
+Under WSGI (``gunicorn config.wsgi``) a parked request holds a sync worker, and
+a park longer than gunicorn's worker timeout gets the worker killed, so there
+the view parks at most ``WSGI_TIMEOUT`` seconds; the default 0 answers at once
+(short-poll) and tells the device to come back after ``TIMEOUT`` seconds.
+
+Configured through ``settings.DEVICE_COMMANDS``:
+
+    DEVICE_COMMANDS = {
+        'TIMEOUT': 25,        # default long-poll timeout (seconds)
+        'MAX_TIMEOUT': 55,    # upper bound a device may ask for
+        'POLL_INTERVAL': 1,   # how often parked requests look for commands from other processes
+        'TTL': 600,           # undelivered commands expire after this many seconds
+        'WSGI_TIMEOUT': 0,    # longest park when not served over ASGI (0 = short-poll)
+    }
+"""
+import asyncio
+import threading
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import DeviceCommand
+
+COMMAND_TYPES = ('start_session', 'end_session', 'reconfigure', 'flush_buffer', 'roster_update')
+
+DEFAULTS = {
+    'TIMEOUT': 25,
+    'MAX_TIMEOUT': 55,
+    'POLL_INTERVAL': 1,
+    'TTL': 600,
+    'WSGI_TIMEOUT': 0,
+}
+
+
+def command_setting(name):
+    return getattr(settings, 'DEVICE_COMMANDS', {}).get(name, DEFAULTS[name])
+
+
+def serialize_command(command):
+    return {
+        'id': command.id,
+        'command': command.command,
+        'payload': command.payload,
+        'created_at': command.created_at.isoformat(),
+    }
+
+
+def queue_command(esp32_device, command, payload=None):
+    """Queue a command for a device and wake its parked long-poll once the transaction commits"""
+    if command not in COMMAND_TYPES:
+        raise ValueError(f'Unknown device command: {command}')
+
+    now = timezone.now()
+    # Undelivered commands past their lifetime are of no use to anyone
+    DeviceCommand.objects.filter(esp32_device=esp32_device, expires_at__lte=now).delete()
+    device_command = DeviceCommand.objects.create(
+        esp32_device=esp32_device,
+        command=command,
+        payload=payload or {},
+        expires_at=now + timedelta(seconds=command_setting('TTL'))
+    )
+    device_id = esp32_device.device_id
+    transaction.on_commit(lambda: notifier.notify([device_id]))
+    return device_command
+
+
+def _pending_queryset(device_id, after):
+    return DeviceCommand.objects.filter(
+        esp32_device__device_id=device_id,
+        id__gt=after,
+        expires_at__gt=timezone.now()
+    )
+
+
+def _acknowledged_queryset(device_id, after):
+    return DeviceCommand.objects.filter(
+        esp32_device__device_id=device_id,
+        id__lte=after,
+        delivered_at__isnull=True
+    )
+
+
+def pending_commands(device_id, after=0):
+    """Acknowledge commands up to `after` and return the device's newer commands"""
+    _acknowledged_queryset(device_id, after).update(delivered_at=timezone.now())
+    return list(_pending_queryset(device_id, after))
+
+
+async def apending_commands(device_id, after=0):
+    """Async version of pending_commands()"""
+    await _acknowledged_queryset(device_id, after).aupdate(delivered_at=timezone.now())
+    return [command async for command in _pending_queryset(device_id, after)]
+
+
+class CommandNotifier:
+    """Wakes parked long-poll requests; keeps one set of waiters per running event loop"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loops = weakref.WeakKeyDictionary()
+
+    def _state(self, loop):
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = {'waiters': defaultdict(set), 'poller': None}
+            return state
+
+    @contextmanager
+    def subscribe(self, device_id):
+        """Event set whenever a command for the device may have been queued"""
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+        event = asyncio.Event()
+        state['waiters'][device_id].add(event)
+        if state['poller'] is None:
+            state['poller'] = loop.create_task(self._poll(state))
+        try:
+            yield event
+        finally:
+            waiters = state['waiters'].get(device_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del state['waiters'][device_id]
+            if not state['waiters'] and state['poller'] is not None:
+                state['poller'].cancel()
+                state['poller'] = None
+
+    def notify(self, device_ids):
+        """Wake the given devices' waiters in every event loop (safe to call from any thread)"""
+        with self._lock:
+            loops = list(self._loops.items())
+        for loop, state in loops:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._wake, state, list(device_ids))
+
+    @staticmethod
+    def _wake(state, device_ids):
+        for device_id in device_ids:
+            for event in state['waiters'].get(device_id, ()):
+                event.set()
+
+    async def _poll(self, state):
+        # Picks up commands queued by other processes while anyone is parked in this loop
+        try:
+            last_id = (await DeviceCommand.objects.aaggregate(last_id=Max('id')))['last_id'] or 0
+            # Anything queued before the baseline was taken is found by the waiters' own re-check
+            self._wake(state, list(state['waiters']))
+            while state['waiters']:
+                await asyncio.sleep(command_setting('POLL_INTERVAL'))
+                device_ids = set()
+                async for command_id, device_id in DeviceCommand.objects.filter(
+                    id__gt=last_id
+                ).values_list('id', 'esp32_device__device_id'):
+                    last_id = max(last_id, command_id)
+                    device_ids.add(device_id)
+                self._wake(state, device_ids)
+        finally:
+            if state['poller'] is asyncio.current_task():
+                state['poller'] = None
+
+
+notifier = CommandNotifier()
+
+
+async def wait_for_commands(device_id, after=0, timeout=None):
+    """
+    Return the device's commands newer than `after`, parking up to `timeout`
+    seconds (default TIMEOUT) for one to arrive; 0 returns at once.
+    """
+    if timeout is None:
+        timeout = command_setting('TIMEOUT')
+    timeout = min(float(timeout), command_setting('MAX_TIMEOUT'))
+    if timeout <= 0:
+        return await apending_commands(device_id, after)
+    clock = asyncio.get_running_loop().time
+    deadline = clock() + timeout
+
+    with notifier.subscribe(device_id) as event:
+        while True:
+            event.clear()
+            commands = await apending_commands(device_id, after)
+            remaining = deadline - clock()
+            if commands or remaining <= 0:
+                return commands
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
@@ -0,0 +1,128 @@
+"""
+⚙️ Versioned ESP32 device configuration
+
+Heartbeat responses carry the configuration a gateway runs with (access point
+SSID/password and the active session's course and lecturer). It only changes
+when the device is edited or a session starts or ends, so every change bumps
+``ESP32Device.config_version``. Devices send the version they hold
+(``config_version`` in the body or ``If-None-Match``) and get a tiny "unchanged"
+reply or a 304 until it moves.
+
+The configuration is cached per device_id next to the active session snapshot
+(same cache and TTL as admin_ui/session_registry.py), so an unchanged heartbeat
+costs no queries.
+"""
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import ESP32Device
+from .session_registry import aget_active_session, get_active_session, registry_cache, registry_ttl
+
+KEY_PREFIX = 'esp32_device_config'
+
+# ESP32Device fields that are part of the configuration
+CONFIG_FIELDS = ('device_id', 'device_name', 'ssid', 'password', 'location', 'is_active')
+
+_UNKNOWN_DEVICE = 'none'
+_MISSING = object()
+
+
+def _key(device_id):
+    return f'{KEY_PREFIX}:{device_id}'
+
+
+def _device_values(device_id):
+    return ESP32Device.objects.filter(device_id=device_id).values(*CONFIG_FIELDS, 'config_version')
+
+
+def _config(device, active_session):
+    # Key names follow what the gateway firmware reads from the 'configuration' object
+    active_session = active_session or {}
+    return {
+        'config_version': device.pop('config_version'),
+        **device,
+        'active_session': bool(active_session),
+        'session_id': active_session.get('id'),
+        'course_code': active_session.get('course_code'),
+        'course_title': active_session.get('course_title'),
+        'lecturer': active_session.get('lecturer_username'),
+        'session': active_session.get('session'),
+        'semester': active_session.get('semester'),
+    }
+
+
+def build_device_config(device_id):
+    """Current configuration of a device as sent in heartbeat responses, or None if unknown"""
+    device = _device_values(device_id).first()
+    if device is None:
+        return None
+    return _config(device, get_active_session(device_id))
+
+
+async def abuild_device_config(device_id):
+    """Async version of build_device_config()"""
+    device = await _device_values(device_id).afirst()
+    if device is None:
+        return None
+    return _config(device, await aget_active_session(device_id))
+
+
+def get_device_config(device_id):
+    """Cached configuration of a device, or None for unknown devices"""
+    cache = registry_cache()
+    config = cache.get(_key(device_id), _MISSING)
+    if config is _MISSING:
+        config = build_device_config(device_id) or _UNKNOWN_DEVICE
+        cache.set(_key(device_id), config, registry_ttl())
+    return None if config == _UNKNOWN_DEVICE else config
+
+
+async def aget_device_config(device_id):
+    """Async version of get_device_config()"""
+    cache = registry_cache()
+    config = await cache.aget(_key(device_id), _MISSING)
+    if config is _MISSING:
+        config = await abuild_device_config(device_id) or _UNKNOWN_DEVICE
+        await cache.aset(_key(device_id), config, registry_ttl())
+    return None if config == _UNKNOWN_DEVICE else config
+
+
+def config_etag(config):
+    return f'"{config["device_id"]}-{config["config_version"]}"'
+
+
+def config_response(request, config, held_version, **fields):
+    """
+    Heartbeat reply carrying the device configuration only when it moved: 304 for a
+    matching If-None-Match, a tiny 'unchanged' body when the device sent the current
+    config_version, otherwise the full configuration.
+    """
+    etag = config_etag(config)
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+        response = HttpResponse(status=304)
+    elif str(held_version) == str(config['config_version']):
+        response = JsonResponse({**fields, 'unchanged': True, 'config_version': config['config_version']})
+    else:
+        response = JsonResponse({
+            **fields,
+            'config_version': config['config_version'],
+            'configuration': config,
+            'server_time': timezone.now().isoformat()
+        })
+    response['ETag'] = etag
+    return response
+
+
+def invalidate_device_config(*device_ids):
+    registry_cache().delete_many([_key(device_id) for device_id in device_ids if device_id])
+
+
+def bump_config_version(device):
+    """Move a device to the next configuration version and drop its cached configuration"""
+    ESP32Device.objects.filter(pk=device.pk).update(config_version=F('config_version') + 1)
+    device.config_version = ESP32Device.objects.filter(pk=device.pk).values_list(
+        'config_version', flat=True
+    ).first() or device.config_version
+    invalidate_device_config(device.device_id)
@@ -0,0 +1,278 @@
+"""
+🔏 Per-device credentials and HMAC request signing
+
+Every ESP32 device can be given its own DeviceCredential. A device with a
+credential signs each request with its secret and sends:
+
+    X-Device-Id:  the device_id the credential belongs to
+    X-Timestamp:  unix time in seconds
+    X-Nonce:      random string, never reused by the device
+    X-Signature:  hex HMAC-SHA256(secret, canonical request)
+
+where the canonical request is
+
+    METHOD \\n PATH?QUERY \\n TIMESTAMP \\n NONCE \\n hex SHA-256(body)
+
+Requests older or newer than ``WINDOW`` seconds are rejected, and each nonce is
+accepted once per window. Nonces are remembered in the ``NONCE_CACHE`` cache,
+which must be shared (Redis/Memcached) for a replay to be caught whichever
+worker it reaches. The default cache is a per-process LocMemCache unless
+configured; admin_ui/checks.py warns about that outside DEBUG.
+
+Verified secrets are kept in a per-process LRU for ``SECRET_CACHE_TTL``
+seconds, so the hot path costs no query. The database stays the source of
+truth: a signature that does not match the cached secret re-reads it once
+(at most every ``REFRESH_INTERVAL`` seconds per device), so a rotated secret
+is picked up at once by every worker, and a revoked one stops working within
+the TTL. Saves in this process drop the entry immediately (model signals).
+
+Configured through ``settings.DEVICE_AUTH``:
+
+    DEVICE_AUTH = {
+        'MODE': 'optional',        # 'off', 'optional' (verify signed requests) or 'required'
+        'WINDOW': 300,             # accepted clock skew / replay window (seconds)
+        'NONCE_CACHE': 'default',  # use a shared cache (Redis/Memcached) with several workers
+        'SECRET_CACHE_SIZE': 1024,
+        'SECRET_CACHE_TTL': 300,
+        'REFRESH_INTERVAL': 5,
+    }
+"""
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import DeviceCredential
+
+MODES = ('off', 'optional', 'required')
+
+DEFAULTS = {
+    'MODE': 'optional',
+    'WINDOW': 300,
+    'NONCE_CACHE': 'default',
+    'SECRET_CACHE_SIZE': 1024,
+    'SECRET_CACHE_TTL': 300,
+    'REFRESH_INTERVAL': 5,
+}
+
+REPLAYED_REQUEST = "Replayed request"
+
+SIGNATURE_HEADERS = ('X-Device-Id', 'X-Timestamp', 'X-Nonce', 'X-Signature')
+NONCE_PREFIX = 'esp32_nonce'
+
+
+def auth_setting(name):
+    return getattr(settings, 'DEVICE_AUTH', {}).get(name, DEFAULTS[name])
+
+
+def auth_mode():
+    mode = auth_setting('MODE')
+    return mode if mode in MODES else 'required'
+
+
+class SecretCache:
+    """Thread-safe LRU of device_id -> secret (None for "no usable credential") with a TTL"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, device_id):
+        """(secret, age in seconds), or None when the device is not cached or its entry expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is None:
+                return None
+            secret, loaded_at = entry
+            if now - loaded_at > self.ttl:
+                del self._entries[device_id]
+                return None
+            self._entries.move_to_end(device_id)
+            return secret, now - loaded_at
+
+    def set(self, device_id, secret):
+        with self._lock:
+            self._entries[device_id] = (secret, time.monotonic())
+            self._entries.move_to_end(device_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, *device_ids):
+        with self._lock:
+            for device_id in device_ids:
+                self._entries.pop(device_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_secret_cache = None
+_secret_cache_lock = threading.Lock()
+
+
+def get_secret_cache():
+    """Per-process secret cache, built from settings.DEVICE_AUTH on first use"""
+    global _secret_cache
+    if _secret_cache is None:
+        with _secret_cache_lock:
+            if _secret_cache is None:
+                _secret_cache = SecretCache(auth_setting('SECRET_CACHE_SIZE'), auth_setting('SECRET_CACHE_TTL'))
+    return _secret_cache
+
+
+def invalidate_device_secret(*device_ids):
+    """Drop cached secrets after a credential or its device changes"""
+    get_secret_cache().discard(*[device_id for device_id in device_ids if device_id])
+
+
+def _active_secret(device_id):
+    return DeviceCredential.objects.filter(
+        esp32_device__device_id=device_id, is_active=True, esp32_device__is_active=True
+    ).values_list('secret', flat=True)
+
+
+def device_secret(device_id, refresh=False):
+    """Signing secret of an active device, or None; served from the LRU unless `refresh`"""
+    cache = get_secret_cache()
+    if not refresh:
+        cached = cache.get(device_id)
+        if cached is not None:
+            return cached[0]
+    secret = _active_secret(device_id).first()
+    cache.set(device_id, secret)
+    return secret
+
+
+async def adevice_secret(device_id, refresh=False):
+    """Async version of device_secret()"""
+    cache = get_secret_cache()
+    if not refresh:
+        cached = cache.get(device_id)
+        if cached is not None:
+            return cached[0]
+    secret = await _active_secret(device_id).afirst()
+    cache.set(device_id, secret)
+    return secret
+
+
+def _may_refresh(device_id):
+    # A bad signature re-reads the secret, but not more often than REFRESH_INTERVAL per device
+    cached = get_secret_cache().get(device_id)
+    return cached is None or cached[1] >= auth_setting('REFRESH_INTERVAL')
+
+
+def canonical_request(method, path, timestamp, nonce, body):
+    body_hash = hashlib.sha256(body or b'').hexdigest()
+    return f"{method.upper()}\n{path}\n{timestamp}\n{nonce}\n{body_hash}"
+
+
+def sign_request(secret, method, path, timestamp, nonce, body=b''):
+    """Hex signature a device sends in X-Signature"""
+    message = canonical_request(method, path, timestamp, nonce, body)
+    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def is_signed(request):
+    return 'X-Signature' in request.headers
+
+
+def claimed_device_id(request):
+    """device_id a request acts for, from the query string or the JSON/form body"""
+    if not hasattr(request, '_claimed_device_id'):
+        device_id = request.GET.get('device_id')
+        if device_id is None and request.body:
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                data = request.POST
+            if hasattr(data, 'get'):
+                device_id = data.get('device_id')
+        request._claimed_device_id = None if device_id is None else str(device_id)
+    return request._claimed_device_id
+
+
+def _signature_fields(request):
+    """(device_id, timestamp, nonce, signature), or an error message"""
+    fields = [request.headers.get(header, '') for header in SIGNATURE_HEADERS]
+    missing = [header for header, value in zip(SIGNATURE_HEADERS, fields) if not value]
+    if missing:
+        return f"Missing {', '.join(missing)} header"
+
+    device_id, timestamp, nonce, signature = fields
+    if len(nonce) > 64:
+        return "Invalid nonce"
+    try:
+        skew = abs(time.time() - int(timestamp))
+    except ValueError:
+        return "Invalid timestamp"
+    if skew > auth_setting('WINDOW'):
+        return "Request timestamp outside the allowed window"
+    return device_id, timestamp, nonce, signature
+
+
+def _signature_matches(secret, request, timestamp, nonce, signature):
+    if not secret:
+        return False
+    expected = sign_request(secret, request.method, request.get_full_path(), timestamp, nonce, request.body)
+    return hmac.compare_digest(expected, signature)
+
+
+def _nonce_key(device_id, nonce):
+    return f'{NONCE_PREFIX}:{device_id}:{nonce}'
+
+
+def _nonce_timeout():
+    # A nonce must be remembered for as long as its timestamp can still be accepted
+    return 2 * auth_setting('WINDOW') + 1
+
+
+def verify_signed_request(request):
+    """Check a signed device request: (device_id, None) when valid, else (None, error message)"""
+    fields = _signature_fields(request)
+    if isinstance(fields, str):
+        return None, fields
+    device_id, timestamp, nonce, signature = fields
+
+    secret = device_secret(device_id)
+    if not _signature_matches(secret, request, timestamp, nonce, signature):
+        # The secret may have been rotated or issued since it was cached
+        if not _may_refresh(device_id):
+            return None, "Invalid signature"
+        secret = device_secret(device_id, refresh=True)
+        if not _signature_matches(secret, request, timestamp, nonce, signature):
+            return None, "Invalid signature"
+
+    nonce_cache = caches[auth_setting('NONCE_CACHE')]
+    if not nonce_cache.add(_nonce_key(device_id, nonce), 1, timeout=_nonce_timeout()):
+        return None, REPLAYED_REQUEST
+    return device_id, None
+
+
+async def averify_signed_request(request):
+    """Async version of verify_signed_request()"""
+    fields = _signature_fields(request)
+    if isinstance(fields, str):
+        return None, fields
+    device_id, timestamp, nonce, signature = fields
+
+    secret = await adevice_secret(device_id)
+    if not _signature_matches(secret, request, timestamp, nonce, signature):
+        if not _may_refresh(device_id):
+            return None, "Invalid signature"
+        secret = await adevice_secret(device_id, refresh=True)
+        if not _signature_matches(secret, request, timestamp, nonce, signature):
+            return None, "Invalid signature"
+
+    nonce_cache = caches[auth_setting('NONCE_CACHE')]
+    if not await nonce_cache.aadd(_nonce_key(device_id, nonce), 1, timeout=_nonce_timeout()):
+        return None, REPLAYED_REQUEST
+    return device_id, None
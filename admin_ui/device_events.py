@@ -0,0 +1,159 @@
+"""
+📦 Batched ESP32 event ingest
+
+An ESP32 gateway can buffer station join/leave events and presence reports and
+upload them as one ordered batch instead of one HTTP request per event.
+The whole batch is applied in a single transaction with a constant number of
+queries: one device lookup, one active session lookup, one fetch of the
+affected ConnectedDevice rows, then one bulk insert and one bulk update.
+The device heartbeat goes through the heartbeat recorder.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .access_points import record_station_count
+from .heartbeats import record_heartbeat
+from .models import ESP32Device, NetworkSession, ConnectedDevice
+from .presence import get_presence_store
+from .presence_history import maybe_record_sample
+
+EVENT_TYPES = ('connect', 'disconnect', 'presence')
+
+# Upper bound on events accepted in one upload (keeps a single transaction short)
+MAX_BATCH_EVENTS = 500
+
+CONNECTED_DEVICE_FIELDS = ['device_name', 'ip_address', 'is_connected', 'connected_at', 'disconnected_at']
+
+
+def _result(index, event_type, status, message, **extra):
+    result = {'index': index, 'type': event_type, 'status': status, 'message': message}
+    result.update(extra)
+    return result
+
+
+def apply_device_events(device_id, events):
+    """
+    Apply an ordered batch of connect/disconnect/presence events for one ESP32.
+
+    Returns (results, summary, active_session) where results holds one entry per
+    event in the order received. Raises ESP32Device.DoesNotExist for unknown devices.
+    """
+    now = timezone.now()
+    results = [None] * len(events)
+
+    with transaction.atomic():
+        esp32_device = ESP32Device.objects.get(device_id=device_id)
+        active_sessions = NetworkSession.objects.filter(is_active=True).select_related('course')
+        # Its own session, else the one whose access point pool it serves
+        active_session = (
+            active_sessions.filter(esp32_device=esp32_device).first()
+            or active_sessions.filter(access_points__esp32_device=esp32_device).first()
+        )
+
+        # Fold the batch into the final state per MAC address, keeping event order
+        station_events = {}
+        presence_reports = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                results[index] = _result(index, None, 'error', 'Event must be an object')
+                continue
+
+            event_type = event.get('type')
+            if event_type not in EVENT_TYPES:
+                results[index] = _result(index, event_type, 'error', f'Unknown event type: {event_type}')
+                continue
+
+            if event_type == 'presence':
+                connected_devices = event.get('connected_devices', [])
+                if not isinstance(connected_devices, list):
+                    results[index] = _result(index, event_type, 'error', 'connected_devices must be a list')
+                    continue
+                presence_reports.append((index, connected_devices))
+                continue
+
+            mac_address = event.get('mac_address')
+            if not mac_address:
+                results[index] = _result(index, event_type, 'error', 'MAC address required')
+                continue
+            if not active_session:
+                results[index] = _result(index, event_type, 'ignored', 'No active session', mac_address=mac_address)
+                continue
+
+            station_events.setdefault(mac_address, []).append((index, event_type, event))
+
+        # Only the most recent presence snapshot in a batch is kept
+        latest_presence = presence_reports[-1][1] if presence_reports else None
+        for index, connected_devices in presence_reports[:-1]:
+            results[index] = _result(index, 'presence', 'ok', 'Superseded by a later presence report')
+        if presence_reports:
+            index = presence_reports[-1][0]
+            results[index] = _result(index, 'presence', 'ok', 'Presence data updated',
+                                     device_count=len(latest_presence))
+
+        created_count = updated_count = 0
+        if station_events:
+            existing = {
+                device.mac_address: device
+                for device in ConnectedDevice.objects.filter(
+                    network_session=active_session,
+                    mac_address__in=list(station_events)
+                )
+            }
+            to_create, to_update = [], []
+
+            for mac_address, mac_events in station_events.items():
+                connected_device = existing.get(mac_address)
+                is_new = connected_device is None
+
+                for index, event_type, event in mac_events:
+                    if event_type == 'connect':
+                        if connected_device is None:
+                            connected_device = ConnectedDevice(
+                                network_session=active_session,
+                                mac_address=mac_address
+                            )
+                        connected_device.device_name = event.get('device_name', 'Unknown Device')
+                        connected_device.ip_address = event.get('ip_address') or None
+                        connected_device.is_connected = True
+                        connected_device.connected_at = now
+                        connected_device.disconnected_at = None
+                        results[index] = _result(index, event_type, 'ok', 'Device connection recorded',
+                                                 mac_address=mac_address)
+                    elif connected_device is None or not connected_device.is_connected:
+                        results[index] = _result(index, event_type, 'warning',
+                                                 'Device was not found in connected devices',
+                                                 mac_address=mac_address)
+                    else:
+                        connected_device.is_connected = False
+                        connected_device.disconnected_at = now
+                        results[index] = _result(index, event_type, 'ok', 'Device disconnection recorded',
+                                                 mac_address=mac_address)
+
+                if connected_device is None:
+                    continue
+                if is_new:
+                    to_create.append(connected_device)
+                else:
+                    to_update.append(connected_device)
+
+            if to_create:
+                ConnectedDevice.objects.bulk_create(to_create)
+            if to_update:
+                ConnectedDevice.objects.bulk_update(to_update, CONNECTED_DEVICE_FIELDS)
+            created_count, updated_count = len(to_create), len(to_update)
+
+    record_heartbeat(device_id, now)
+
+    if latest_presence is not None:
+        get_presence_store().set_members(device_id, latest_presence)
+        record_station_count(device_id, len(latest_presence))
+        maybe_record_sample(device_id)
+
+    summary = {
+        'received': len(events),
+        'applied': sum(1 for result in results if result['status'] == 'ok'),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+        'created': created_count,
+        'updated': updated_count,
+    }
+    return results, summary, active_session
@@ -0,0 +1,295 @@
+"""
+🚦 Rate limiting and load shedding for the device API
+
+Every device endpoint belongs to an endpoint class. Each device has a token
+bucket per class, kept in a shared cache so that all workers draw from the same
+bucket. A request that finds its bucket empty gets a cheap 429 with a
+``Retry-After`` header telling the firmware how long to wait; the view, and its
+database work, never run.
+
+The limiter also watches how long admitted device requests take (an EWMA per
+worker). When that latency crosses ``SHED_LATENCY_MS`` the worker sheds whole
+classes with a 503 + ``Retry-After``, lowest priority first: heartbeats at the
+threshold, then presence and commands at twice it, then session calls and
+station reports at four times it. Attendance marks are never shed. Shedding stops by itself once
+latency recovers, or when no request has been measured for ``SHED_STALE_AFTER``
+seconds.
+
+Throttled and shed requests are counted per class in the shared cache and
+reported by ``GET api/esp32/rate-limit-status/``.
+
+Configured through ``settings.DEVICE_RATE_LIMIT``:
+
+    DEVICE_RATE_LIMIT = {
+        'ENABLED': True,
+        'CACHE': 'default',         # use a shared cache (Redis/Memcached) with several workers
+        'SHED_LATENCY_MS': 1000,    # 0 disables load shedding
+        'SHED_RETRY_AFTER': 15,
+        'SHED_STALE_AFTER': 10,
+        'CLASSES': {                # overrides merged into ENDPOINT_CLASSES
+            'heartbeat': {'RATE': 12, 'BURST': 5},   # RATE is tokens per minute
+        },
+    }
+
+The bucket update is a cache read then write, not an atomic operation, so two
+requests from the same device landing at the same instant may both spend the
+last token. Devices send their requests one after another, so this only lets
+an occasional extra request through.
+"""
+import math
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+from .device_credentials import claimed_device_id
+
+# Lower PRIORITY values are shed last; 0 is never shed
+ENDPOINT_CLASSES = {
+    'attendance': {'RATE': 600, 'BURST': 120, 'PRIORITY': 0},
+    # Offline buffer uploads carry attendance marks too
+    'sync': {'RATE': 60, 'BURST': 10, 'PRIORITY': 0},
+    'session': {'RATE': 30, 'BURST': 10, 'PRIORITY': 1},
+    # Students joining the gateway's network at the start of a class
+    'stations': {'RATE': 600, 'BURST': 150, 'PRIORITY': 1},
+    'presence': {'RATE': 60, 'BURST': 15, 'PRIORITY': 2},
+    'commands': {'RATE': 60, 'BURST': 5, 'PRIORITY': 2},
+    'heartbeat': {'RATE': 12, 'BURST': 5, 'PRIORITY': 3},
+}
+
+# Long-polls take as long as they wait, so they say nothing about server latency
+UNTIMED_CLASSES = {'commands'}
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'SHED_LATENCY_MS': 1000,
+    'SHED_RETRY_AFTER': 15,
+    'SHED_STALE_AFTER': 10,
+    'CLASSES': {},
+}
+
+KEY_PREFIX = 'esp32_ratelimit'
+OUTCOMES = ('throttled', 'shed')
+
+
+def rate_limit_setting(name):
+    return getattr(settings, 'DEVICE_RATE_LIMIT', {}).get(name, DEFAULTS[name])
+
+
+def class_limits(endpoint_class):
+    """RATE (per minute), BURST and PRIORITY of an endpoint class, with settings overrides"""
+    return {**ENDPOINT_CLASSES[endpoint_class], **rate_limit_setting('CLASSES').get(endpoint_class, {})}
+
+
+def limiter_cache():
+    return caches[rate_limit_setting('CACHE')]
+
+
+class LatencyMonitor:
+    """Exponentially weighted moving average of device request latency in this worker"""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self._average = 0.0
+        self._updated = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            if self._updated:
+                self._average += self.alpha * (seconds - self._average)
+            else:
+                self._average = seconds
+            self._updated = time.monotonic()
+
+    def current_ms(self):
+        """Recent latency in milliseconds, or 0 when nothing was measured lately"""
+        with self._lock:
+            if not self._updated or time.monotonic() - self._updated > rate_limit_setting('SHED_STALE_AFTER'):
+                return 0.0
+            return self._average * 1000
+
+
+latency_monitor = LatencyMonitor()
+
+
+def shed_priority():
+    """Classes with this PRIORITY or higher are being shed, or None when nothing is"""
+    threshold = rate_limit_setting('SHED_LATENCY_MS')
+    latency = latency_monitor.current_ms()
+    if not threshold or latency < threshold:
+        return None
+    lowest = max(limits['PRIORITY'] for limits in ENDPOINT_CLASSES.values())
+    doublings = int(math.log2(latency / threshold))
+    return max(lowest - doublings, 1)
+
+
+def _bucket_key(endpoint_class, device_key):
+    return f'{KEY_PREFIX}:{endpoint_class}:{device_key}'
+
+
+def _counter_key(endpoint_class, outcome):
+    return f'{KEY_PREFIX}:count:{endpoint_class}:{outcome}'
+
+
+def _refill(state, limits, now):
+    """Tokens in a bucket at `now` (a missing bucket is full)"""
+    if state is None:
+        return float(limits['BURST'])
+    tokens, updated = state
+    return min(float(limits['BURST']), tokens + (now - updated) * limits['RATE'] / 60)
+
+
+def _spend(tokens, limits, now):
+    """(new bucket state or None when denied, seconds until a token is available)"""
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return None, (1 - tokens) * 60 / limits['RATE']
+
+
+def _bucket_timeout(limits):
+    # Once a bucket would be full again there is nothing left to remember
+    return math.ceil(limits['BURST'] * 60 / limits['RATE']) + 1
+
+
+def take_token(endpoint_class, device_key):
+    """Spend a token from the device's bucket: (allowed, retry_after seconds)"""
+    limits = class_limits(endpoint_class)
+    cache = limiter_cache()
+    key = _bucket_key(endpoint_class, device_key)
+    now = time.time()
+
+    state, retry_after = _spend(_refill(cache.get(key), limits, now), limits, now)
+    if state is None:
+        return False, retry_after
+    cache.set(key, state, timeout=_bucket_timeout(limits))
+    return True, 0
+
+
+async def atake_token(endpoint_class, device_key):
+    """Async version of take_token()"""
+    limits = class_limits(endpoint_class)
+    cache = limiter_cache()
+    key = _bucket_key(endpoint_class, device_key)
+    now = time.time()
+
+    state, retry_after = _spend(_refill(await cache.aget(key), limits, now), limits, now)
+    if state is None:
+        return False, retry_after
+    await cache.aset(key, state, timeout=_bucket_timeout(limits))
+    return True, 0
+
+
+def count_rejection(endpoint_class, outcome):
+    cache = limiter_cache()
+    key = _counter_key(endpoint_class, outcome)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+async def acount_rejection(endpoint_class, outcome):
+    cache = limiter_cache()
+    key = _counter_key(endpoint_class, outcome)
+    if not await cache.aadd(key, 1, timeout=None):
+        await cache.aincr(key)
+
+
+def rate_limit_stats():
+    """Limits and rejection counts per endpoint class, plus this worker's shedding state"""
+    counts = limiter_cache().get_many(
+        [_counter_key(endpoint_class, outcome) for endpoint_class in ENDPOINT_CLASSES for outcome in OUTCOMES]
+    )
+    classes = {}
+    for endpoint_class in ENDPOINT_CLASSES:
+        limits = class_limits(endpoint_class)
+        classes[endpoint_class] = {
+            'rate_per_minute': limits['RATE'],
+            'burst': limits['BURST'],
+            'priority': limits['PRIORITY'],
+            **{outcome: counts.get(_counter_key(endpoint_class, outcome), 0) for outcome in OUTCOMES},
+        }
+    return {
+        'enabled': rate_limit_setting('ENABLED'),
+        'latency_ms': round(latency_monitor.current_ms(), 1),
+        'shedding_priority': shed_priority(),
+        'classes': classes,
+    }
+
+
+def _device_key(request):
+    device_id = getattr(request, 'esp32_device_id', None) or claimed_device_id(request)
+    return device_id or f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _is_shed(endpoint_class):
+    priority = shed_priority()
+    class_priority = class_limits(endpoint_class)['PRIORITY']
+    return priority is not None and class_priority > 0 and class_priority >= priority
+
+
+def _retry_response(message, status, retry_after):
+    retry_after = max(1, math.ceil(retry_after))
+    response = JsonResponse({'error': message, 'retry_after': retry_after}, status=status)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _throttled_response(retry_after):
+    return _retry_response('Rate limit exceeded', 429, retry_after)
+
+
+def _shed_response():
+    return _retry_response('Server busy, try again later', 503, rate_limit_setting('SHED_RETRY_AFTER'))
+
+
+def device_throttle(endpoint_class):
+    """Rate-limit a device view per device_id and shed it under load (see module docstring)"""
+    class_limits(endpoint_class)  # unknown classes fail at import time
+
+    def decorator(view_func):
+        timed = endpoint_class not in UNTIMED_CLASSES
+
+        if iscoroutinefunction(view_func):
+            async def _wrapped_view(request, *args, **kwargs):
+                if not rate_limit_setting('ENABLED'):
+                    return await view_func(request, *args, **kwargs)
+                if _is_shed(endpoint_class):
+                    await acount_rejection(endpoint_class, 'shed')
+                    return _shed_response()
+                allowed, retry_after = await atake_token(endpoint_class, _device_key(request))
+                if not allowed:
+                    await acount_rejection(endpoint_class, 'throttled')
+                    return _throttled_response(retry_after)
+
+                started = time.perf_counter()
+                try:
+                    return await view_func(request, *args, **kwargs)
+                finally:
+                    if timed:
+                        latency_monitor.observe(time.perf_counter() - started)
+        else:
+            def _wrapped_view(request, *args, **kwargs):
+                if not rate_limit_setting('ENABLED'):
+                    return view_func(request, *args, **kwargs)
+                if _is_shed(endpoint_class):
+                    count_rejection(endpoint_class, 'shed')
+                    return _shed_response()
+                allowed, retry_after = take_token(endpoint_class, _device_key(request))
+                if not allowed:
+                    count_rejection(endpoint_class, 'throttled')
+                    return _throttled_response(retry_after)
+
+                started = time.perf_counter()
+                try:
+                    return view_func(request, *args, **kwargs)
+                finally:
+                    if timed:
+                        latency_monitor.observe(time.perf_counter() - started)
+
+        return wraps(view_func)(_wrapped_view)
+    return decorator
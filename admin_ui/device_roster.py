@@ -0,0 +1,184 @@
+"""
+📋 Roster snapshots for on-device enrollment checks
+
+Checking each captive-portal submission against the server costs the gateway a
+WAN round trip per student. Instead, when a session starts the gateway downloads
+the roster of the session's course and term once
+
+    GET api/esp32/roster/?device_id=...
+
+and rejects students who are not on it locally, forwarding only plausible marks.
+The roster is sent as hashes, not matric numbers: each entry is the first four
+bytes of SHA-256 over ``"<salt>:<MATRIC_NO>"`` (matric number stripped and
+upper-cased), as a big-endian uint32. The sorted, de-duplicated values are packed
+back to back and base64-encoded, so a class of 1000 students is 4 KB of RAM and a
+binary search on the device. With 32-bit hashes a non-enrolled student slips past
+the local check about once in four million tries; the server still checks
+enrollment on every mark.
+
+Every enrollment added or removed is written to RosterChange, whose id is the
+roster ``version``. A gateway that already holds a roster sends its version back
+
+    GET api/esp32/roster/?device_id=...&session_id=...&since=<version>
+
+and receives only the hashes added and removed since then (or a fresh snapshot
+when the delta would not be smaller). While a session is active, every
+enrollment change also queues a ``roster_update`` command for its device, so a
+long-polling gateway fetches the delta straight away.
+
+The server keeps each term's matric numbers cached too (``roster_members``), so
+paths that check enrollment per request, like QR marking, skip the query.
+"""
+import base64
+import hashlib
+import hmac
+import struct
+
+from django.conf import settings
+from django.db import transaction
+
+from .device_commands import queue_command
+from .models import CourseEnrollment, DeviceCommand, NetworkSession, RosterChange
+from .session_registry import registry_cache
+
+HASH_FORMAT = 'sha256-32'
+HASH_BYTES = 4
+MEMBERS_TTL = 600
+
+
+def normalize_matric(matric_no):
+    return str(matric_no).strip().upper()
+
+
+def roster_salt(course_id, session, semester):
+    """Per course and term, so the same student hashes differently on every roster"""
+    term = f'{course_id}|{session}|{semester}'.encode()
+    return hmac.new(settings.SECRET_KEY.encode(), term, hashlib.sha256).hexdigest()[:16]
+
+
+def matric_hash(salt, matric_no):
+    digest = hashlib.sha256(f'{salt}:{normalize_matric(matric_no)}'.encode()).digest()
+    return int.from_bytes(digest[:HASH_BYTES], 'big')
+
+
+def pack_hashes(hashes):
+    """Sorted, de-duplicated uint32 hashes as base64 of their big-endian bytes"""
+    values = sorted(set(hashes))
+    return base64.b64encode(struct.pack(f'>{len(values)}I', *values)).decode()
+
+
+def _changes(course_id, session, semester):
+    return RosterChange.objects.filter(course_id=course_id, session=session, semester=semester)
+
+
+def roster_version(course_id, session, semester):
+    """Id of the term's latest roster change (0 if its roster never changed since tracking began)"""
+    return _changes(course_id, session, semester).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def _term_fields(active_session, version, salt):
+    return {
+        'session_id': active_session['id'],
+        'course_code': active_session['course_code'],
+        'session': active_session['session'],
+        'semester': active_session['semester'],
+        'version': version,
+        'format': HASH_FORMAT,
+        'salt': salt,
+    }
+
+
+def roster_snapshot(active_session):
+    """Full roster of an active session (as returned by session_registry.get_active_session)"""
+    term = (active_session['course_id'], active_session['session'], active_session['semester'])
+    # Version first: a change landing in between shows up in both, and applying it twice is harmless
+    version = roster_version(*term)
+    salt = roster_salt(*term)
+    matric_nos = CourseEnrollment.objects.filter(
+        course_id=term[0], session=term[1], semester=term[2]
+    ).values_list('student_id', flat=True)
+    hashes = [matric_hash(salt, matric_no) for matric_no in matric_nos]
+    return {
+        **_term_fields(active_session, version, salt),
+        'delta': False,
+        'count': len(set(hashes)),
+        'hashes': pack_hashes(hashes),
+    }
+
+
+def roster_delta(active_session, since):
+    """Hashes added and removed after version `since`, or None when a snapshot is the better answer"""
+    term = (active_session['course_id'], active_session['session'], active_session['semester'])
+    version = roster_version(*term)
+    if since > version:
+        return None  # a version this term never had
+
+    latest = {}
+    for matric_no, action in _changes(*term).filter(id__gt=since).order_by('id').values_list('matric_no', 'action'):
+        latest[matric_no] = action
+    if latest and len(latest) >= CourseEnrollment.objects.filter(
+        course_id=term[0], session=term[1], semester=term[2]
+    ).count():
+        return None
+
+    salt = roster_salt(*term)
+    added = [matric_hash(salt, matric_no) for matric_no, action in latest.items() if action == 'add']
+    removed = [matric_hash(salt, matric_no) for matric_no, action in latest.items() if action == 'remove']
+    return {
+        **_term_fields(active_session, version, salt),
+        'delta': True,
+        'since': since,
+        'added': pack_hashes(added),
+        'removed': pack_hashes(removed),
+    }
+
+
+def _members_key(course_id, session, semester):
+    # The salt is a fixed-length hex digest of the term, safe in any cache key
+    return f'device_roster:members:{roster_salt(course_id, session, semester)}'
+
+
+def roster_members(course_id, session, semester):
+    """Normalized matric numbers enrolled in a course for a term (cached until the roster changes)"""
+    cache = registry_cache()
+    key = _members_key(course_id, session, semester)
+    members = cache.get(key)
+    if members is None:
+        members = frozenset(normalize_matric(matric_no) for matric_no in CourseEnrollment.objects.filter(
+            course_id=course_id, session=session, semester=semester
+        ).values_list('student_id', flat=True))
+        cache.set(key, members, MEMBERS_TTL)
+    return members
+
+
+def roster_etag(active_session, version):
+    return f'"roster-{active_session["id"]}-{version}"'
+
+
+def notify_roster_change(course_id, session, semester):
+    """Queue a roster_update for every device running a session of this course and term"""
+    version = roster_version(course_id, session, semester)
+    network_sessions = NetworkSession.objects.filter(
+        is_active=True, course_id=course_id, session=session, semester=semester
+    ).select_related('esp32_device').prefetch_related('access_points__esp32_device')
+    for network_session in network_sessions:
+        # Every access point of the session checks students against the roster
+        devices = [network_session.esp32_device] + [
+            access_point.esp32_device for access_point in network_session.access_points.all()
+        ]
+        for device in devices:
+            # Older undelivered updates are superseded: the device fetches the latest delta either way
+            DeviceCommand.objects.filter(
+                esp32_device=device, command='roster_update', delivered_at__isnull=True
+            ).delete()
+            queue_command(device, 'roster_update', {'session_id': network_session.id, 'version': version})
+
+
+def record_roster_change(enrollment, action):
+    """Log an enrollment added or removed and tell devices once the transaction commits"""
+    term = (enrollment.course_id, enrollment.session, enrollment.semester)
+    RosterChange.objects.create(
+        course_id=term[0], session=term[1], semester=term[2], matric_no=enrollment.student_id, action=action
+    )
+    transaction.on_commit(lambda: registry_cache().delete(_members_key(*term)))
+    transaction.on_commit(lambda: notify_roster_change(*term))
@@ -0,0 +1,306 @@
+"""
+🔄 Offline buffer reconciliation for ESP32 gateways
+
+When the hotspot or campus uplink drops, a gateway keeps station joins/leaves,
+attendance marks and presence reports in a local buffer. Each buffered event
+gets the next sequence number of the buffer (``stream``) and the device's clock
+time. Once the uplink is back, the gateway asks how far the server got
+
+    GET  api/esp32/sync/ack/?device_id=...&stream=...   -> {'last_sequence': n}
+
+and uploads everything after that in one request
+
+    POST api/esp32/sync/upload/
+    {"device_id": "...", "stream": "...", "events": [
+        {"seq": 41, "ts": 1760690000, "type": "connect", "mac_address": "...", "ip_address": "..."},
+        {"seq": 42, "ts": 1760690012, "type": "mark", "matric_no": "...", "mac_address": "..."},
+        {"seq": 43, "ts": "2025-10-17T09:14:03+01:00", "type": "disconnect", "mac_address": "..."},
+        {"seq": 44, "ts": 1760690400, "type": "presence", "connected_devices": ["..."]}
+    ]}
+
+Events are applied in sequence order. Sequences at or below the stream's
+``last_sequence`` are duplicates of an earlier upload and are skipped, so a
+retried upload is harmless. Each event is attributed to the network session that
+was running on the device at its timestamp (``ts``, unix seconds or ISO 8601;
+events without one count as happening now), not to whichever session is active
+when the upload arrives. Every event with a valid sequence number is acknowledged,
+including ones that could not be applied (unknown student, no session at that
+time), since resending them would not help.
+
+A device picks a new ``stream`` id whenever its counter restarts (e.g. after a
+reboot that lost the counter); each stream keeps its own position.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .access_points import record_station_count
+from .attendance_spool import apply_marks
+from .heartbeats import record_heartbeat
+from .models import ConnectedDevice, CourseEnrollment, DeviceSyncStream, ESP32Device, NetworkSession
+from .presence import get_presence_store
+
+EVENT_TYPES = ('connect', 'disconnect', 'mark', 'presence')
+
+# Upper bound on events in one upload; a longer outage is uploaded in several pages
+MAX_SYNC_EVENTS = 1000
+MAX_STREAM_LENGTH = 32
+
+# Device clocks running ahead by more than this are not trusted
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+# Older presence reports describe who was there then, not now
+PRESENCE_MAX_AGE = timedelta(minutes=5)
+
+CONNECTED_DEVICE_FIELDS = ['device_name', 'ip_address', 'is_connected', 'connected_at', 'disconnected_at']
+
+
+def last_sequence(device_id, stream):
+    """Highest sequence number applied from a device's buffer (0 if nothing was)"""
+    return DeviceSyncStream.objects.filter(
+        esp32_device__device_id=device_id, stream=stream
+    ).values_list('last_sequence', flat=True).first() or 0
+
+
+def parse_event_time(value, now):
+    """Aware datetime for a device timestamp (unix seconds or ISO 8601), or None if unusable"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            moment = datetime.fromtimestamp(value, tz=dt_timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    elif isinstance(value, str):
+        moment = parse_datetime(value)
+        if moment is None:
+            return None
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+    else:
+        return None
+    return moment if moment <= now + MAX_CLOCK_SKEW else None
+
+
+def _result(index, event, status, message, **extra):
+    result = {'index': index, 'seq': event.get('seq'), 'type': event.get('type'), 'status': status, 'message': message}
+    result.update(extra)
+    return result
+
+
+def _sessions_between(esp32_device, earliest, latest):
+    """Network sessions of a device that overlap [earliest, latest], oldest first"""
+    # Including sessions whose access point pool the device served
+    return list(NetworkSession.objects.filter(
+        Q(esp32_device=esp32_device) | Q(access_points__esp32_device=esp32_device),
+        start_time__lte=latest
+    ).filter(
+        Q(end_time__gte=earliest) | Q(end_time__isnull=True, is_active=True)
+    ).select_related('course').distinct().order_by('start_time'))
+
+
+def _session_at(sessions, moment):
+    """The session running at `moment` (the latest started one if several overlap)"""
+    for network_session in reversed(sessions):
+        if network_session.start_time <= moment and (
+            network_session.end_time is None or moment <= network_session.end_time
+        ):
+            return network_session
+    return None
+
+
+def _validate(index, event, acknowledged, seen):
+    """(seq, error result); seq is None when the event cannot be acknowledged"""
+    if not isinstance(event, dict):
+        return None, _result(index, {}, 'error', 'Event must be an object')
+    seq = event.get('seq')
+    if isinstance(seq, bool) or not isinstance(seq, int) or seq <= 0:
+        return None, _result(index, event, 'error', 'seq must be a positive integer')
+    if seq <= acknowledged or seq in seen:
+        return seq, _result(index, event, 'duplicate', 'Already applied')
+    if event.get('type') not in EVENT_TYPES:
+        return seq, _result(index, event, 'error', f"Unknown event type: {event.get('type')}")
+    if event['type'] in ('connect', 'disconnect') and not event.get('mac_address'):
+        return seq, _result(index, event, 'error', 'MAC address required')
+    if event['type'] == 'mark' and not event.get('matric_no'):
+        return seq, _result(index, event, 'error', 'matric_no required')
+    if event['type'] == 'presence' and not isinstance(event.get('connected_devices', []), list):
+        return seq, _result(index, event, 'error', 'connected_devices must be a list')
+    return seq, None
+
+
+def _apply_station_events(station_events, results):
+    """Fold connect/disconnect events into ConnectedDevice rows: (created, updated)"""
+    existing = {
+        (device.network_session_id, device.mac_address): device
+        for device in ConnectedDevice.objects.filter(
+            network_session_id__in={session.id for session, _ in station_events},
+            mac_address__in={mac_address for _, mac_address in station_events}
+        )
+    }
+    to_create, to_update = [], []
+
+    for (network_session, mac_address), mac_events in station_events.items():
+        connected_device = existing.get((network_session.id, mac_address))
+        is_new = connected_device is None
+
+        for index, event, moment in mac_events:
+            if event['type'] == 'connect':
+                if connected_device is None:
+                    connected_device = ConnectedDevice(network_session=network_session, mac_address=mac_address)
+                connected_device.device_name = event.get('device_name', 'Unknown Device')
+                connected_device.ip_address = event.get('ip_address') or None
+                connected_device.is_connected = True
+                connected_device.connected_at = moment
+                connected_device.disconnected_at = None
+                results[index] = _result(index, event, 'ok', 'Device connection recorded',
+                                         session_id=network_session.id)
+            elif connected_device is None or not connected_device.is_connected:
+                results[index] = _result(index, event, 'warning', 'Device was not found in connected devices',
+                                         session_id=network_session.id)
+            else:
+                connected_device.is_connected = False
+                connected_device.disconnected_at = moment
+                results[index] = _result(index, event, 'ok', 'Device disconnection recorded',
+                                         session_id=network_session.id)
+
+        if connected_device is None:
+            continue
+        (to_create if is_new else to_update).append(connected_device)
+
+    if to_create:
+        # connected_at is auto_now_add: bulk_create stamps new rows with the upload time, so put the
+        # device's time back afterwards
+        connected_at = [device.connected_at for device in to_create]
+        ConnectedDevice.objects.bulk_create(to_create)
+        for device, moment in zip(to_create, connected_at):
+            device.connected_at = moment
+    if to_create or to_update:
+        ConnectedDevice.objects.bulk_update(to_create + to_update, CONNECTED_DEVICE_FIELDS)
+    return len(to_create), len(to_update)
+
+
+def _apply_marks(esp32_device, marks, results):
+    """Record attendance marks, each in the attendance session of its network session's day"""
+    enrolled = set(CourseEnrollment.objects.filter(
+        student_id__in={event['matric_no'] for _, event, _, _ in marks},
+        course_id__in={network_session.course_id for _, _, _, network_session in marks}
+    ).values_list('student_id', 'course_id', 'session', 'semester'))
+
+    rows = []
+    for index, event, moment, network_session in marks:
+        matric_no = event['matric_no']
+        if (matric_no, network_session.course_id, network_session.session, network_session.semester) not in enrolled:
+            results[index] = _result(index, event, 'error', 'Student not enrolled in this course',
+                                     session_id=network_session.id)
+            continue
+        rows.append((index, {
+            'student_id': matric_no,
+            'course_id': network_session.course_id,
+            'lecturer_id': network_session.lecturer_id,
+            'session': network_session.session,
+            'semester': network_session.semester,
+            'date': timezone.localdate(moment).isoformat(),
+            'esp32_device_id': esp32_device.id,
+            'device_mac': event.get('mac_address'),
+            'update_existing': False,
+            'marked_at': moment.isoformat(),
+        }))
+
+    applied, failures = apply_marks(rows) if rows else ([], {})
+    by_index = {index: (event, network_session.id) for index, event, _, network_session in marks}
+    for index in applied:
+        event, session_id = by_index[index]
+        results[index] = _result(index, event, 'ok', 'Attendance recorded', session_id=session_id)
+    for index, reason in failures.items():
+        event, session_id = by_index[index]
+        results[index] = _result(index, event, 'error', reason, session_id=session_id)
+    return len(applied)
+
+
+def apply_sync_batch(device_id, stream, events):
+    """
+    Apply buffered events for one device stream in sequence order.
+
+    Returns (results, summary, last_sequence) where results holds one entry per
+    event in the order received. Raises ESP32Device.DoesNotExist for unknown devices.
+    """
+    now = timezone.now()
+    results = [None] * len(events)
+
+    with transaction.atomic():
+        esp32_device = ESP32Device.objects.get(device_id=device_id)
+        # Locked, so two uploads of the same stream are applied one after the other
+        position, _ = DeviceSyncStream.objects.select_for_update().get_or_create(
+            esp32_device=esp32_device, stream=stream
+        )
+
+        pending, seen = [], set()
+        for index, event in enumerate(events):
+            seq, error = _validate(index, event, position.last_sequence, seen)
+            if seq is not None:
+                seen.add(seq)
+            if error:
+                results[index] = error
+                continue
+            moment = parse_event_time(event.get('ts'), now) or now
+            pending.append((seq, index, event, moment))
+        pending.sort(key=lambda entry: entry[0])
+
+        sessions = _sessions_between(
+            esp32_device, min(entry[3] for entry in pending), max(entry[3] for entry in pending)
+        ) if pending else []
+
+        station_events, marks, latest_presence = {}, [], None
+        for seq, index, event, moment in pending:
+            if event['type'] == 'presence':
+                # Only the most recent presence report in an upload is kept
+                if latest_presence:
+                    results[latest_presence[0]] = _result(latest_presence[0], latest_presence[1], 'ok',
+                                                          'Superseded by a later presence report')
+                latest_presence = (index, event, moment)
+                continue
+
+            network_session = _session_at(sessions, moment)
+            if network_session is None:
+                results[index] = _result(index, event, 'ignored', 'No session was active at this time')
+            elif event['type'] == 'mark':
+                marks.append((index, event, moment, network_session))
+            else:
+                station_events.setdefault((network_session, event['mac_address']), []).append((index, event, moment))
+
+        created = updated = marked = 0
+        if station_events:
+            created, updated = _apply_station_events(station_events, results)
+        if marks:
+            marked = _apply_marks(esp32_device, marks, results)
+
+        if seen:
+            position.last_sequence = max(position.last_sequence, max(seen))
+            position.save(update_fields=['last_sequence', 'updated_at'])
+
+    if latest_presence:
+        index, event, moment = latest_presence
+        if now - moment <= PRESENCE_MAX_AGE:
+            connected_devices = event.get('connected_devices', [])
+            get_presence_store().set_members(device_id, connected_devices)
+            record_station_count(device_id, len(connected_devices))
+            results[index] = _result(index, event, 'ok', 'Presence data updated', device_count=len(connected_devices))
+        else:
+            results[index] = _result(index, event, 'ok', 'Presence report too old to replace current presence')
+
+    record_heartbeat(device_id, now)
+
+    summary = {
+        'received': len(events),
+        'applied': sum(1 for result in results if result['status'] == 'ok'),
+        'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+        'ignored': sum(1 for result in results if result['status'] == 'ignored'),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+        'created': created,
+        'updated': updated,
+        'marked': marked,
+    }
+    return results, summary, position.last_sequence
@@ -0,0 +1,238 @@
+"""
+💓 ESP32 heartbeat recorder
+
+Gateways send a heartbeat every few seconds and most device API calls also count
+as "device seen". Saving the ESP32Device row for each of them made heartbeat
+timestamps the bulk of all database writes. The recorder keeps the latest
+heartbeat per device instead and writes ``last_heartbeat``/``last_seen`` back in
+one bulk UPDATE at most every ``FLUSH_INTERVAL`` seconds. The flush piggybacks on
+incoming heartbeats, so no background worker is needed.
+
+Liveness checks read through the recorder (``online_devices``/``apply_heartbeats``)
+so pages see the newest heartbeat even when it has not been flushed yet.
+
+Backends are pluggable through ``settings.HEARTBEAT_RECORDER``:
+
+    HEARTBEAT_RECORDER = {
+        'BACKEND': 'admin_ui.heartbeats.LocalHeartbeatRecorder',  # or RedisHeartbeatRecorder
+        'FLUSH_INTERVAL': 30,
+        'OPTIONS': {'url': 'redis://localhost:6379/0'},            # Redis only
+    }
+
+LocalHeartbeatRecorder keeps beats in the worker's memory: another worker sees
+them once flushed, which is well inside the 5 minute liveness window.
+RedisHeartbeatRecorder shares them between all workers and lets one worker
+flush per interval.
+"""
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ESP32Device
+
+DEFAULT_BACKEND = 'admin_ui.heartbeats.LocalHeartbeatRecorder'
+DEFAULT_FLUSH_INTERVAL = 30  # seconds
+
+# A device is online when it sent a heartbeat within this window
+ONLINE_WINDOW = timedelta(minutes=5)
+
+# Devices per UPDATE statement (keeps the CASE expression under SQLite's parameter limit)
+FLUSH_BATCH_SIZE = 100
+
+
+class BaseHeartbeatRecorder:
+    """Interface shared by all heartbeat recorder backends"""
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, **options):
+        self.flush_interval = flush_interval
+        self.options = options
+
+    def record(self, device_id, when=None):
+        """Remember a heartbeat and flush pending heartbeats when the interval has passed"""
+        self._store(device_id, when or timezone.now())
+        self._write(self._take_pending(force=False))
+
+    def flush(self):
+        """Write every pending heartbeat to the database now; returns the number of devices"""
+        beats = self._take_pending(force=True)
+        self._write(beats)
+        return len(beats)
+
+    def last_heartbeats(self, device_ids):
+        """Return {device_id: datetime} of the latest recorded heartbeats"""
+        raise NotImplementedError
+
+    def _store(self, device_id, when):
+        raise NotImplementedError
+
+    def _take_pending(self, force):
+        """Remove and return {device_id: datetime} to flush, or {} if no flush is due"""
+        raise NotImplementedError
+
+    def _write(self, beats):
+        items = list(beats.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            when = Case(
+                *[When(device_id=device_id, then=Value(beat)) for device_id, beat in batch],
+                output_field=DateTimeField()
+            )
+            ESP32Device.objects.filter(
+                device_id__in=[device_id for device_id, _ in batch]
+            ).update(last_heartbeat=when, last_seen=when)
+
+
+class LocalHeartbeatRecorder(BaseHeartbeatRecorder):
+    """Heartbeats kept in this process; flushed on the interval and at exit"""
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, **options):
+        super().__init__(flush_interval=flush_interval, **options)
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._pending = {}
+        self._last_flush = float('-inf')
+
+    def last_heartbeats(self, device_ids):
+        with self._lock:
+            return {device_id: self._latest[device_id] for device_id in device_ids if device_id in self._latest}
+
+    def _store(self, device_id, when):
+        with self._lock:
+            self._latest[device_id] = when
+            self._pending[device_id] = when
+
+    def _take_pending(self, force):
+        with self._lock:
+            now = time.monotonic()
+            if not self._pending or (not force and now - self._last_flush < self.flush_interval):
+                return {}
+            beats, self._pending = self._pending, {}
+            self._last_flush = now
+            return beats
+
+
+class RedisHeartbeatRecorder(BaseHeartbeatRecorder):
+    """Heartbeats shared by all workers through Redis; one worker flushes per interval"""
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, **options):
+        super().__init__(flush_interval=flush_interval, **options)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisHeartbeatRecorder requires the 'redis' package (pip install redis)")
+
+        self.prefix = options.get('prefix', 'esp32_heartbeats')
+        self.client = redis.Redis.from_url(
+            options.get('url', 'redis://localhost:6379/0'),
+            decode_responses=True
+        )
+
+    def last_heartbeats(self, device_ids):
+        device_ids = list(device_ids)
+        if not device_ids:
+            return {}
+        values = self.client.hmget(f'{self.prefix}:latest', device_ids)
+        return {
+            device_id: datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+            for device_id, value in zip(device_ids, values) if value
+        }
+
+    def _store(self, device_id, when):
+        timestamp = when.timestamp()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(f'{self.prefix}:latest', device_id, timestamp)
+        pipe.hset(f'{self.prefix}:pending', device_id, timestamp)
+        pipe.execute()
+
+    def _take_pending(self, force):
+        # The flush lock expires by itself, so whichever worker gets it next flushes
+        if not force and not self.client.set(f'{self.prefix}:flush', 1, nx=True, ex=self.flush_interval):
+            return {}
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(f'{self.prefix}:pending')
+        pipe.delete(f'{self.prefix}:pending')
+        pending, _ = pipe.execute()
+        return {
+            device_id: datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+            for device_id, value in pending.items()
+        }
+
+
+_recorder = None
+
+
+def get_heartbeat_recorder():
+    """Return the configured heartbeat recorder (created once per process)"""
+    global _recorder
+    if _recorder is None:
+        config = getattr(settings, 'HEARTBEAT_RECORDER', {})
+        backend = import_string(config.get('BACKEND', DEFAULT_BACKEND))
+        _recorder = backend(
+            flush_interval=config.get('FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+            **config.get('OPTIONS', {})
+        )
+        atexit.register(_flush_at_exit, _recorder)
+    return _recorder
+
+
+def _flush_at_exit(recorder):
+    try:
+        recorder.flush()
+    except Exception:
+        pass
+
+
+def record_heartbeat(device_id, when=None):
+    """Record a heartbeat (or any sign of life) from an ESP32 device"""
+    get_heartbeat_recorder().record(device_id, when)
+
+
+async def arecord_heartbeat(device_id, when=None):
+    """Async version of record_heartbeat()"""
+    await sync_to_async(record_heartbeat)(device_id, when)
+
+
+def apply_heartbeats(devices):
+    """Return the devices as a list with last_heartbeat/last_seen brought up to date from the recorder"""
+    devices = list(devices)
+    latest = get_heartbeat_recorder().last_heartbeats([device.device_id for device in devices])
+    for device in devices:
+        beat = latest.get(device.device_id)
+        if beat is None:
+            continue
+        if device.last_heartbeat is None or beat > device.last_heartbeat:
+            device.last_heartbeat = beat
+        if device.last_seen is None or beat > device.last_seen:
+            device.last_seen = beat
+    return devices
+
+
+def online_devices(devices=None, within=ONLINE_WINDOW):
+    """Active devices with a heartbeat inside the window, most recent first"""
+    if devices is None:
+        devices = ESP32Device.objects.filter(is_active=True)
+    cutoff = timezone.now() - within
+    online = [
+        device for device in apply_heartbeats(devices)
+        if device.last_heartbeat and device.last_heartbeat >= cutoff
+    ]
+    online.sort(key=lambda device: device.last_heartbeat, reverse=True)
+    return online
+
+
+def update_device_fields(device, **fields):
+    """Save only the given ESP32Device fields whose value actually changed; returns their names"""
+    changed = [name for name, value in fields.items() if getattr(device, name) != value]
+    for name in changed:
+        setattr(device, name, fields[name])
+    if changed:
+        device.save(update_fields=changed)
+    return changed
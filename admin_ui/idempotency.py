@@ -0,0 +1,199 @@
+"""
+🔁 Idempotency keys for retried device requests
+
+The ESP32 firmware retries a POST whose response never arrived. Without help
+the retry runs the whole view again: another get_or_create, another save. A
+device that sends
+
+    Idempotency-Key: <unique string per logical request, reused by its retries>
+
+gets the first response stored in a shared cache for ``TTL`` seconds under
+(device, key). A retry is answered from that copy without touching the ORM, with
+``Idempotent-Replayed: true`` added. While the first request is still running, a
+duplicate gets a 409 with ``Retry-After: 1`` rather than running in parallel.
+Reusing a key with a different body is refused with a 422.
+
+Only responses the retry would get again are stored: server errors and 429s are
+not, so retrying them runs the view again. Requests without the header are
+untouched.
+
+A signed retry that resends the first attempt's headers reuses its nonce.
+device_endpoint then asks replay_stored_response() before rejecting it as a
+replay: a valid signature with a stored response for its key gets that response
+(nothing runs again). Without a stored response the retry is still refused, so
+a retry after a failed first attempt must be signed again with a fresh nonce.
+
+Configured through ``settings.DEVICE_IDEMPOTENCY``:
+
+    DEVICE_IDEMPOTENCY = {
+        'CACHE': 'default',   # use a shared cache (Redis/Memcached) with several workers
+        'TTL': 600,           # how long a stored response is replayed (seconds)
+        'LOCK_TIMEOUT': 60,   # a request still "in flight" after this long is considered lost
+    }
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+from .device_credentials import claimed_device_id
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TTL': 600,
+    'LOCK_TIMEOUT': 60,
+}
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 128
+KEY_PREFIX = 'esp32_idempotency'
+_IN_FLIGHT = 'in-flight'
+
+
+def idempotency_setting(name):
+    return getattr(settings, 'DEVICE_IDEMPOTENCY', {}).get(name, DEFAULTS[name])
+
+
+def idempotency_cache():
+    return caches[idempotency_setting('CACHE')]
+
+
+def _cache_key(request, key):
+    device_id = getattr(request, 'esp32_device_id', None) or claimed_device_id(request)
+    scope = device_id or f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    # Hashed so any key the device picks is safe to use in a cache key
+    digest = hashlib.sha256(f'{scope}\n{key}'.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def _fingerprint(request):
+    return hashlib.sha256(request.method.encode() + request.get_full_path().encode() + request.body).hexdigest()
+
+
+def _is_storable(response):
+    # A retry of a failed or throttled request should get another attempt
+    return response.status_code < 500 and response.status_code != 429 and not response.streaming
+
+
+def _stored(response, fingerprint):
+    return {
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'content': response.content,
+        'headers': list(response.items()),
+    }
+
+
+def _replay(entry):
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _in_flight_response():
+    response = JsonResponse({'error': f'A request with this {HEADER} is still being processed'}, status=409)
+    response['Retry-After'] = '1'
+    return response
+
+
+def _answer_duplicate(entry, fingerprint):
+    """Response for a key that is already taken (entry is what the cache holds for it)"""
+    if entry is None or entry == _IN_FLIGHT:
+        return _in_flight_response()
+    if entry['fingerprint'] != fingerprint:
+        return JsonResponse({'error': f'{HEADER} was already used for a different request'}, status=422)
+    return _replay(entry)
+
+
+def _check_key(key):
+    if len(key) > MAX_KEY_LENGTH:
+        return JsonResponse({'error': f'{HEADER} is longer than {MAX_KEY_LENGTH} characters'}, status=400)
+    return None
+
+
+def _stored_for_retry(request, entry):
+    if entry is None:
+        return None
+    return _answer_duplicate(entry, _fingerprint(request))
+
+
+def _retry_key(request):
+    key = request.headers.get(HEADER)
+    if request.method != 'POST' or not key or len(key) > MAX_KEY_LENGTH:
+        return None
+    return _cache_key(request, key)
+
+
+def replay_stored_response(request):
+    """Answer for a request whose Idempotency-Key already has an entry, or None if it has none"""
+    cache_key = _retry_key(request)
+    if cache_key is None:
+        return None
+    return _stored_for_retry(request, idempotency_cache().get(cache_key))
+
+
+async def areplay_stored_response(request):
+    """Async version of replay_stored_response()"""
+    cache_key = _retry_key(request)
+    if cache_key is None:
+        return None
+    return _stored_for_retry(request, await idempotency_cache().aget(cache_key))
+
+
+def idempotent(view_func):
+    """Replay the stored response for a retried POST that carries an Idempotency-Key"""
+    if iscoroutinefunction(view_func):
+        async def _wrapped_view(request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if request.method != 'POST' or not key:
+                return await view_func(request, *args, **kwargs)
+            invalid = _check_key(key)
+            if invalid is not None:
+                return invalid
+
+            cache = idempotency_cache()
+            cache_key = _cache_key(request, key)
+            fingerprint = _fingerprint(request)
+            if not await cache.aadd(cache_key, _IN_FLIGHT, timeout=idempotency_setting('LOCK_TIMEOUT')):
+                return _answer_duplicate(await cache.aget(cache_key), fingerprint)
+
+            response = None
+            try:
+                response = await view_func(request, *args, **kwargs)
+            finally:
+                if response is not None and _is_storable(response):
+                    await cache.aset(cache_key, _stored(response, fingerprint), timeout=idempotency_setting('TTL'))
+                else:
+                    await cache.adelete(cache_key)
+            return response
+    else:
+        def _wrapped_view(request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if request.method != 'POST' or not key:
+                return view_func(request, *args, **kwargs)
+            invalid = _check_key(key)
+            if invalid is not None:
+                return invalid
+
+            cache = idempotency_cache()
+            cache_key = _cache_key(request, key)
+            fingerprint = _fingerprint(request)
+            if not cache.add(cache_key, _IN_FLIGHT, timeout=idempotency_setting('LOCK_TIMEOUT')):
+                return _answer_duplicate(cache.get(cache_key), fingerprint)
+
+            response = None
+            try:
+                response = view_func(request, *args, **kwargs)
+            finally:
+                if response is not None and _is_storable(response):
+                    cache.set(cache_key, _stored(response, fingerprint), timeout=idempotency_setting('TTL'))
+                else:
+                    cache.delete(cache_key)
+            return response
+
+    return wraps(view_func)(_wrapped_view)
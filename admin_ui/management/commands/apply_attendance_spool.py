@@ -0,0 +1,58 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from admin_ui.attendance_spool import AttendanceSpool, SpoolApplier, spool_path
+
+
+class Command(BaseCommand):
+    help = 'Apply attendance marks queued in the write-behind spool to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the spool once and exit instead of running continuously',
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='Print the spool queue depth and lag as JSON and exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Marks applied per transaction (default: ATTENDANCE_SPOOL BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        # Our own spool object, so no in-process applier thread is started next to this one
+        spool = AttendanceSpool(spool_path())
+
+        if options['status']:
+            self.stdout.write(json.dumps(spool.stats()))
+            return
+
+        applier = SpoolApplier(spool, batch_size=options['batch_size'])
+
+        if options['once']:
+            started = time.monotonic()
+            applied = applier.drain()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Applied {applied} attendance marks in {time.monotonic() - started:.2f}s. '
+                    f'Spool: {spool.stats()}'
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Applying attendance spool {spool.path} (Ctrl+C to stop)...')
+        )
+        try:
+            applier.run_forever()
+        except KeyboardInterrupt:
+            spool.release_lease(applier.owner)
+            self.stdout.write('Stopped.')
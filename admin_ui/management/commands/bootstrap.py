@@ -0,0 +1,79 @@
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# Arbitrary application-wide key for the PostgreSQL advisory lock
+BOOTSTRAP_LOCK_ID = 720401
+
+
+@contextmanager
+def bootstrap_lock():
+    """
+    Hold an exclusive lock while bootstrapping so that concurrent deploy steps
+    (several release containers, a build and a start command) never migrate at once.
+    PostgreSQL uses an advisory lock shared by every machine; other databases fall
+    back to a lock file next to the project.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [BOOTSTRAP_LOCK_ID])
+            try:
+                yield
+            finally:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [BOOTSTRAP_LOCK_ID])
+        return
+
+    import fcntl
+    with open(os.path.join(settings.BASE_DIR, '.bootstrap.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class Command(BaseCommand):
+    help = 'Ensure the database schema is migrated and an admin account exists (run once per deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-admin',
+            action='store_true',
+            help='Only apply migrations, do not create the default admin account',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('Bootstrapping database...')
+        )
+
+        with bootstrap_lock():
+            call_command('migrate', interactive=False, verbosity=options['verbosity'])
+
+            if not options['skip_admin']:
+                self.ensure_admin()
+
+        self.stdout.write(
+            self.style.SUCCESS('Bootstrap completed!')
+        )
+
+    def ensure_admin(self):
+        """Create the default superuser when the database has no users yet"""
+        if User.objects.exists():
+            self.stdout.write('Superuser already exists')
+            return
+
+        username = os.environ.get('DJANGO_SUPERUSER_USERNAME', 'admin')
+        User.objects.create_superuser(
+            username,
+            os.environ.get('DJANGO_SUPERUSER_EMAIL', 'admin@example.com'),
+            os.environ.get('DJANGO_SUPERUSER_PASSWORD', 'admin123')
+        )
+        self.stdout.write(
+            self.style.WARNING(f"Superuser '{username}' created")
+        )
@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from admin_ui.models import NetworkSession, ConnectedDevice
-from admin_ui.views import cleanup_expired_sessions, refresh_active_sessions
+from admin_ui.session_registry import invalidate_active_session, refresh_active_sessions
 
 
 class Command(BaseCommand):
@@ -42,7 +42,7 @@ class Command(BaseCommand):
         expired_sessions = NetworkSession.objects.filter(
             is_active=True,
             start_time__lt=cutoff_time
-        )
+        ).select_related('course', 'lecturer', 'esp32_device')
         
         if dry_run:
             self.stdout.write(
@@ -79,6 +79,8 @@ class Command(BaseCommand):
                     disconnected_at=current_time
                 )
                 
+                invalidate_active_session(session.esp32_device.device_id)
+                
                 cleaned_sessions += 1
                 self.stdout.write(
                     f'  ✓ Cleaned up session: {session.course.code} ({session.lecturer.username})'
@@ -93,7 +95,8 @@ class Command(BaseCommand):
         
         # Refresh active sessions
         self.stdout.write('Refreshing active sessions...')
-        refresh_active_sessions()
+        refreshed = refresh_active_sessions()
+        self.stdout.write(f'  ✓ Cached session context for {refreshed} devices')
         
         # Get final counts
         total_active = NetworkSession.objects.filter(is_active=True).count()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_ui.models import DeviceCredential, ESP32Device
+
+
+class Command(BaseCommand):
+    help = 'Issue (or rotate) the secret an ESP32 device signs its API requests with'
+
+    def add_arguments(self, parser):
+        parser.add_argument('device_id', help='device_id of the ESP32 device')
+        parser.add_argument(
+            '--rotate',
+            action='store_true',
+            help='Replace an existing secret (the device must be re-provisioned)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            device = ESP32Device.objects.get(device_id=options['device_id'])
+        except ESP32Device.DoesNotExist:
+            raise CommandError(f"ESP32 device '{options['device_id']}' not found")
+
+        credential, created = DeviceCredential.objects.get_or_create(esp32_device=device)
+        if not created:
+            if not options['rotate']:
+                raise CommandError(f'{device.device_id} already has a credential; pass --rotate to replace it')
+            credential.rotate()
+
+        self.stdout.write(self.style.SUCCESS(f'Signing secret for {device.device_id}:'))
+        self.stdout.write(credential.secret)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from admin_ui.attendance_stats import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized attendance summaries from attendance records and enrollments'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('Rebuilding attendance summaries...')
+        )
+
+        with transaction.atomic():
+            rebuilt = rebuild_summaries()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuild completed! '
+                f'Sessions: {rebuilt["session"]}, '
+                f'Course terms: {rebuilt["course"]}, '
+                f'Student courses: {rebuilt["student"]}'
+            )
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0005_attendancesession_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresenceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(help_text='ESP32 device that reported the presence data', max_length=50, unique=True)),
+                ('device_count', models.PositiveIntegerField(default=0, help_text='Number of stations connected at the last report')),
+                ('updated_at', models.DateTimeField(help_text='Time of the last presence report')),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Presence data is ignored after this time')),
+            ],
+            options={
+                'verbose_name': 'Presence Snapshot',
+                'verbose_name_plural': 'Presence Snapshots',
+            },
+        ),
+        migrations.CreateModel(
+            name='PresenceMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(help_text='ESP32 device the station is connected to', max_length=50)),
+                ('mac_address', models.CharField(help_text='Connected station MAC address', max_length=64)),
+                ('expires_at', models.DateTimeField(help_text='Membership is ignored after this time')),
+            ],
+            options={
+                'verbose_name': 'Presence Member',
+                'verbose_name_plural': 'Presence Members',
+                'unique_together': {('device_id', 'mac_address')},
+            },
+        ),
+    ]
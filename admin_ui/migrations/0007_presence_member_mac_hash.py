@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+
+def clear_presence_members(apps, schema_editor):
+    # Raw MACs cannot be turned into keyed hashes here; presence data expires in minutes anyway
+    apps.get_model('admin_ui', 'PresenceMember').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0006_presence_store'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_presence_members, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='presencemember',
+            unique_together=set(),
+        ),
+        migrations.RenameField(
+            model_name='presencemember',
+            old_name='mac_address',
+            new_name='mac_hash',
+        ),
+        migrations.AlterField(
+            model_name='presencemember',
+            name='mac_hash',
+            field=models.CharField(help_text='Keyed hash of the normalized station MAC address', max_length=64),
+        ),
+        migrations.AlterUniqueTogether(
+            name='presencemember',
+            unique_together={('device_id', 'mac_hash')},
+        ),
+    ]
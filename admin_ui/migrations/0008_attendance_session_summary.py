@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0007_presence_member_mac_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSessionSummary',
+            fields=[
+                ('attendance_session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='admin_ui.attendancesession')),
+                ('total_count', models.PositiveIntegerField(default=0, help_text='Attendance records in the session')),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Attendance Session Summary',
+                'verbose_name_plural': 'Attendance Session Summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0008_attendance_session_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session', models.CharField(max_length=9)),
+                ('semester', models.CharField(max_length=20)),
+                ('enrolled_count', models.PositiveIntegerField(default=0, help_text='Students enrolled for this session/semester')),
+                ('session_count', models.PositiveIntegerField(default=0, help_text='Attendance sessions held')),
+                ('total_count', models.PositiveIntegerField(default=0, help_text='Attendance records across all sessions')),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_ui.course')),
+            ],
+            options={
+                'verbose_name': 'Course Attendance Summary',
+                'verbose_name_plural': 'Course Attendance Summaries',
+                'unique_together': {('course', 'session', 'semester')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentCourseAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session', models.CharField(max_length=9)),
+                ('semester', models.CharField(max_length=20)),
+                ('total_count', models.PositiveIntegerField(default=0, help_text='Attendance records for this student in the course')),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_ui.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_ui.student')),
+            ],
+            options={
+                'verbose_name': 'Student Course Attendance Summary',
+                'verbose_name_plural': 'Student Course Attendance Summaries',
+                'unique_together': {('student', 'course', 'session', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0009_attendance_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='esp32device',
+            name='config_version',
+            field=models.PositiveIntegerField(default=1, help_text='Increases whenever the configuration sent to the device changes'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0010_esp32device_config_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceCommand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(choices=[('start_session', 'Start session'), ('end_session', 'End session'), ('reconfigure', 'Reconfigure'), ('flush_buffer', 'Flush buffer')], max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Command arguments sent to the device')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Command is dropped if not delivered by this time')),
+                ('delivered_at', models.DateTimeField(blank=True, help_text='When the device acknowledged the command', null=True)),
+                ('esp32_device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='commands', to='admin_ui.esp32device')),
+            ],
+            options={
+                'verbose_name': 'Device Command',
+                'verbose_name_plural': 'Device Commands',
+                'ordering': ['id'],
+            },
+        ),
+    ]
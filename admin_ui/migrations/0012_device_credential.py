@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:47
+
+import admin_ui.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0011_device_command'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceCredential',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('secret', models.CharField(default=admin_ui.models.generate_device_secret, help_text='Shared secret the device signs its requests with', max_length=64)),
+                ('is_active', models.BooleanField(default=True, help_text='Signed requests are rejected while this is off')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('rotated_at', models.DateTimeField(blank=True, help_text='When the secret was last replaced', null=True)),
+                ('esp32_device', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='credential', to='admin_ui.esp32device')),
+            ],
+            options={
+                'verbose_name': 'Device Credential',
+                'verbose_name_plural': 'Device Credentials',
+            },
+        ),
+    ]
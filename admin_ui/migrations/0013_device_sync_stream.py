@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0012_device_credential'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceSyncStream',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stream', models.CharField(help_text='Buffer id chosen by the device; sequence numbers restart with a new one', max_length=32)),
+                ('last_sequence', models.BigIntegerField(default=0, help_text='Highest sequence number applied from this buffer')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('esp32_device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_streams', to='admin_ui.esp32device')),
+            ],
+            options={
+                'verbose_name': 'Device Sync Stream',
+                'verbose_name_plural': 'Device Sync Streams',
+                'unique_together': {('esp32_device', 'stream')},
+            },
+        ),
+    ]
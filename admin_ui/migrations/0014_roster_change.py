@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0013_device_sync_stream'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='devicecommand',
+            name='command',
+            field=models.CharField(choices=[('start_session', 'Start session'), ('end_session', 'End session'), ('reconfigure', 'Reconfigure'), ('flush_buffer', 'Flush buffer'), ('roster_update', 'Roster update')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='RosterChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session', models.CharField(max_length=9)),
+                ('semester', models.CharField(max_length=20)),
+                ('matric_no', models.CharField(max_length=20)),
+                ('action', models.CharField(choices=[('add', 'Added'), ('remove', 'Removed')], max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_changes', to='admin_ui.course')),
+            ],
+            options={
+                'verbose_name': 'Roster Change',
+                'verbose_name_plural': 'Roster Changes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['course', 'session', 'semester', 'id'], name='admin_ui_ro_course__d71f03_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0014_roster_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionAccessPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+                ('esp32_device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_access_points', to='admin_ui.esp32device')),
+                ('network_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_points', to='admin_ui.networksession')),
+            ],
+            options={
+                'verbose_name': 'Session Access Point',
+                'verbose_name_plural': 'Session Access Points',
+                'ordering': ['id'],
+                'unique_together': {('network_session', 'esp32_device')},
+            },
+        ),
+    ]
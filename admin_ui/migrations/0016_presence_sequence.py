@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0015_session_access_point'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='presencesnapshot',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, help_text='Time of the last full report', null=True),
+        ),
+        migrations.AddField(
+            model_name='presencesnapshot',
+            name='last_sequence',
+            field=models.BigIntegerField(blank=True, help_text='Sequence number of the last report applied, if the device numbers its reports', null=True),
+        ),
+    ]
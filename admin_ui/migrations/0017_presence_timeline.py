@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0016_presence_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresenceTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mac_hash', models.CharField(help_text='Keyed hash of the normalized station MAC address', max_length=64)),
+                ('intervals', models.BinaryField(default=bytes, help_text='Closed presence intervals, varint-encoded seconds from session start')),
+                ('open_since', models.PositiveIntegerField(blank=True, help_text='Start of the interval still open (seconds from session start)', null=True)),
+                ('seconds_present', models.PositiveIntegerField(default=0, help_text='Total length of the closed intervals')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('network_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presence_timelines', to='admin_ui.networksession')),
+            ],
+            options={
+                'verbose_name': 'Presence Timeline',
+                'verbose_name_plural': 'Presence Timelines',
+                'indexes': [models.Index(fields=['network_session', 'open_since'], name='admin_ui_pr_network_0d536a_idx')],
+                'unique_together': {('network_session', 'mac_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:47
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicate_records(apps, schema_editor):
+    # Keep the first record of each student in a session, like the spool applier does
+    AttendanceRecord = apps.get_model('admin_ui', 'AttendanceRecord')
+    duplicates = AttendanceRecord.objects.values('attendance_session_id', 'student_id').annotate(
+        first_id=Min('id'), records=Count('id')
+    ).filter(records__gt=1)
+    session_ids = set()
+    for row in duplicates:
+        AttendanceRecord.objects.filter(
+            attendance_session_id=row['attendance_session_id'], student_id=row['student_id']
+        ).exclude(id=row['first_id']).delete()
+        session_ids.add(row['attendance_session_id'])
+    if not session_ids:
+        return
+
+    # The stored counts included the removed records; they are rebuilt on the next read
+    AttendanceSession = apps.get_model('admin_ui', 'AttendanceSession')
+    terms = set(AttendanceSession.objects.filter(id__in=session_ids).values_list('course_id', 'session', 'semester'))
+    apps.get_model('admin_ui', 'AttendanceSessionSummary').objects.filter(attendance_session_id__in=session_ids).delete()
+    for model_name in ('CourseAttendanceSummary', 'StudentCourseAttendanceSummary'):
+        summaries = apps.get_model('admin_ui', model_name).objects
+        for course_id, session, semester in terms:
+            summaries.filter(course_id=course_id, session=session, semester=semester).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_ui', '0017_presence_timeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_records, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='attendancerecord',
+            unique_together={('attendance_session', 'student')},
+        ),
+    ]
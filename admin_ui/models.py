@@ -1,5 +1,8 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # 📚 Course model
 class Course(models.Model):
@@ -117,6 +120,9 @@ class AttendanceRecord(models.Model):
     def __str__(self):
         return f"{self.student.name} - {self.attendance_session.date}: {self.status}"
 
+    class Meta:
+        unique_together = ['attendance_session', 'student']  # Access points of one session may mark a student at once
+
 # 🛰️ ESP32 Device Management
 class ESP32Device(models.Model):
     device_id = models.CharField(max_length=50, unique=True, help_text="Unique identifier for ESP32 device")
@@ -128,6 +134,7 @@ class ESP32Device(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_seen = models.DateTimeField(auto_now=True, help_text="Last time device was online")
     last_heartbeat = models.DateTimeField(null=True, blank=True, help_text="Last heartbeat received from ESP32")
+    config_version = models.PositiveIntegerField(default=1, help_text="Increases whenever the configuration sent to the device changes")
 
     def __str__(self):
         return f"{self.device_name} ({self.ssid})"
@@ -156,6 +163,21 @@ class NetworkSession(models.Model):
         verbose_name = "Network Session"
         verbose_name_plural = "Network Sessions"
 
+# 📶 Extra ESP32 access points serving a network session (see admin_ui/access_points.py)
+class SessionAccessPoint(models.Model):
+    network_session = models.ForeignKey(NetworkSession, on_delete=models.CASCADE, related_name='access_points')
+    esp32_device = models.ForeignKey(ESP32Device, on_delete=models.CASCADE, related_name='session_access_points')
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.esp32_device.device_id} in {self.network_session}"
+
+    class Meta:
+        verbose_name = "Session Access Point"
+        verbose_name_plural = "Session Access Points"
+        unique_together = ['network_session', 'esp32_device']
+        ordering = ['id']
+
 # 📱 Connected Device Tracking
 class ConnectedDevice(models.Model):
     network_session = models.ForeignKey(NetworkSession, on_delete=models.CASCADE)
@@ -173,3 +195,195 @@ class ConnectedDevice(models.Model):
         verbose_name = "Connected Device"
         verbose_name_plural = "Connected Devices"
         unique_together = ['network_session', 'mac_address']
+
+# 📡 Presence store (database backend, see admin_ui/presence.py)
+class PresenceSnapshot(models.Model):
+    device_id = models.CharField(max_length=50, unique=True, help_text="ESP32 device that reported the presence data")
+    device_count = models.PositiveIntegerField(default=0, help_text="Number of stations connected at the last report")
+    updated_at = models.DateTimeField(help_text="Time of the last presence report")
+    expires_at = models.DateTimeField(db_index=True, help_text="Presence data is ignored after this time")
+    last_sequence = models.BigIntegerField(null=True, blank=True, help_text="Sequence number of the last report applied, if the device numbers its reports")
+    checkpoint_at = models.DateTimeField(null=True, blank=True, help_text="Time of the last full report")
+
+    def __str__(self):
+        return f"{self.device_id}: {self.device_count} devices"
+
+    class Meta:
+        verbose_name = "Presence Snapshot"
+        verbose_name_plural = "Presence Snapshots"
+
+class PresenceMember(models.Model):
+    device_id = models.CharField(max_length=50, help_text="ESP32 device the station is connected to")
+    mac_hash = models.CharField(max_length=64, help_text="Keyed hash of the normalized station MAC address")
+    expires_at = models.DateTimeField(help_text="Membership is ignored after this time")
+
+    def __str__(self):
+        return f"{self.mac_hash} @ {self.device_id}"
+
+    class Meta:
+        verbose_name = "Presence Member"
+        verbose_name_plural = "Presence Members"
+        unique_together = ['device_id', 'mac_hash']
+
+# 🕒 Presence history (see admin_ui/presence_history.py)
+class PresenceTimeline(models.Model):
+    network_session = models.ForeignKey(NetworkSession, on_delete=models.CASCADE, related_name='presence_timelines')
+    mac_hash = models.CharField(max_length=64, help_text="Keyed hash of the normalized station MAC address")
+    intervals = models.BinaryField(default=bytes, help_text="Closed presence intervals, varint-encoded seconds from session start")
+    open_since = models.PositiveIntegerField(null=True, blank=True, help_text="Start of the interval still open (seconds from session start)")
+    seconds_present = models.PositiveIntegerField(default=0, help_text="Total length of the closed intervals")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.mac_hash} in {self.network_session}"
+
+    class Meta:
+        verbose_name = "Presence Timeline"
+        verbose_name_plural = "Presence Timelines"
+        unique_together = ['network_session', 'mac_hash']
+        indexes = [models.Index(fields=['network_session', 'open_since'])]
+
+# 📊 Materialized attendance statistics (see admin_ui/attendance_stats.py)
+class AttendanceSessionSummary(models.Model):
+    attendance_session = models.OneToOneField(AttendanceSession, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    total_count = models.PositiveIntegerField(default=0, help_text="Attendance records in the session")
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def attendance_rate(self):
+        return round(self.present_count / self.total_count * 100, 1) if self.total_count else 0
+
+    def __str__(self):
+        return f"{self.attendance_session}: {self.present_count}/{self.total_count}"
+
+    class Meta:
+        verbose_name = "Attendance Session Summary"
+        verbose_name_plural = "Attendance Session Summaries"
+
+class CourseAttendanceSummary(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    session = models.CharField(max_length=9)  # e.g. "2024/2025"
+    semester = models.CharField(max_length=20)  # e.g. "1st Semester"
+    enrolled_count = models.PositiveIntegerField(default=0, help_text="Students enrolled for this session/semester")
+    session_count = models.PositiveIntegerField(default=0, help_text="Attendance sessions held")
+    total_count = models.PositiveIntegerField(default=0, help_text="Attendance records across all sessions")
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def attendance_rate(self):
+        return round(self.present_count / self.total_count * 100, 1) if self.total_count else 0
+
+    def __str__(self):
+        return f"{self.course.code} ({self.session} {self.semester})"
+
+    class Meta:
+        verbose_name = "Course Attendance Summary"
+        verbose_name_plural = "Course Attendance Summaries"
+        unique_together = ['course', 'session', 'semester']
+
+class StudentCourseAttendanceSummary(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    session = models.CharField(max_length=9)  # e.g. "2024/2025"
+    semester = models.CharField(max_length=20)  # e.g. "1st Semester"
+    total_count = models.PositiveIntegerField(default=0, help_text="Attendance records for this student in the course")
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def attendance_rate(self):
+        return round(self.present_count / self.total_count * 100, 1) if self.total_count else 0
+
+    def __str__(self):
+        return f"{self.student.matric_no} - {self.course.code}: {self.present_count}/{self.total_count}"
+
+    class Meta:
+        verbose_name = "Student Course Attendance Summary"
+        verbose_name_plural = "Student Course Attendance Summaries"
+        unique_together = ['student', 'course', 'session', 'semester']
+
+# 📬 Commands queued for ESP32 devices (delivered by the long-poll endpoint, see admin_ui/device_commands.py)
+class DeviceCommand(models.Model):
+    esp32_device = models.ForeignKey(ESP32Device, on_delete=models.CASCADE, related_name='commands')
+    command = models.CharField(max_length=20, choices=[
+        ('start_session', 'Start session'),
+        ('end_session', 'End session'),
+        ('reconfigure', 'Reconfigure'),
+        ('flush_buffer', 'Flush buffer'),
+        ('roster_update', 'Roster update'),
+    ])
+    payload = models.JSONField(default=dict, blank=True, help_text="Command arguments sent to the device")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True, help_text="Command is dropped if not delivered by this time")
+    delivered_at = models.DateTimeField(null=True, blank=True, help_text="When the device acknowledged the command")
+
+    def __str__(self):
+        return f"{self.command} -> {self.esp32_device.device_id}"
+
+    class Meta:
+        verbose_name = "Device Command"
+        verbose_name_plural = "Device Commands"
+        ordering = ['id']
+
+def generate_device_secret():
+    return secrets.token_hex(32)
+
+# 🔏 Per-device signing secret for HMAC-signed API requests (see admin_ui/device_credentials.py)
+class DeviceCredential(models.Model):
+    esp32_device = models.OneToOneField(ESP32Device, on_delete=models.CASCADE, related_name='credential')
+    secret = models.CharField(max_length=64, default=generate_device_secret, help_text="Shared secret the device signs its requests with")
+    is_active = models.BooleanField(default=True, help_text="Signed requests are rejected while this is off")
+    created_at = models.DateTimeField(auto_now_add=True)
+    rotated_at = models.DateTimeField(null=True, blank=True, help_text="When the secret was last replaced")
+
+    def rotate(self):
+        """Replace the secret; the device must be re-provisioned with the new one"""
+        self.secret = generate_device_secret()
+        self.rotated_at = timezone.now()
+        self.save(update_fields=['secret', 'rotated_at'])
+
+    def __str__(self):
+        return f"Credential for {self.esp32_device.device_id}"
+
+    class Meta:
+        verbose_name = "Device Credential"
+        verbose_name_plural = "Device Credentials"
+
+# 🔄 Highest event sequence applied per device buffer (see admin_ui/device_sync.py)
+class DeviceSyncStream(models.Model):
+    esp32_device = models.ForeignKey(ESP32Device, on_delete=models.CASCADE, related_name='sync_streams')
+    stream = models.CharField(max_length=32, help_text="Buffer id chosen by the device; sequence numbers restart with a new one")
+    last_sequence = models.BigIntegerField(default=0, help_text="Highest sequence number applied from this buffer")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.esp32_device.device_id}/{self.stream} @ {self.last_sequence}"
+
+    class Meta:
+        verbose_name = "Device Sync Stream"
+        verbose_name_plural = "Device Sync Streams"
+        unique_together = ['esp32_device', 'stream']
+
+# 📋 Enrollment changes, so devices holding a roster snapshot can catch up (see admin_ui/device_roster.py)
+class RosterChange(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='roster_changes')
+    session = models.CharField(max_length=9)
+    semester = models.CharField(max_length=20)
+    # Plain matric number rather than a foreign key: the removal must outlive the student
+    matric_no = models.CharField(max_length=20)
+    action = models.CharField(max_length=6, choices=[('add', 'Added'), ('remove', 'Removed')])
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.action} {self.matric_no} - {self.course.code} ({self.session}, {self.semester})"
+
+    class Meta:
+        verbose_name = "Roster Change"
+        verbose_name_plural = "Roster Changes"
+        ordering = ['id']
+        indexes = [models.Index(fields=['course', 'session', 'semester', 'id'])]
@@ -0,0 +1,415 @@
+"""
+📡 Shared presence store
+
+ESP32 gateways report which stations (student phones) are connected to their
+access point. The presence store keeps one set of connected MAC addresses per
+ESP32 device with a TTL, shared by every worker process, so that a presence
+update handled by one gunicorn worker is visible to verification requests
+handled by any other.
+
+MAC addresses are normalized (``AA-BB-CC-DD-EE-FF`` and ``aabb.ccdd.eeff`` both
+become ``aa:bb:cc:dd:ee:ff``) and stored as keyed hashes, so membership checks are
+set lookups on fixed-length keys and raw MACs are never persisted.
+
+A gateway can report its stations in full or as a delta. A full report
+(``set_members``) replaces the set. A delta (``apply_delta``) adds the stations
+that joined and removes those that left since the previous report, so its size
+and the server's work grow with churn rather than with the size of the room.
+Reports carry a sequence number, and a delta is applied only if it directly
+follows the last report applied. A gap, or a device the store holds no live
+data for, answers ``resync`` and the gateway sends a full report. A full report is
+also due every CHECKPOINT_INTERVAL seconds, which corrects any drift between
+the device and the store.
+
+Backends are pluggable through ``settings.PRESENCE_STORE``:
+
+    PRESENCE_STORE = {
+        'BACKEND': 'admin_ui.presence.DatabasePresenceStore',  # or RedisPresenceStore
+        'TTL': 300,
+        'CHECKPOINT_INTERVAL': 120,   # seconds between full reports a gateway should send
+        'OPTIONS': {'url': 'redis://localhost:6379/0'},          # Redis only
+    }
+"""
+import hashlib
+import re
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import PresenceSnapshot, PresenceMember
+
+DEFAULT_BACKEND = 'admin_ui.presence.DatabasePresenceStore'
+DEFAULT_TTL = 300  # 5 minutes, same lifetime the cached snapshots used to have
+DEFAULT_CHECKPOINT_INTERVAL = 120
+
+# Outcomes of apply_delta()
+DELTA_APPLIED = 'applied'
+DELTA_DUPLICATE = 'duplicate'
+DELTA_RESYNC = 'resync'
+
+MAC_SEPARATORS = re.compile(r'[\s:\-.]')
+HEX_MAC = re.compile(r'^[0-9a-f]{12}$')
+
+
+def normalize_mac(mac_address):
+    """Return a MAC address in lowercase colon form; other identifiers are just lowercased"""
+    value = str(mac_address).strip().lower()
+    compact = MAC_SEPARATORS.sub('', value)
+    if HEX_MAC.match(compact):
+        return ':'.join(compact[i:i + 2] for i in range(0, 12, 2))
+    return value
+
+
+def hash_mac(mac_address):
+    """Keyed hash of a normalized MAC address (24 hex characters)"""
+    return hashlib.blake2b(
+        normalize_mac(mac_address).encode(),
+        digest_size=12,
+        key=settings.SECRET_KEY.encode()[:64]
+    ).hexdigest()
+
+
+def parse_presence_report(data):
+    """
+    Read a presence update body as (connected_devices, joined, left, seq).
+    connected_devices is None for a delta report, which must carry a seq.
+    Raises ValueError with a message for the device when the report is malformed.
+    """
+    seq = data.get('seq')
+    if seq is not None and (isinstance(seq, bool) or not isinstance(seq, int) or seq < 0):
+        raise ValueError('seq must be a non-negative integer')
+
+    if 'joined' not in data and 'left' not in data:
+        connected_devices = data.get('connected_devices', [])
+        if not isinstance(connected_devices, list):
+            raise ValueError('connected_devices must be a list')
+        return connected_devices, None, None, seq
+
+    joined, left = data.get('joined', []), data.get('left', [])
+    if not isinstance(joined, list) or not isinstance(left, list):
+        raise ValueError('joined and left must be lists')
+    if seq is None:
+        raise ValueError('A delta report needs a seq')
+    return None, joined, left, seq
+
+
+def _delta_outcome(last_seq, seq):
+    if last_seq is None:
+        return DELTA_RESYNC  # no live set, or it came from a report without a sequence
+    if seq <= last_seq:
+        return DELTA_DUPLICATE
+    if seq != last_seq + 1:
+        return DELTA_RESYNC  # a report went missing
+    return DELTA_APPLIED
+
+
+def _delta_hashes(joined, left):
+    joined = {hash_mac(mac_address) for mac_address in joined}
+    # A station that left and came back within one report is connected
+    return joined, {hash_mac(mac_address) for mac_address in left} - joined
+
+
+class BasePresenceStore:
+    """Interface shared by all presence store backends"""
+
+    def __init__(self, ttl=DEFAULT_TTL, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL, **options):
+        self.ttl = ttl
+        self.checkpoint_interval = checkpoint_interval
+        self.options = options
+
+    def set_members(self, device_id, mac_addresses, ttl=None, seq=None):
+        """Replace the connected-station set for a device; seq numbers the report for later deltas"""
+        raise NotImplementedError
+
+    def apply_delta(self, device_id, joined, left, seq, ttl=None):
+        """
+        Add the stations that joined and remove those that left since report seq - 1.
+        Returns {'result': DELTA_APPLIED, DELTA_DUPLICATE or DELTA_RESYNC,
+        'last_sequence': seq of the last report applied, 'device_count': stations
+        after an applied delta, 'checkpoint_due': True when the device should send
+        a full report next}.
+        """
+        raise NotImplementedError
+
+    def _checkpoint_due(self, checkpoint_at, now):
+        return checkpoint_at is None or (now - checkpoint_at).total_seconds() >= self.checkpoint_interval
+
+    def is_member(self, device_id, mac_address):
+        """Return True if the station is currently connected to the device"""
+        return bool(self.present_members(device_id, [mac_address]))
+
+    def present_members(self, device_id, mac_addresses):
+        """Return the subset of mac_addresses (as given) currently connected to the device"""
+        raise NotImplementedError
+
+    def get_snapshot(self, device_id, include_members=True):
+        """
+        Return {'connected_devices', 'timestamp', 'device_count'} or None if expired.
+        connected_devices holds MAC hashes and is left empty when include_members is False.
+        """
+        raise NotImplementedError
+
+    def get_snapshots(self, device_ids, include_members=True):
+        """Return {device_id: snapshot} for every device with live presence data"""
+        snapshots = {}
+        for device_id in device_ids:
+            snapshot = self.get_snapshot(device_id, include_members=include_members)
+            if snapshot:
+                snapshots[device_id] = snapshot
+        return snapshots
+
+    def clear(self, device_id):
+        """Forget all presence data for a device"""
+        raise NotImplementedError
+
+    # Async versions for the async device API; backends may override them with native calls
+    async def aset_members(self, device_id, mac_addresses, ttl=None, seq=None):
+        return await sync_to_async(self.set_members)(device_id, mac_addresses, ttl, seq)
+
+    async def aapply_delta(self, device_id, joined, left, seq, ttl=None):
+        return await sync_to_async(self.apply_delta)(device_id, joined, left, seq, ttl)
+
+    async def ais_member(self, device_id, mac_address):
+        return await sync_to_async(self.is_member)(device_id, mac_address)
+
+    async def apresent_members(self, device_id, mac_addresses):
+        return await sync_to_async(self.present_members)(device_id, mac_addresses)
+
+    async def aget_snapshot(self, device_id, include_members=True):
+        return await sync_to_async(self.get_snapshot)(device_id, include_members)
+
+
+class DatabasePresenceStore(BasePresenceStore):
+    """Presence store backed by the default database (works with SQLite and PostgreSQL)"""
+
+    def set_members(self, device_id, mac_addresses, ttl=None, seq=None):
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl or self.ttl)
+        mac_hashes = {hash_mac(mac_address) for mac_address in mac_addresses}
+
+        with transaction.atomic():
+            PresenceMember.objects.filter(device_id=device_id).delete()
+            PresenceMember.objects.bulk_create([
+                PresenceMember(device_id=device_id, mac_hash=mac_hash, expires_at=expires_at)
+                for mac_hash in mac_hashes
+            ])
+            PresenceSnapshot.objects.update_or_create(
+                device_id=device_id,
+                defaults={
+                    'device_count': len(mac_hashes),
+                    'updated_at': now,
+                    'expires_at': expires_at,
+                    'last_sequence': seq,
+                    'checkpoint_at': now,
+                }
+            )
+
+    def apply_delta(self, device_id, joined, left, seq, ttl=None):
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl or self.ttl)
+        joined, left = _delta_hashes(joined, left)
+
+        with transaction.atomic():
+            snapshot = PresenceSnapshot.objects.select_for_update().filter(
+                device_id=device_id, expires_at__gt=now
+            ).first()
+            result = _delta_outcome(snapshot.last_sequence if snapshot else None, seq)
+            if result != DELTA_APPLIED:
+                return {
+                    'result': result,
+                    'last_sequence': snapshot.last_sequence if snapshot else None,
+                    'device_count': None,
+                    'checkpoint_due': result == DELTA_RESYNC or self._checkpoint_due(snapshot.checkpoint_at, now),
+                }
+
+            if left:
+                PresenceMember.objects.filter(device_id=device_id, mac_hash__in=left).delete()
+            if joined:
+                PresenceMember.objects.bulk_create([
+                    PresenceMember(device_id=device_id, mac_hash=mac_hash, expires_at=expires_at)
+                    for mac_hash in joined
+                ], ignore_conflicts=True)
+            # One statement keeps the whole set alive; it also counts the stations
+            device_count = PresenceMember.objects.filter(device_id=device_id).update(expires_at=expires_at)
+            snapshot.device_count = device_count
+            snapshot.updated_at = now
+            snapshot.expires_at = expires_at
+            snapshot.last_sequence = seq
+            snapshot.save(update_fields=['device_count', 'updated_at', 'expires_at', 'last_sequence'])
+
+        return {
+            'result': DELTA_APPLIED,
+            'last_sequence': seq,
+            'device_count': device_count,
+            'checkpoint_due': self._checkpoint_due(snapshot.checkpoint_at, now),
+        }
+
+    def present_members(self, device_id, mac_addresses):
+        hashes = {}
+        for mac_address in mac_addresses:
+            hashes.setdefault(hash_mac(mac_address), []).append(mac_address)
+        if not hashes:
+            return set()
+
+        present = PresenceMember.objects.filter(
+            device_id=device_id,
+            mac_hash__in=list(hashes),
+            expires_at__gt=timezone.now()
+        ).values_list('mac_hash', flat=True)
+        return {mac_address for mac_hash in present for mac_address in hashes[mac_hash]}
+
+    def get_snapshot(self, device_id, include_members=True):
+        return self.get_snapshots([device_id], include_members=include_members).get(device_id)
+
+    def get_snapshots(self, device_ids, include_members=True):
+        now = timezone.now()
+        snapshots = {
+            snapshot.device_id: {
+                'connected_devices': [],
+                'timestamp': snapshot.updated_at.isoformat(),
+                'device_count': snapshot.device_count,
+            }
+            for snapshot in PresenceSnapshot.objects.filter(device_id__in=device_ids, expires_at__gt=now)
+        }
+        if snapshots and include_members:
+            for device_id, mac_hash in PresenceMember.objects.filter(
+                device_id__in=list(snapshots),
+                expires_at__gt=now
+            ).values_list('device_id', 'mac_hash'):
+                snapshots[device_id]['connected_devices'].append(mac_hash)
+        return snapshots
+
+    def clear(self, device_id):
+        with transaction.atomic():
+            PresenceMember.objects.filter(device_id=device_id).delete()
+            PresenceSnapshot.objects.filter(device_id=device_id).delete()
+
+
+class RedisPresenceStore(BasePresenceStore):
+    """Presence store backed by Redis (or any server speaking the Redis protocol)"""
+
+    def __init__(self, ttl=DEFAULT_TTL, **options):
+        super().__init__(ttl=ttl, **options)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisPresenceStore requires the 'redis' package (pip install redis)")
+
+        self.prefix = options.get('prefix', 'esp32_presence')
+        self.client = redis.Redis.from_url(
+            options.get('url', 'redis://localhost:6379/0'),
+            decode_responses=True
+        )
+
+    def _members_key(self, device_id):
+        return f'{self.prefix}:{device_id}:members'
+
+    def _meta_key(self, device_id):
+        return f'{self.prefix}:{device_id}:meta'
+
+    def set_members(self, device_id, mac_addresses, ttl=None, seq=None):
+        ttl = ttl or self.ttl
+        mac_hashes = {hash_mac(mac_address) for mac_address in mac_addresses}
+        members_key, meta_key = self._members_key(device_id), self._meta_key(device_id)
+        now = timezone.now().isoformat()
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(members_key, meta_key)
+        if mac_hashes:
+            pipe.sadd(members_key, *mac_hashes)
+            pipe.expire(members_key, ttl)
+        meta = {'timestamp': now, 'checkpoint_at': now}
+        if seq is not None:
+            meta['last_sequence'] = seq
+        pipe.hset(meta_key, mapping=meta)
+        pipe.expire(meta_key, ttl)
+        pipe.execute()
+
+    def apply_delta(self, device_id, joined, left, seq, ttl=None):
+        ttl = ttl or self.ttl
+        joined, left = _delta_hashes(joined, left)
+        members_key, meta_key = self._members_key(device_id), self._meta_key(device_id)
+        now = timezone.now()
+        outcome = {}
+
+        def update(pipe):
+            # Runs again if another report changes the device's meta before EXEC
+            meta = pipe.hgetall(meta_key)
+            last_seq = int(meta['last_sequence']) if 'last_sequence' in meta else None
+            checkpoint_at = meta.get('checkpoint_at')
+            outcome.update(
+                result=_delta_outcome(last_seq, seq),
+                last_sequence=last_seq,
+                device_count=None,
+                checkpoint_due=self._checkpoint_due(
+                    datetime.fromisoformat(checkpoint_at) if checkpoint_at else None, now
+                ),
+            )
+            if outcome['result'] != DELTA_APPLIED:
+                outcome['checkpoint_due'] = outcome['checkpoint_due'] or outcome['result'] == DELTA_RESYNC
+                return
+            pipe.multi()
+            if left:
+                pipe.srem(members_key, *left)
+            if joined:
+                pipe.sadd(members_key, *joined)
+            pipe.expire(members_key, ttl)
+            pipe.hset(meta_key, mapping={'timestamp': now.isoformat(), 'last_sequence': seq})
+            pipe.expire(meta_key, ttl)
+            pipe.scard(members_key)
+
+        results = self.client.transaction(update, meta_key)
+        if outcome['result'] == DELTA_APPLIED:
+            outcome['last_sequence'] = seq
+            outcome['device_count'] = results[-1]
+        return outcome
+
+    def present_members(self, device_id, mac_addresses):
+        mac_addresses = list(mac_addresses)
+        if not mac_addresses:
+            return set()
+        flags = self.client.smismember(
+            self._members_key(device_id),
+            [hash_mac(mac_address) for mac_address in mac_addresses]
+        )
+        return {mac_address for mac_address, flag in zip(mac_addresses, flags) if flag}
+
+    def get_snapshot(self, device_id, include_members=True):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._meta_key(device_id))
+        pipe.scard(self._members_key(device_id))
+        if include_members:
+            pipe.smembers(self._members_key(device_id))
+        meta, device_count, *members = pipe.execute()
+        if not meta:
+            return None
+        return {
+            'connected_devices': sorted(members[0]) if members else [],
+            'timestamp': meta.get('timestamp'),
+            'device_count': device_count,
+        }
+
+    def clear(self, device_id):
+        self.client.delete(self._members_key(device_id), self._meta_key(device_id))
+
+
+_store = None
+
+
+def get_presence_store():
+    """Return the configured presence store (created once per process)"""
+    global _store
+    if _store is None:
+        config = getattr(settings, 'PRESENCE_STORE', {})
+        backend = import_string(config.get('BACKEND', DEFAULT_BACKEND))
+        _store = backend(
+            ttl=config.get('TTL', DEFAULT_TTL),
+            checkpoint_interval=config.get('CHECKPOINT_INTERVAL', DEFAULT_CHECKPOINT_INTERVAL),
+            **config.get('OPTIONS', {})
+        )
+    return _store
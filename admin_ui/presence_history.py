@@ -0,0 +1,271 @@
+"""
+🕒 Presence history as per-station connection intervals
+
+The presence store only knows who is connected right now, and ConnectedDevice
+keeps a single connected/disconnected pair per station. Neither can tell whether
+a phone was in the room for most of a lecture. The history keeps, per network
+session and station, the intervals during which the station was seen.
+
+Presence is sampled per session at most every SAMPLE_INTERVAL seconds. Sampling
+piggybacks on presence reports, so no background worker is needed. A sample
+takes the stations connected to any access point of the session, from the
+presence store, and:
+
+- opens an interval for each station that just appeared. If the station left
+  less than MERGE_GAP seconds ago, it reopens the station's last interval
+  instead, so a phone that drops off the WiFi for a minute keeps one interval;
+- closes the interval of each station that is gone, at the previous sample.
+
+Stations that stay connected cost nothing, so each sample's writes grow with
+churn, not with the size of the room. A station has one PresenceTimeline row
+per session: its closed intervals as varints (seconds from session start,
+first the gap since the previous interval's end, then the length), a few bytes
+per interval, plus the start of the interval still open. Stations are stored by
+their keyed MAC hash, like in the presence store.
+
+Configured through ``settings.PRESENCE_HISTORY``:
+
+    PRESENCE_HISTORY = {
+        'ENABLED': True,
+        'SAMPLE_INTERVAL': 60,   # seconds between samples of one session
+        'MERGE_GAP': 180,        # absences up to this long do not split an interval
+    }
+"""
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .access_points import pool_device_ids
+from .models import NetworkSession, PresenceTimeline
+from .presence import get_presence_store, hash_mac
+from .session_registry import get_active_session, registry_cache
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_INTERVAL': 60,
+    'MERGE_GAP': 180,
+}
+
+KEY_PREFIX = 'presence_history'
+LAST_SAMPLE_TTL = 86400
+
+
+def history_setting(name):
+    return getattr(settings, 'PRESENCE_HISTORY', {}).get(name, DEFAULTS[name])
+
+
+# 🗜️ Interval encoding
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_intervals(intervals):
+    """Sorted, non-overlapping (start, end) offsets as varint (gap, length) pairs"""
+    out = bytearray()
+    previous_end = 0
+    for start, end in intervals:
+        _write_varint(out, start - previous_end)
+        _write_varint(out, end - start)
+        previous_end = end
+    return bytes(out)
+
+
+def decode_intervals(data):
+    """Inverse of encode_intervals()"""
+    values, value, shift = [], 0, 0
+    for byte in bytes(data):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value, shift = 0, 0
+    intervals, previous_end = [], 0
+    for gap, length in zip(values[::2], values[1::2]):
+        start = previous_end + gap
+        previous_end = start + length
+        intervals.append((start, previous_end))
+    return intervals
+
+
+# 📸 Sampling
+
+def _offset(start_time, moment):
+    return max(0, int((moment - start_time).total_seconds()))
+
+
+def _last_sample_key(session_id):
+    return f'{KEY_PREFIX}:last:{session_id}'
+
+
+def record_sample(active_session, now=None):
+    """
+    Fold the stations connected to a session's access points into its history.
+    active_session is a session_registry snapshot; returns (opened, closed) counts.
+    """
+    now = now or timezone.now()
+    session_id = active_session['id']
+    offset = _offset(active_session['start_time'], now)
+    snapshots = get_presence_store().get_snapshots(pool_device_ids(active_session, active_session['device_id']))
+    present = {mac_hash for snapshot in snapshots.values() for mac_hash in snapshot['connected_devices']}
+
+    cache = registry_cache()
+    last_sample = cache.get(_last_sample_key(session_id))
+    if last_sample is None or last_sample > offset:
+        last_sample = max(0, offset - history_setting('SAMPLE_INTERVAL'))
+    merge_gap = history_setting('MERGE_GAP')
+
+    with transaction.atomic():
+        # Serializes samples of one session taken by different workers
+        list(NetworkSession.objects.select_for_update().filter(id=session_id).values_list('id', flat=True))
+        timelines = PresenceTimeline.objects.filter(network_session_id=session_id)
+        open_hashes = set(timelines.filter(open_since__isnull=False).values_list('mac_hash', flat=True))
+        arrived, left = present - open_hashes, open_hashes - present
+
+        closing = list(timelines.filter(mac_hash__in=left)) if left else []
+        for timeline in closing:
+            end = max(timeline.open_since, last_sample)
+            intervals = decode_intervals(timeline.intervals)
+            intervals.append((timeline.open_since, end))
+            timeline.intervals = encode_intervals(intervals)
+            timeline.seconds_present += end - timeline.open_since
+            timeline.open_since = None
+            timeline.updated_at = now
+
+        returning = list(timelines.filter(mac_hash__in=arrived)) if arrived else []
+        for timeline in returning:
+            intervals = decode_intervals(timeline.intervals)
+            if intervals and offset - intervals[-1][1] <= merge_gap:
+                start, end = intervals.pop()
+                timeline.intervals = encode_intervals(intervals)
+                timeline.seconds_present -= end - start
+                timeline.open_since = start
+            else:
+                timeline.open_since = offset
+            timeline.updated_at = now
+
+        if closing or returning:
+            PresenceTimeline.objects.bulk_update(
+                closing + returning, ['intervals', 'seconds_present', 'open_since', 'updated_at']
+            )
+        known = {timeline.mac_hash for timeline in returning}
+        PresenceTimeline.objects.bulk_create([
+            PresenceTimeline(network_session_id=session_id, mac_hash=mac_hash, open_since=offset)
+            for mac_hash in arrived - known
+        ])
+
+    cache.set(_last_sample_key(session_id), offset, LAST_SAMPLE_TTL)
+    return len(arrived), len(left)
+
+
+def maybe_record_sample(device_id):
+    """Sample the history of the device's session if SAMPLE_INTERVAL has passed; returns True if sampled"""
+    if not history_setting('ENABLED'):
+        return False
+    active_session = get_active_session(device_id)
+    if not active_session:
+        return False
+    # One worker per interval wins the key
+    if not registry_cache().add(f'{KEY_PREFIX}:sampled:{active_session["id"]}', 1, history_setting('SAMPLE_INTERVAL')):
+        return False
+    record_sample(active_session)
+    return True
+
+
+async def amaybe_record_sample(device_id):
+    """Async version of maybe_record_sample()"""
+    return await sync_to_async(maybe_record_sample)(device_id)
+
+
+def close_history(network_session):
+    """Close the intervals still open when a session ends, at its last sample"""
+    now = timezone.now()
+    last_sample = registry_cache().get(_last_sample_key(network_session.id))
+    if last_sample is None:
+        last_sample = _offset(network_session.start_time, network_session.end_time or now)
+    with transaction.atomic():
+        timelines = list(PresenceTimeline.objects.select_for_update().filter(
+            network_session=network_session, open_since__isnull=False
+        ))
+        for timeline in timelines:
+            end = max(timeline.open_since, last_sample)
+            timeline.intervals = encode_intervals(decode_intervals(timeline.intervals) + [(timeline.open_since, end)])
+            timeline.seconds_present += end - timeline.open_since
+            timeline.open_since = None
+            timeline.updated_at = now
+        PresenceTimeline.objects.bulk_update(timelines, ['intervals', 'seconds_present', 'open_since', 'updated_at'])
+    return len(timelines)
+
+
+# 🔎 Queries
+
+def _open_end(network_session):
+    """Offset an open interval currently reaches: the session's last sample"""
+    last_sample = registry_cache().get(_last_sample_key(network_session.id))
+    if last_sample is not None:
+        return last_sample
+    return _offset(network_session.start_time, network_session.end_time or timezone.now())
+
+
+def timeline_intervals(timeline, open_end):
+    """All intervals of a timeline as offsets, the open one ending at open_end"""
+    intervals = decode_intervals(timeline.intervals)
+    if timeline.open_since is not None:
+        intervals.append((timeline.open_since, max(timeline.open_since, open_end)))
+    return intervals
+
+
+def presence_intervals(network_session, mac_address):
+    """[(start, end)] datetimes during which the station was connected to the session's access points"""
+    timeline = PresenceTimeline.objects.filter(network_session=network_session, mac_hash=hash_mac(mac_address)).first()
+    if timeline is None:
+        return []
+    start_time = network_session.start_time
+    return [
+        (start_time + timedelta(seconds=start), start_time + timedelta(seconds=end))
+        for start, end in timeline_intervals(timeline, _open_end(network_session))
+    ]
+
+
+def session_duration(network_session):
+    """Seconds from session start to its end (or to now while it runs)"""
+    return _offset(network_session.start_time, network_session.end_time or timezone.now())
+
+
+def presence_seconds(network_session, mac_hashes=None):
+    """{mac_hash: seconds present} for the session's stations (or just the given hashes)"""
+    timelines = PresenceTimeline.objects.filter(network_session=network_session)
+    if mac_hashes is not None:
+        timelines = timelines.filter(mac_hash__in=list(mac_hashes))
+    open_end = _open_end(network_session)
+    return {
+        mac_hash: seconds + (max(0, open_end - open_since) if open_since is not None else 0)
+        for mac_hash, seconds, open_since in timelines.values_list('mac_hash', 'seconds_present', 'open_since')
+    }
+
+
+def presence_fraction(network_session, mac_address):
+    """Share of the session (0.0-1.0) the station was connected for"""
+    duration = session_duration(network_session)
+    if not duration:
+        return 0.0
+    seconds = presence_seconds(network_session, [hash_mac(mac_address)]).get(hash_mac(mac_address), 0)
+    return min(1.0, seconds / duration)
+
+
+def present_at(network_session, moment):
+    """mac hashes of the stations connected at a moment of the session"""
+    offset = _offset(network_session.start_time, moment)
+    open_end = _open_end(network_session)
+    return {
+        timeline.mac_hash
+        for timeline in PresenceTimeline.objects.filter(network_session=network_session)
+        if any(start <= offset <= end for start, end in timeline_intervals(timeline, open_end))
+    }
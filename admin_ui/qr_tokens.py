@@ -0,0 +1,210 @@
+"""
+🔳 Rotating QR codes for high-throughput attendance marking
+
+Self-service marking looks up the student, their enrollments, the active
+sessions and existing records before writing, so a full lecture hall marking at
+once queues on the database. Instead, the lecturer's active-session page shows a
+QR code that changes every SLOT_SECONDS. It links to
+
+    attendance/qr/?t=<token>
+
+where the token is the session context signed with SECRET_KEY
+(django.core.signing):
+
+    [network session, course, lecturer, session, semester, device pk, device id, slot]
+
+``slot`` is the Unix time divided by SLOT_SECONDS. Checking a token needs no
+database read: the signature shows the server issued it for that session, and the
+slot shows it is fresh. A token stays valid for GRACE_SLOTS slots after it leaves
+the screen. That leaves time for a student who has to log in after scanning,
+while a photo sent out of the room goes stale within a minute.
+
+A valid scan is then checked against cached state only:
+
+- the session registry says the session is still running;
+- the cached term roster (device_roster.roster_members) says the student is
+  enrolled.
+
+The mark goes to the attendance spool (admin_ui/attendance_spool.py) when it is
+enabled, or to the database in one batch write otherwise. Repeat scans are
+dropped by a cache key per (session, student); with a per-process cache the spool
+and the applier still write each student once.
+
+ESP32 presence stays available as a second factor, set by PRESENCE:
+
+    'off'       the token alone marks the student (records are not network verified)
+    'record'    mark either way; network_verified says whether a device the student
+                marked from before is connected to one of the session's access points
+    'required'  refuse students none of whose known devices is connected
+
+Configured through ``settings.ATTENDANCE_QR``:
+
+    ATTENDANCE_QR = {
+        'SLOT_SECONDS': 10,
+        'GRACE_SLOTS': 6,
+        'PRESENCE': 'off',
+    }
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from .access_points import pool_device_ids, pool_present_members
+from .attendance_spool import apply_marks, spool_enabled, spool_mark
+from .device_roster import normalize_matric, roster_members
+from .models import AttendanceRecord
+from .presence import get_presence_store
+from .session_registry import get_active_session, registry_cache
+
+DEFAULTS = {
+    'SLOT_SECONDS': 10,
+    'GRACE_SLOTS': 6,
+    'PRESENCE': 'off',
+}
+
+KEY_PREFIX = 'attendance_qr'
+SIGNING_SALT = 'admin_ui.attendance_qr'
+MARKED_TTL = 86400
+KNOWN_MACS = 5
+
+CLAIMS = (
+    'network_session_id', 'course_id', 'lecturer_id', 'session', 'semester',
+    'esp32_device_pk', 'device_id', 'slot',
+)
+
+
+def qr_setting(name):
+    return getattr(settings, 'ATTENDANCE_QR', {}).get(name, DEFAULTS[name])
+
+
+def _signer():
+    return signing.Signer(salt=SIGNING_SALT)
+
+
+def current_slot(now=None):
+    return int((time.time() if now is None else now) // qr_setting('SLOT_SECONDS'))
+
+
+def seconds_to_next_slot(now=None):
+    now = time.time() if now is None else now
+    slot_seconds = qr_setting('SLOT_SECONDS')
+    return slot_seconds - now % slot_seconds
+
+
+# 🔏 Tokens
+
+def issue_token(network_session, slot=None):
+    """Token for the current slot of a network session (needs its ESP32 device loaded)"""
+    device = network_session.esp32_device
+    return _signer().sign_object([
+        network_session.id,
+        network_session.course_id,
+        network_session.lecturer_id,
+        network_session.session,
+        network_session.semester,
+        device.id,
+        device.device_id,
+        current_slot() if slot is None else slot,
+    ])
+
+
+def read_token(token):
+    """
+    Claims of a token as a dict. Raises signing.BadSignature for a token the
+    server did not issue and signing.SignatureExpired for a stale one.
+    """
+    try:
+        claims = dict(zip(CLAIMS, _signer().unsign_object(token), strict=True))
+    except (TypeError, ValueError):
+        # Malformed, or signed by another feature with the same key
+        raise signing.BadSignature('Malformed attendance token')
+    age = current_slot() - claims['slot']
+    # One slot ahead tolerates workers whose clocks disagree slightly
+    if not -1 <= age <= qr_setting('GRACE_SLOTS'):
+        raise signing.SignatureExpired('Attendance token expired')
+    return claims
+
+
+# ✅ Marking
+
+def _known_macs(matric_no):
+    """MAC addresses the student marked attendance from before, most recent first"""
+    macs = []
+    for mac_address in AttendanceRecord.objects.filter(
+        student_id=matric_no, device_mac__isnull=False
+    ).exclude(device_mac='').order_by('-id').values_list('device_mac', flat=True)[:KNOWN_MACS * 4]:
+        if mac_address not in macs:
+            macs.append(mac_address)
+    return macs[:KNOWN_MACS]
+
+
+def _present_mac(claims, active_session, matric_no):
+    """A known device of the student connected to the session's pool, or None"""
+    macs = _known_macs(matric_no)
+    if not macs:
+        return None
+    present = pool_present_members(
+        get_presence_store(), pool_device_ids(active_session, claims['device_id']), macs
+    )
+    return next((mac_address for mac_address in macs if mac_address in present), None)
+
+
+def mark_from_token(claims, matric_no):
+    """
+    Mark a student present for the session a valid token was issued for.
+    Returns (marked, message).
+    """
+    active_session = get_active_session(claims['device_id'])
+    if not active_session or active_session['id'] != claims['network_session_id']:
+        return False, 'This attendance session has ended.'
+
+    if normalize_matric(matric_no) not in roster_members(claims['course_id'], claims['session'], claims['semester']):
+        return False, 'You are not enrolled in this course.'
+
+    device_mac = None
+    presence = qr_setting('PRESENCE')
+    if presence != 'off':
+        device_mac = _present_mac(claims, active_session, matric_no)
+        if presence == 'required' and not device_mac:
+            return False, (
+                'Connect to the classroom WiFi from a device you have marked attendance with before, '
+                'then scan the code again.'
+            )
+
+    cache = registry_cache()
+    marked_key = f'{KEY_PREFIX}:marked:{claims["network_session_id"]}:{normalize_matric(matric_no)}'
+    if not cache.add(marked_key, 1, MARKED_TTL):
+        return True, 'Your attendance is already recorded.'
+
+    mark = {
+        'student_id': matric_no,
+        'course_id': claims['course_id'],
+        'lecturer_id': claims['lecturer_id'],
+        'session': claims['session'],
+        'semester': claims['semester'],
+        'date': timezone.now().date().isoformat(),
+        'esp32_device_id': claims['esp32_device_pk'],
+        'device_mac': device_mac,
+        'update_existing': False,
+        'network_verified': device_mac is not None,
+        'marked_at': timezone.now().isoformat(),
+    }
+    try:
+        if spool_enabled():
+            # The applier skips students already recorded, so no existence check here
+            spool_mark(
+                mark['student_id'], mark['course_id'], mark['lecturer_id'], mark['session'], mark['semester'],
+                esp32_device_id=mark['esp32_device_id'], device_mac=device_mac,
+                network_verified=mark['network_verified'], check_recorded=False,
+            )
+        else:
+            _, failures = apply_marks([(0, mark)])
+            if failures:
+                cache.delete(marked_key)
+                return False, failures[0]
+    except Exception:
+        cache.delete(marked_key)
+        raise
+    return True, 'Attendance recorded.'
@@ -0,0 +1,162 @@
+"""
+🗂️ Active network session registry
+
+Most device endpoints start by asking "which network session is active on this
+ESP32?" and then read the session's course, lecturer and term. The registry
+answers that from the cache with a compact snapshot per device_id, so the hot
+device path needs no queries to learn its session context:
+
+    {
+        'id', 'device_pk', 'device_id', 'device_name', 'primary_device_id', 'pool',
+        'course_id', 'course_code', 'course_title',
+        'lecturer_id', 'lecturer_username', 'lecturer_name',
+        'session', 'semester', 'date', 'start_time',
+    }
+
+"No active session" is cached too. Snapshots are dropped whenever a session
+starts, ends or is deleted (model signals plus explicit calls after bulk
+``update()``s), and expire after ``TTL`` seconds as a safety net.
+
+A session may span a pool of access points (SessionAccessPoint, see
+admin_ui/access_points.py). Every device in the pool resolves to the same
+session; its snapshot's ``device_*`` fields name the asking device, ``pool``
+lists every device_id in the session and ``primary_device_id`` the one the
+session was started on.
+
+Configured through ``settings.ACTIVE_SESSION_REGISTRY``:
+
+    ACTIVE_SESSION_REGISTRY = {
+        'CACHE': 'default',  # use a shared cache (Redis/Memcached) so invalidation reaches every worker
+        'TTL': 60,
+    }
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import NetworkSession
+
+DEFAULT_TTL = 60  # seconds
+KEY_PREFIX = 'esp32_active_session'
+
+_NO_SESSION = 'none'
+_MISSING = object()
+
+
+def _config():
+    return getattr(settings, 'ACTIVE_SESSION_REGISTRY', {})
+
+
+def registry_cache():
+    """Cache holding the per-device snapshots"""
+    return caches[_config().get('CACHE', 'default')]
+
+
+def registry_ttl():
+    """Seconds a snapshot may be served without being invalidated"""
+    return _config().get('TTL', DEFAULT_TTL)
+
+
+def _key(device_id):
+    return f'{KEY_PREFIX}:{device_id}'
+
+
+def session_snapshot(network_session, device=None):
+    """
+    Compact, cacheable description of a network session as seen by one of its
+    devices (the primary device unless `device` is given; needs course, lecturer,
+    device and access points loaded)
+    """
+    lecturer = network_session.lecturer
+    device = device or network_session.esp32_device
+    return {
+        'id': network_session.id,
+        'device_pk': device.id,
+        'device_id': device.device_id,
+        'device_name': device.device_name,
+        'primary_device_id': network_session.esp32_device.device_id,
+        'pool': [network_session.esp32_device.device_id] + [
+            access_point.esp32_device.device_id for access_point in network_session.access_points.all()
+        ],
+        'course_id': network_session.course_id,
+        'course_code': network_session.course.code,
+        'course_title': network_session.course.title,
+        'lecturer_id': network_session.lecturer_id,
+        'lecturer_username': lecturer.username,
+        'lecturer_name': lecturer.get_full_name(),
+        'session': network_session.session,
+        'semester': network_session.semester,
+        'date': network_session.date,
+        'start_time': network_session.start_time,
+    }
+
+
+def _active_sessions():
+    return NetworkSession.objects.filter(is_active=True).select_related(
+        'course', 'lecturer', 'esp32_device'
+    ).prefetch_related('access_points__esp32_device')
+
+
+def _pool_snapshot(network_session, device_id):
+    """Snapshot for a device that serves a session as an extra access point"""
+    for access_point in network_session.access_points.all():
+        if access_point.esp32_device.device_id == device_id:
+            return session_snapshot(network_session, access_point.esp32_device)
+    return session_snapshot(network_session)
+
+
+def _lookup(device_id):
+    # A device's own session comes first; otherwise the session whose pool it serves
+    network_session = _active_sessions().filter(esp32_device__device_id=device_id).first()
+    if network_session:
+        return session_snapshot(network_session)
+    network_session = _active_sessions().filter(access_points__esp32_device__device_id=device_id).first()
+    return _pool_snapshot(network_session, device_id) if network_session else _NO_SESSION
+
+
+async def _alookup(device_id):
+    network_session = await _active_sessions().filter(esp32_device__device_id=device_id).afirst()
+    if network_session:
+        return session_snapshot(network_session)
+    network_session = await _active_sessions().filter(access_points__esp32_device__device_id=device_id).afirst()
+    return _pool_snapshot(network_session, device_id) if network_session else _NO_SESSION
+
+
+def get_active_session(device_id):
+    """Snapshot of the active network session on an ESP32 device, or None"""
+    cache = registry_cache()
+    snapshot = cache.get(_key(device_id), _MISSING)
+    if snapshot is _MISSING:
+        snapshot = _lookup(device_id)
+        cache.set(_key(device_id), snapshot, registry_ttl())
+    return None if snapshot == _NO_SESSION else snapshot
+
+
+async def aget_active_session(device_id):
+    """Async version of get_active_session()"""
+    cache = registry_cache()
+    snapshot = await cache.aget(_key(device_id), _MISSING)
+    if snapshot is _MISSING:
+        snapshot = await _alookup(device_id)
+        await cache.aset(_key(device_id), snapshot, registry_ttl())
+    return None if snapshot == _NO_SESSION else snapshot
+
+
+def invalidate_active_session(*device_ids):
+    """Forget the cached session context of the given devices (call after starting or ending a session)"""
+    registry_cache().delete_many([_key(device_id) for device_id in device_ids if device_id])
+
+
+def refresh_active_sessions():
+    """Re-cache the snapshot of every device with an active session; returns the number of devices"""
+    snapshots, pool_snapshots = {}, {}
+    for network_session in _active_sessions().order_by('pk'):
+        # Same session .first() would pick when a device has several active ones
+        snapshots.setdefault(_key(network_session.esp32_device.device_id), session_snapshot(network_session))
+        for access_point in network_session.access_points.all():
+            pool_snapshots.setdefault(
+                _key(access_point.esp32_device.device_id),
+                session_snapshot(network_session, access_point.esp32_device)
+            )
+    # A device's own session wins over a pool it also serves
+    registry_cache().set_many({**pool_snapshots, **snapshots}, registry_ttl())
+    return len(pool_snapshots.keys() | snapshots.keys())
@@ -0,0 +1,202 @@
+"""
+🔔 Model signal handlers
+
+Keeps the materialized attendance summaries (admin_ui/attendance_stats.py) in step
+with single-record writes made anywhere in the app. Bulk writes in the attendance
+service report their changes directly, since bulk_create/bulk_update send no signals.
+
+Also drops cached active-session snapshots (admin_ui/session_registry.py), bumps
+the device configuration version (admin_ui/device_config.py) and queues a command
+for long-polling devices (admin_ui/device_commands.py) whenever a network session
+or its ESP32 device is saved or deleted (for every access point in the
+session's pool, see admin_ui/access_points.py), and drops cached device signing
+secrets (admin_ui/device_credentials.py) when a credential or device changes.
+Enrollment changes are logged for devices holding a roster snapshot
+(admin_ui/device_roster.py).
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .access_points import session_device_ids
+from .attendance_stats import apply_record_changes, apply_term_change, invalidate_summaries
+from .models import (
+    Course, AttendanceRecord, AttendanceSession, CourseEnrollment, DeviceCredential, ESP32Device, NetworkSession,
+    SessionAccessPoint
+)
+from .device_commands import queue_command
+from .device_credentials import invalidate_device_secret
+from .device_roster import record_roster_change
+from .device_config import CONFIG_FIELDS, build_device_config, bump_config_version, invalidate_device_config
+from .presence_history import close_history
+from .session_registry import invalidate_active_session
+
+
+def _origin_model(origin):
+    """Model whose deletion started a cascade (origin is an instance or a queryset)"""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_init, sender=AttendanceRecord)
+def remember_record_state(sender, instance, **kwargs):
+    # Saved state, so post_save can tell what a change replaced
+    instance._summary_state = (
+        (instance.attendance_session_id, instance.student_id, instance.status) if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def attendance_record_saved(sender, instance, created, **kwargs):
+    old_state = None if created else instance._summary_state
+    new_state = (instance.attendance_session_id, instance.student_id, instance.status)
+
+    if old_state is None:
+        changes = [new_state[:2] + (None, instance.status)]
+    elif old_state[:2] == new_state[:2]:
+        changes = [new_state[:2] + (old_state[2], instance.status)]
+    else:
+        changes = [old_state[:2] + (old_state[2], None), new_state[:2] + (None, instance.status)]
+
+    apply_record_changes(changes)
+    instance._summary_state = new_state
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def attendance_record_deleted(sender, instance, origin=None, **kwargs):
+    origin_model = _origin_model(origin)
+    if origin_model is AttendanceRecord:
+        apply_record_changes([(instance.attendance_session_id, instance.student_id, instance.status, None)])
+    elif origin_model not in (AttendanceSession, Course):
+        # Cascade from a student or lecturer: never build rows mid-delete, just drop them
+        term = AttendanceSession.objects.filter(
+            id=instance.attendance_session_id
+        ).values_list('course_id', 'session', 'semester').first()
+        invalidate_summaries(session_ids=[instance.attendance_session_id], terms=[term] if term else [])
+
+
+@receiver(post_save, sender=AttendanceSession)
+def attendance_session_saved(sender, instance, created, **kwargs):
+    if created:
+        apply_term_change(instance.course_id, instance.session, instance.semester, sessions=1)
+
+
+@receiver(post_delete, sender=AttendanceSession)
+def attendance_session_deleted(sender, instance, **kwargs):
+    # Its records were deleted in the same cascade; recount the term on the next read
+    invalidate_summaries(terms=[(instance.course_id, instance.session, instance.semester)])
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def course_enrollment_saved(sender, instance, created, **kwargs):
+    if created:
+        apply_term_change(instance.course_id, instance.session, instance.semester, enrolled=1)
+        record_roster_change(instance, 'add')
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def course_enrollment_deleted(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) is not Course:
+        apply_term_change(instance.course_id, instance.session, instance.semester, enrolled=-1)
+        record_roster_change(instance, 'remove')
+
+
+@receiver(post_init, sender=NetworkSession)
+def remember_session_state(sender, instance, **kwargs):
+    instance._was_active = bool(instance.pk) and instance.__dict__.get('is_active', False)
+
+
+@receiver(post_save, sender=NetworkSession)
+@receiver(post_delete, sender=NetworkSession)
+def network_session_changed(sender, instance, created=False, signal=None, **kwargs):
+    try:
+        device = instance.esp32_device
+    except ESP32Device.DoesNotExist:
+        return  # deleted together with its device, whose own handler drops the snapshot
+    # On delete the pool's rows are already gone and handled by their own receiver
+    pool = [] if signal is post_delete else [
+        access_point.esp32_device for access_point in instance.access_points.select_related('esp32_device')
+    ]
+    devices = [device, *pool]
+    invalidate_active_session(*[pool_device.device_id for pool_device in devices])
+    # The device's configuration carries the session's course and lecturer
+    for pool_device in devices:
+        bump_config_version(pool_device)
+
+    # Tell long-polling devices right away
+    is_active = instance.is_active and signal is post_save
+    for pool_device in devices:
+        if is_active and (created or not instance._was_active):
+            queue_command(pool_device, 'start_session', build_device_config(pool_device.device_id))
+        elif instance._was_active and not is_active:
+            queue_command(pool_device, 'end_session', {
+                'session_id': instance.id, **build_device_config(pool_device.device_id)
+            })
+    if signal is post_save and instance._was_active and not is_active:
+        close_history(instance)
+    instance._was_active = is_active
+
+
+@receiver(post_save, sender=SessionAccessPoint)
+@receiver(post_delete, sender=SessionAccessPoint)
+def session_access_point_changed(sender, instance, created=False, signal=None, origin=None, **kwargs):
+    if signal is post_save and not created:
+        return
+    try:
+        network_session = instance.network_session
+        device = instance.esp32_device
+    except (NetworkSession.DoesNotExist, ESP32Device.DoesNotExist):
+        return
+    # Every device of the session carries the pool in its snapshot
+    invalidate_active_session(device.device_id, *session_device_ids([network_session]))
+    bump_config_version(device)
+
+    if not network_session.is_active or _origin_model(origin) is ESP32Device:
+        return  # nothing to tell, or the device is being deleted
+    if created:
+        queue_command(device, 'start_session', build_device_config(device.device_id))
+    else:
+        queue_command(device, 'end_session', {'session_id': network_session.id, **build_device_config(device.device_id)})
+
+
+@receiver(post_init, sender=ESP32Device)
+def remember_device_config(sender, instance, **kwargs):
+    # Read from __dict__ so that deferred fields are not loaded
+    instance._config_state = tuple(instance.__dict__.get(field) for field in CONFIG_FIELDS)
+
+
+@receiver(pre_save, sender=ESP32Device)
+def keep_config_version(sender, instance, update_fields=None, **kwargs):
+    # config_version only moves through bump_config_version(); a full save must not write back a stale copy
+    if instance.pk and (update_fields is None or 'config_version' in update_fields):
+        current = ESP32Device.objects.filter(pk=instance.pk).values_list('config_version', flat=True).first()
+        if current is not None:
+            instance.config_version = current
+
+
+@receiver(post_save, sender=ESP32Device)
+def esp32_device_saved(sender, instance, created, **kwargs):
+    # Snapshots carry the device name, and the device_id itself may have been changed
+    old_device_id = instance._config_state[0]
+    invalidate_active_session(old_device_id, instance.device_id)
+    invalidate_device_config(old_device_id, instance.device_id)
+    invalidate_device_secret(old_device_id, instance.device_id)
+
+    config_state = tuple(instance.__dict__.get(field) for field in CONFIG_FIELDS)
+    if not created and config_state != instance._config_state:
+        bump_config_version(instance)
+        queue_command(instance, 'reconfigure', build_device_config(instance.device_id))
+    instance._config_state = config_state
+
+
+@receiver(post_delete, sender=ESP32Device)
+def esp32_device_deleted(sender, instance, **kwargs):
+    invalidate_active_session(instance._config_state[0], instance.device_id)
+    invalidate_device_config(instance._config_state[0], instance.device_id)
+    invalidate_device_secret(instance._config_state[0], instance.device_id)
+
+
+@receiver(post_save, sender=DeviceCredential)
+@receiver(post_delete, sender=DeviceCredential)
+def device_credential_changed(sender, instance, **kwargs):
+    device_id = ESP32Device.objects.filter(pk=instance.esp32_device_id).values_list('device_id', flat=True).first()
+    invalidate_device_secret(device_id)
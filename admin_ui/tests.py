@@ -1,3 +1,143 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .device_sync import apply_sync_batch
+from .models import (
+    AttendanceRecord, Course, CourseEnrollment, DeviceSyncStream, ESP32Device, NetworkSession,
+    PresenceTimeline, Student,
+)
+from .presence import DELTA_APPLIED, DELTA_DUPLICATE, DELTA_RESYNC, _delta_outcome, get_presence_store, hash_mac
+from .presence_history import decode_intervals, encode_intervals, record_sample
+from .session_registry import get_active_session
+
+
+class DeviceTestCase(TestCase):
+    """A device running a session of one course with a few enrolled students"""
+
+    def setUp(self):
+        cache.clear()
+        self.lecturer = User.objects.create_user('lecturer', password='pw')
+        self.course = Course.objects.create(code='CSC101', title='Introduction to Computing')
+        self.device = ESP32Device.objects.create(
+            device_id='ESP32_TEST', device_name='Test Device', ssid='TEST', password='', location='Room 1'
+        )
+        self.students = [Student.objects.create(matric_no=f'M{i:03d}', name=f'Student {i}') for i in range(3)]
+        for student in self.students:
+            CourseEnrollment.objects.create(
+                student=student, course=self.course, session='2024/2025', semester='1st Semester'
+            )
+        self.network_session = NetworkSession.objects.create(
+            esp32_device=self.device, course=self.course, lecturer=self.lecturer,
+            session='2024/2025', semester='1st Semester', date=timezone.now().date(),
+            start_time=timezone.now() - timedelta(hours=1), is_active=True
+        )
+
+
+# 🗜️ Presence history interval encoding
+
+class IntervalCodecTests(TestCase):
+    def test_round_trip(self):
+        intervals = [(0, 0), (5, 300), (301, 10800), (20000, 90000)]
+        self.assertEqual(decode_intervals(encode_intervals(intervals)), intervals)
+
+    def test_small_offsets_take_one_byte_each(self):
+        self.assertEqual(encode_intervals([(5, 65)]), bytes([5, 60]))
+
+    def test_multi_byte_varints(self):
+        intervals = [(128, 16512), (2 ** 21, 2 ** 28)]
+        self.assertEqual(decode_intervals(encode_intervals(intervals)), intervals)
+
+    def test_empty(self):
+        self.assertEqual(encode_intervals([]), b'')
+        self.assertEqual(decode_intervals(b''), [])
+
+
+# 📸 Presence history sampling
+
+@override_settings(PRESENCE_HISTORY={'ENABLED': True, 'SAMPLE_INTERVAL': 60, 'MERGE_GAP': 180})
+class RecordSampleTests(DeviceTestCase):
+    def sample(self, minute, mac_addresses):
+        get_presence_store().set_members(self.device.device_id, mac_addresses)
+        active_session = get_active_session(self.device.device_id)
+        return record_sample(active_session, now=self.network_session.start_time + timedelta(minutes=minute))
+
+    def timeline(self, mac_address):
+        return PresenceTimeline.objects.get(network_session=self.network_session, mac_hash=hash_mac(mac_address))
+
+    def test_short_absence_keeps_one_interval(self):
+        self.sample(0, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb'])
+        self.sample(1, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb'])
+        self.sample(2, ['aa:aa:aa:aa:aa:aa'])  # bb closes at the previous sample, 60 s
+        self.assertEqual(decode_intervals(self.timeline('bb:bb:bb:bb:bb:bb').intervals), [(0, 60)])
+
+        self.sample(4, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb'])  # back after 180 s
+        timeline = self.timeline('bb:bb:bb:bb:bb:bb')
+        self.assertEqual(decode_intervals(timeline.intervals), [])
+        self.assertEqual(timeline.open_since, 0)
+        self.assertEqual(timeline.seconds_present, 0)
+
+    def test_long_absence_opens_a_new_interval(self):
+        self.sample(0, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb'])
+        self.sample(1, ['aa:aa:aa:aa:aa:aa'])  # bb closes at 0
+        self.sample(5, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb'])  # back after 300 s
+        timeline = self.timeline('bb:bb:bb:bb:bb:bb')
+        self.assertEqual(decode_intervals(timeline.intervals), [(0, 0)])
+        self.assertEqual(timeline.open_since, 300)
+
+    def test_counts_opened_and_closed(self):
+        self.assertEqual(self.sample(0, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb']), (2, 0))
+        self.assertEqual(self.sample(1, ['aa:aa:aa:aa:aa:aa', 'bb:bb:bb:bb:bb:bb']), (0, 0))
+        self.assertEqual(self.sample(2, ['bb:bb:bb:bb:bb:bb']), (0, 1))
+
+
+# 📡 Presence delta sequencing
+
+class DeltaOutcomeTests(TestCase):
+    def test_next_sequence_applies(self):
+        self.assertEqual(_delta_outcome(4, 5), DELTA_APPLIED)
+
+    def test_replayed_sequence_is_duplicate(self):
+        self.assertEqual(_delta_outcome(5, 5), DELTA_DUPLICATE)
+        self.assertEqual(_delta_outcome(5, 3), DELTA_DUPLICATE)
+
+    def test_gap_needs_resync(self):
+        self.assertEqual(_delta_outcome(5, 7), DELTA_RESYNC)
+
+    def test_no_live_set_needs_resync(self):
+        self.assertEqual(_delta_outcome(None, 1), DELTA_RESYNC)
+
+
+# 🔄 Offline buffer uploads
+
+class SyncUploadTests(DeviceTestCase):
+    def marks(self, *seqs):
+        return [
+            {'seq': seq, 'type': 'mark', 'matric_no': self.students[seq - 1].matric_no,
+             'mac_address': f'aa:00:00:00:00:0{seq}'}
+            for seq in seqs
+        ]
+
+    def test_retried_upload_skips_acknowledged_events(self):
+        results, summary, last_sequence = apply_sync_batch(self.device.device_id, 'boot-1', self.marks(1, 2))
+        self.assertEqual(summary['marked'], 2)
+        self.assertEqual(last_sequence, 2)
+
+        results, summary, last_sequence = apply_sync_batch(self.device.device_id, 'boot-1', self.marks(1, 2, 3))
+        self.assertEqual([result['status'] for result in results], ['duplicate', 'duplicate', 'ok'])
+        self.assertEqual(summary['duplicates'], 2)
+        self.assertEqual(summary['marked'], 1)
+        self.assertEqual(last_sequence, 3)
+        self.assertEqual(AttendanceRecord.objects.count(), 3)
+
+    def test_streams_keep_their_own_position(self):
+        apply_sync_batch(self.device.device_id, 'boot-1', self.marks(1, 2))
+        results, summary, last_sequence = apply_sync_batch(self.device.device_id, 'boot-2', self.marks(1))
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertEqual(last_sequence, 1)
+        self.assertEqual(
+            dict(DeviceSyncStream.objects.values_list('stream', 'last_sequence')), {'boot-1': 2, 'boot-2': 1}
+        )
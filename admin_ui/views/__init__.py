@@ -0,0 +1,227 @@
+"""
+🗂️ admin_ui views
+
+Views live in one module per area; this package only records where each view is
+defined and imports a module the first time one of its views is used:
+
+    auth                  login, logout and lecturer registration
+    dashboards            lecturer, student and admin dashboards
+    csv_import            student CSV import and fingerprint enrollment
+    lecturer_attendance   attendance taking, marking and history
+    student_attendance    student self-service attendance marking
+    qr_attendance         rotating QR code check-in
+    esp32_management      ESP32 device and network session pages
+    esp32_api             endpoints called by the ESP32 gateways
+    esp32_api_async       async versions of the hot device endpoints
+    esp32_payloads        request parsing and responses shared by esp32_api and esp32_api_async
+    esp32_commands        long-poll command channel for the ESP32 gateways
+    esp32_auth            API key and request signature checks for the device endpoints
+
+URLconfs route through lazy_view() so a worker only compiles and loads the
+modules it actually serves. Device endpoints with an async version route
+through device_view(), which picks it when ``settings.ESP32_ASYNC_API`` is on. ``from admin_ui.views import some_view`` keeps
+working and loads just that view's module.
+"""
+from importlib import import_module
+from importlib.util import resolve_name
+
+from asgiref.sync import markcoroutinefunction
+from django.utils.functional import cached_property
+
+VIEW_MODULES = {
+    # 🔐 Authentication
+    'admin_login_view': 'auth',
+    'create_admin_view': 'auth',
+    'lecturer_login_view': 'auth',
+    'student_login_view': 'auth',
+    'register_lecturer_view': 'auth',
+    'logout_view': 'auth',
+
+    # 📊 Dashboards
+    'dashboard': 'dashboards',
+    'student_dashboard': 'dashboards',
+    'attendance_dashboard': 'dashboards',
+    'view_assignments': 'dashboards',
+
+    # 📁 CSV import and fingerprint enrollment
+    'upload_student_csv_view': 'csv_import',
+    'preview_student_csv_view': 'csv_import',
+    'confirm_student_csv_save_view': 'csv_import',
+    'enroll_fingerprint_view': 'csv_import',
+    'de_enroll_student': 'csv_import',
+
+    # 📋 Lecturer attendance
+    'verify_network_attendance': 'lecturer_attendance',
+    'course_attendance': 'lecturer_attendance',
+    'start_attendance_session': 'lecturer_attendance',
+    'lecturer_attendance_dashboard': 'lecturer_attendance',
+    'start_attendance_session_view': 'lecturer_attendance',
+    'mark_attendance_view': 'lecturer_attendance',
+    'view_attendance_session_view': 'lecturer_attendance',
+    'lecturer_attendance_history_view': 'lecturer_attendance',
+
+    # 🎯 Student attendance
+    'student_attendance_marking_view': 'student_attendance',
+
+    # 🔳 QR check-in
+    'network_session_qr_token_view': 'qr_attendance',
+    'qr_attendance_view': 'qr_attendance',
+
+    # 🛰️ ESP32 device and network session management
+    'esp32_device_list': 'esp32_management',
+    'esp32_device_create': 'esp32_management',
+    'esp32_device_edit': 'esp32_management',
+    'esp32_device_delete': 'esp32_management',
+    'network_session_list': 'esp32_management',
+    'network_session_create': 'esp32_management',
+    'network_session_end': 'esp32_management',
+    'start_network_session_view': 'esp32_management',
+    'network_session_active_view': 'esp32_management',
+    'end_network_session_view': 'esp32_management',
+    'start_esp32_session_view': 'esp32_management',
+    'end_esp32_session_view': 'esp32_management',
+    'esp32_device_management_view': 'esp32_management',
+    'dynamic_esp32_session_view': 'esp32_management',
+    'correct_esp32_session_view': 'esp32_management',
+    'esp32_setup_view': 'esp32_management',
+    'check_esp32_status': 'esp32_management',
+    'esp32_start_session_view': 'esp32_management',
+    'esp32_session_active_view': 'esp32_management',
+    'esp32_end_session_view': 'esp32_management',
+    'esp32_device_management': 'esp32_management',
+
+    # 🔌 ESP32 device API
+    'api_device_heartbeat': 'esp32_api',
+    'api_device_connected': 'esp32_api',
+    'api_device_disconnected': 'esp32_api',
+    'esp32_events_batch_api': 'esp32_api',
+    'api_active_course': 'esp32_api',
+    'api_mark_attendance': 'esp32_api',
+    'esp32_heartbeat_api': 'esp32_api',
+    'esp32_check_session_api': 'esp32_api',
+    'esp32_mark_attendance_api': 'esp32_api',
+    'esp32_register_device_api': 'esp32_api',
+    'esp32_start_session_api': 'esp32_api',
+    'esp32_end_session_api': 'esp32_api',
+    'esp32_device_connected_api': 'esp32_api',
+    'esp32_device_disconnected_api': 'esp32_api',
+    'esp32_record_attendance_api': 'esp32_api',
+    'esp32_session_status_api': 'esp32_api',
+    'esp32_spool_status_api': 'esp32_api',
+    'esp32_rate_limit_status_api': 'esp32_api',
+    'esp32_sync_ack_api': 'esp32_api',
+    'esp32_sync_upload_api': 'esp32_api',
+    'esp32_roster_api': 'esp32_api',
+    'esp32_pool_api': 'esp32_api',
+    'esp32_verify_student_api': 'esp32_api',
+    'esp32_presence_update_api': 'esp32_api',
+    'verify_student_presence': 'esp32_api',
+    'esp32_presence_verify_api': 'esp32_api',
+    'esp32_student_verification_api': 'esp32_api',
+
+    # ⚡ ESP32 device API (async)
+    'esp32_heartbeat_api_async': 'esp32_api_async',
+    'esp32_device_connected_api_async': 'esp32_api_async',
+    'esp32_device_disconnected_api_async': 'esp32_api_async',
+    'esp32_record_attendance_api_async': 'esp32_api_async',
+    'esp32_verify_student_api_async': 'esp32_api_async',
+    'esp32_presence_update_api_async': 'esp32_api_async',
+    'esp32_presence_verify_api_async': 'esp32_api_async',
+
+    # 📬 ESP32 command long-poll
+    'esp32_commands_api': 'esp32_commands',
+
+    # 🔑 ESP32 API keys
+    'verify_api_token': 'esp32_auth',
+    'verify_request_signature': 'esp32_auth',
+    'generate_api_key': 'esp32_auth',
+    'get_or_create_api_key': 'esp32_auth',
+    'verify_api_key': 'esp32_auth',
+    'aget_or_create_api_key': 'esp32_auth',
+    'averify_api_key': 'esp32_auth',
+    'device_endpoint': 'esp32_auth',
+
+    # 📚 Course management (admin_ui/course_management.py)
+    'course_management': '..course_management',
+    'remove_student_enrollment': '..course_management',
+    'download_enrollment_template': '..course_management',
+    'enhanced_dashboard': '..course_management',
+    'upload_course_students': '..course_management',
+    'view_all_enrollments': '..course_management',
+    'test_database_connection': '..course_management',
+}
+
+# Views defined with ``async def``; their callbacks must look async to the handler
+ASYNC_VIEWS = {
+    'esp32_heartbeat_api_async',
+    'esp32_device_connected_api_async',
+    'esp32_device_disconnected_api_async',
+    'esp32_record_attendance_api_async',
+    'esp32_verify_student_api_async',
+    'esp32_presence_update_api_async',
+    'esp32_presence_verify_api_async',
+    'esp32_commands_api',
+}
+
+
+def _module_path(name):
+    module = VIEW_MODULES[name]
+    return resolve_name(module if module.startswith('.') else f'.{module}', __name__)
+
+
+def _load(name):
+    return getattr(import_module(_module_path(name)), name)
+
+
+def __getattr__(name):
+    if name in VIEW_MODULES:
+        return _load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(VIEW_MODULES))
+
+
+class LazyView:
+    """URL callback that imports the view's module on the first request"""
+
+    def __init__(self, name):
+        if name not in VIEW_MODULES:
+            raise ImportError(f"cannot import name {name!r} from {__name__!r}")
+        self.name = name
+        # Used by the URL resolver and debug pages without loading the module
+        self.__name__ = self.__qualname__ = name
+        self.__module__ = _module_path(name)
+        if name in ASYNC_VIEWS:
+            markcoroutinefunction(self)
+
+    @cached_property
+    def view(self):
+        return _load(self.name)
+
+    @property
+    def csrf_exempt(self):
+        # Read by CsrfViewMiddleware before the view runs
+        return getattr(self.view, 'csrf_exempt', False)
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def __repr__(self):
+        return f'<LazyView {self.__module__}.{self.name}>'
+
+
+def lazy_view(name):
+    """Return a URL callback for the named view without importing its module"""
+    return LazyView(name)
+
+
+def device_view(name):
+    """Like lazy_view(), but routes to the view's async version when ESP32_ASYNC_API is on"""
+    from django.conf import settings
+
+    async_name = f'{name}_async'
+    if getattr(settings, 'ESP32_ASYNC_API', False) and async_name in VIEW_MODULES:
+        return LazyView(async_name)
+    return LazyView(name)
@@ -0,0 +1,162 @@
+"""
+🔐 Authentication: admin/lecturer/student login, logout and lecturer registration
+"""
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.models import Group, User
+from django.shortcuts import redirect, render
+from django.utils.http import url_has_allowed_host_and_scheme
+
+from ..forms import AdminCreationForm, AdminLoginForm
+from ..models import AssignedCourse, Course, CourseEnrollment, Student
+from ..utils import load_courses_from_csv
+
+
+# 🔐 Admin Login
+def admin_login_view(request):
+    form = AdminLoginForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        user = authenticate(
+            request,
+            username=form.cleaned_data['username'],
+            password=form.cleaned_data['password']
+        )
+        if user and user.is_superuser:
+            login(request, user)
+            messages.success(request, 'Welcome, Admin!')
+            return redirect('admin_ui:register_lecturer')
+        messages.error(request, 'Invalid credentials or not an Admin.')
+    return render(request, 'admin_ui/admin_login.html', {'form': form})
+
+# 🧾 Admin Creation
+def create_admin_view(request):
+    form = AdminCreationForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        if form.cleaned_data['passkey'] == settings.SUPERUSER_PASSKEY:
+            User.objects.create_superuser(
+                username=form.cleaned_data['username'],
+                email=form.cleaned_data['email'],
+                password=form.cleaned_data['password']
+            )
+            messages.success(request, '✅ Admin created successfully!')
+            return redirect('admin_login')
+        messages.error(request, '❌ Invalid passkey.')
+    return render(request, 'admin_ui/create_admin.html', {'form': form})
+
+# 👨‍🏫 Lecturer Login
+def lecturer_login_view(request):
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        user = authenticate(request, username=username, password=password)
+        
+        if user is not None and user.is_authenticated:
+            if hasattr(user, 'lecturerassignment') or AssignedCourse.objects.filter(lecturer=user).exists():
+                login(request, user)
+                messages.success(request, f"✅ Welcome, {user.username}!")
+                return redirect('admin_ui:dashboard')
+            else:
+                messages.error(request, "❌ Access denied. You are not assigned to any courses.")
+        else:
+            messages.error(request, "❌ Invalid username or password.")
+    
+    return render(request, 'admin_ui/lecturer_login.html')
+
+# 👨‍🎓 Student Login
+def student_login_view(request):
+    # Where login_required sent the student from, e.g. a scanned QR check-in link
+    next_url = request.POST.get('next') or request.GET.get('next', '')
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        user = authenticate(request, username=username, password=password)
+        
+        if user is not None and user.is_authenticated:
+            # Check if user is a student (has student profile or is enrolled in courses)
+            try:
+                # Try to find a student with matching username (assuming username is matric number)
+                student = Student.objects.get(matric_no=username)
+                if CourseEnrollment.objects.filter(student=student).exists():
+                    login(request, user)
+                    messages.success(request, f"✅ Welcome, {student.name}!")
+                    if url_has_allowed_host_and_scheme(
+                        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+                    ):
+                        return redirect(next_url)
+                    return redirect('admin_ui:student_dashboard')
+                else:
+                    messages.error(request, "❌ Access denied. You are not enrolled in any courses.")
+            except Student.DoesNotExist:
+                messages.error(request, "❌ Access denied. Student profile not found.")
+        else:
+            messages.error(request, "❌ Invalid username or password.")
+    
+    return render(request, 'admin_ui/student_login.html', {'next': next_url})
+
+# 🗂 Register Lecturer + Assign Courses + Officer
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def register_lecturer_view(request):
+    courses = load_courses_from_csv('courses.csv')
+    lecturers = User.objects.filter(groups__name='Lecturers')
+    departments = ["Computer Science", "Electrical Engineering", "Mathematics", "Physics", "Statistics"]
+
+    if request.method == 'POST':
+        if 'register_lecturer' in request.POST:
+            full_name = request.POST.get('full_name')
+            email = request.POST.get('email')
+            department = request.POST.get('department')
+            password = request.POST.get('password')
+            confirm_password = request.POST.get('confirm_password')
+
+            if password != confirm_password:
+                messages.error(request, "❌ Passwords do not match.")
+            elif User.objects.filter(email=email).exists():
+                messages.warning(request, "Lecturer with this email already exists.")
+            else:
+                username = email.split("@")[0]
+                lecturer = User.objects.create_user(username=username, email=email, password=password)
+                group, _ = Group.objects.get_or_create(name='Lecturers')
+                lecturer.groups.add(group)
+                messages.success(request, "✅ Lecturer registered successfully!")
+
+        elif 'assign_course' in request.POST:
+            selected_lecturer_id = request.POST.get('selected_lecturer')
+            selected_courses = request.POST.getlist('selected_courses')
+            session = request.POST.get('session')
+            semester = request.POST.get('semester')
+
+            try:
+                lecturer = User.objects.get(id=selected_lecturer_id)
+                for course in courses:
+                    if course['code'] in selected_courses:
+                        course_obj, _ = Course.objects.get_or_create(
+                            code=course['code'],
+                            defaults={'title': course['title']}
+                        )
+                        AssignedCourse.objects.get_or_create(
+                            lecturer=lecturer,
+                            course=course_obj,
+                            session=session,
+                            semester=semester
+                        )
+                messages.success(request, "📚 Courses assigned successfully!")
+            except User.DoesNotExist:
+                messages.error(request, "Lecturer not found for course assignment.")
+
+        return redirect('admin_ui:register_lecturer')
+
+    context = {
+        'courses': courses,
+        'lecturers': lecturers,
+        'departments': departments,
+    }
+    return render(request, 'admin_ui/register_lecturer.html', context)
+
+# 🚪 Logout View
+def logout_view(request):
+    logout(request)
+    messages.success(request, "✅ You have been successfully logged out.")
+    return redirect('admin_login')
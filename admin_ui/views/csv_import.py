@@ -0,0 +1,152 @@
+"""
+📁 Student CSV import and fingerprint enrollment
+"""
+import csv
+import logging
+import os
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import NoReverseMatch, reverse
+from django.views.decorators.http import require_POST
+
+from ..forms import StudentCSVUploadForm
+from ..models import CourseEnrollment, FingerprintStudent, Student
+from ..utils import load_courses_from_csv
+
+logger = logging.getLogger(__name__)
+
+
+# 📦 Upload CSV to Preview
+@login_required
+def upload_student_csv_view(request):
+    form = StudentCSVUploadForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        csv_file = request.FILES['csv_file']
+        file_path = default_storage.save(f'temp/{csv_file.name}', ContentFile(csv_file.read()))
+        return redirect('preview_student_csv', file_path=file_path)
+    return render(request, 'admin_ui/upload_students.html', {'form': form})
+
+# 👁 Preview CSV contents
+@login_required
+def preview_student_csv_view(request, file_path):
+    students = []
+    full_path = os.path.join(settings.MEDIA_ROOT, file_path)
+    try:
+        with open(full_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                matric = row.get('matric_number')
+                name = row.get('name')
+                department = row.get('department') or row.get('Department') or ''
+                level = row.get('level') or row.get('Level') or ''
+                if matric and name:
+                    students.append({
+                        'matric_number': matric.strip(), 
+                        'name': name.strip(),
+                        'department': department.strip() if department else '',
+                        'level': level.strip() if level else ''
+                    })
+        return render(request, 'admin_ui/preview_students.html', {
+            'students': students,
+            'file_path': file_path
+        })
+    except Exception as e:
+        messages.error(request, f"❌ Failed to load CSV: {e}")
+        return redirect('upload_student_csv')
+
+# ✅ Confirm Save to Database
+@login_required
+def confirm_student_csv_save_view(request):
+    if request.method == 'POST':
+        file_path = request.POST.get('file_path')
+        full_path = default_storage.path(file_path)
+        with open(full_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                matric = row.get('matric_number')
+                name = row.get('name')
+                department = row.get('department') or row.get('Department') or ''
+                level = row.get('level') or row.get('Level') or ''
+                if matric and name:
+                    try:
+                        Student.objects.update_or_create(
+                            matric_no=matric.strip(),
+                            defaults={
+                                'name': name.strip(),
+                                'department': department.strip() if department else None,
+                                'level': level.strip() if level else None
+                            }
+                        )
+                    except Exception as e:
+                        messages.error(request, f"❌ Error saving student {matric}: {str(e)}")
+                        continue
+        messages.success(request, '✅ Students saved successfully!')
+        return redirect('upload_student_csv')
+    return redirect('upload_student_csv')
+
+# 🧬 Enroll Fingerprint + Assign Courses
+@login_required
+def enroll_fingerprint_view(request, matric_no):
+    # Decode the URL-encoded matric number
+    matric_no = unquote(matric_no)
+    student = get_object_or_404(Student, matric_no=matric_no)
+    fingerprint, _ = FingerprintStudent.objects.get_or_create(student=student)
+    
+    # Get all available courses for display (but don't auto-enroll)
+    courses = load_courses_from_csv('courses.csv')
+
+    if request.method == 'POST':
+        # Only handle fingerprint enrollment, not course enrollment
+        fingerprint.fingerprint_data = "fingerprint_enrolled_hash"
+        fingerprint.save()
+        
+        messages.success(request, f"✅ Fingerprint saved for {student.name}")
+        
+        # Redirect to enhanced dashboard to manage course enrollments
+        return redirect('admin_ui:enhanced_dashboard')
+
+    # Show current enrollments without modifying them
+    enrolled_courses = CourseEnrollment.objects.filter(student=student)
+    enrolled_course_codes = enrolled_courses.values_list('course__code', flat=True)
+
+    context = {
+        'student': student,
+        'courses': courses,
+        'fingerprint': fingerprint,
+        'enrolled_course_codes': list(enrolled_course_codes),
+        'enrolled_courses': enrolled_courses
+    }
+    return render(request, 'admin_ui/enroll_fingerprint.html', context)
+
+# ❌ De-enroll Student
+@require_POST
+@login_required
+def de_enroll_student(request, matric_no):
+    # Decode the URL-encoded matric number
+    matric_no = unquote(matric_no)
+    student = get_object_or_404(Student, matric_no=matric_no)
+
+    fingerprint = FingerprintStudent.objects.filter(student=student).first()
+    if fingerprint:
+        fingerprint.fingerprint_data = 'not_enrolled'
+        fingerprint.save()
+        logger.info(f"Fingerprint data cleared for {student.matric_no}")
+
+    deleted_count, _ = CourseEnrollment.objects.filter(student=student).delete()
+    logger.info(f"{deleted_count} course enrollments removed for {student.matric_no}")
+
+    messages.warning(request, f"⚠️ {student.name} has been de-enrolled.")
+
+    try:
+        url = reverse('admin_ui:enroll_fingerprint', kwargs={'matric_no': student.matric_no})
+    except NoReverseMatch:
+        logger.error(f"Reverse failed for matric_no: {student.matric_no}")
+        url = f'/admin-panel/enroll-fingerprint/{student.matric_no}/'
+
+    return redirect(url)
@@ -0,0 +1,112 @@
+"""
+📊 Lecturer, student and admin dashboards
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from ..attendance_stats import get_course_summaries, get_student_summaries
+from ..models import AssignedCourse, AttendanceRecord, CourseEnrollment, NetworkSession, Student
+
+
+# 👨‍🏫 Lecturer Dashboard
+@login_required
+def dashboard(request):
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    
+    # Get active network sessions for this lecturer (only today's sessions)
+    today = timezone.now().date()
+    active_network_sessions = NetworkSession.objects.filter(
+        lecturer=request.user,
+        is_active=True,
+        date=today
+    ).order_by('-created_at')
+    
+    # Get total students across all assigned courses (using CourseEnrollment for accurate count)
+    # This counts unique students across all assigned courses
+    total_students = Student.objects.filter(
+        courseenrollment__course__in=[assigned.course for assigned in assigned_courses]
+    ).distinct().count()
+    
+    # Total enrollments across the assigned course terms, read from the course summaries
+    course_summaries = get_course_summaries(
+        {(assigned.course_id, assigned.session, assigned.semester) for assigned in assigned_courses}
+    )
+    total_enrollments = sum(summary.enrolled_count for summary in course_summaries.values())
+    
+    # Get total active sessions count (all time, not just today)
+    total_active_sessions = NetworkSession.objects.filter(
+        lecturer=request.user,
+        is_active=True
+    ).count()
+    
+    # Get today's active sessions count
+    today_active_sessions = active_network_sessions.count()
+    
+    # Get recent network sessions for display
+    recent_sessions = NetworkSession.objects.filter(
+        lecturer=request.user
+    ).order_by('-date', '-start_time')[:5]
+    
+    return render(request, 'admin_ui/dashboard.html', {
+        'assigned_courses': assigned_courses,
+        'active_network_sessions': active_network_sessions,
+        'total_students': total_students,  # Unique students across all courses
+        'total_enrollments': total_enrollments,  # Total enrollments (may include duplicates)
+        'recent_sessions': recent_sessions
+    })
+
+# 👨‍🎓 Student Dashboard
+@login_required
+def student_dashboard(request):
+    """Dashboard for students to view their courses and attendance"""
+    try:
+        # Try to find student by username (assuming username is matric number)
+        student = Student.objects.get(matric_no=request.user.username)
+    except Student.DoesNotExist:
+        # If no student profile exists, redirect to error page
+        messages.error(request, "❌ Student profile not found. Please contact administrator.")
+        return redirect('admin_ui:student_login')
+    
+    # Get enrolled courses with this student's attendance in each
+    enrolled_courses = CourseEnrollment.objects.filter(student=student).select_related('course')
+    student_summaries = get_student_summaries(
+        {(student.matric_no, enrollment.course_id, enrollment.session, enrollment.semester)
+         for enrollment in enrolled_courses}
+    )
+    for enrollment in enrolled_courses:
+        enrollment.attendance = student_summaries[
+            (student.matric_no, enrollment.course_id, enrollment.session, enrollment.semester)
+        ]
+    
+    # Get attendance records
+    attendance_records = AttendanceRecord.objects.filter(student=student).order_by('-attendance_session__date')
+    
+    # Get recent network sessions (for information)
+    recent_sessions = NetworkSession.objects.filter(
+        course__in=[enrollment.course for enrollment in enrolled_courses]
+    ).order_by('-date')[:5]
+    
+    context = {
+        'student': student,
+        'enrolled_courses': enrolled_courses,
+        'attendance_records': attendance_records,
+        'recent_sessions': recent_sessions,
+    }
+    
+    return render(request, 'admin_ui/student_dashboard.html', context)
+
+# 📊 Admin Attendance Dashboard
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def attendance_dashboard(request):
+    students = Student.objects.all()
+    return render(request, 'admin_ui/attendance.html', {'students': students})
+
+# 📦 View All Assigned Courses
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def view_assignments(request):
+    all_assignments = AssignedCourse.objects.all()
+    return render(request, 'admin_ui/view_assignments.html', {'assignments': all_assignments})
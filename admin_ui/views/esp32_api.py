@@ -0,0 +1,1435 @@
+"""
+🔌 ESP32 device API
+
+Endpoints called by the ESP32 gateways (heartbeats, station events, presence
+reports, attendance marks), not by browsers.
+"""
+import json
+import logging
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from ..access_points import (
+    invalidate_session_pools,
+    mark_lock,
+    pool_device_ids,
+    pool_presence_snapshot,
+    pool_present_members,
+    pool_status,
+    record_station_count,
+)
+from ..attendance_service import create_record, get_or_create_attendance_session
+from ..attendance_spool import get_attendance_spool, spool_enabled, spool_mark
+from ..device_config import config_response, get_device_config
+from ..device_events import MAX_BATCH_EVENTS, apply_device_events
+from ..device_rate_limit import device_throttle, rate_limit_stats
+from ..device_roster import roster_delta, roster_etag, roster_snapshot, roster_version
+from ..device_sync import MAX_STREAM_LENGTH, MAX_SYNC_EVENTS, apply_sync_batch, last_sequence
+from ..heartbeats import record_heartbeat, update_device_fields
+from ..idempotency import idempotent
+from ..models import (
+    AssignedCourse,
+    AttendanceRecord,
+    ConnectedDevice,
+    Course,
+    CourseEnrollment,
+    ESP32Device,
+    NetworkSession,
+    SessionAccessPoint,
+    Student,
+)
+from ..presence import DELTA_APPLIED, get_presence_store
+from ..presence_history import maybe_record_sample
+from ..session_registry import get_active_session, invalidate_active_session
+from .esp32_auth import device_endpoint, verify_api_key
+from .esp32_payloads import (
+    LEGACY_TERM,
+    PayloadError,
+    already_marked_response,
+    attendance_recorded_response,
+    error_response,
+    heartbeat_response,
+    invalid_api_key_response,
+    no_presence_data_response,
+    no_session_response,
+    not_verified_response,
+    presence_delta_response,
+    presence_device_defaults,
+    presence_error_response,
+    presence_query_response,
+    presence_updated_response,
+    read_attendance_record,
+    read_heartbeat,
+    read_presence_query,
+    read_presence_report,
+    read_station_event,
+    read_student_verification,
+    server_error_response,
+    station_connected_response,
+    station_disconnected_response,
+    station_not_found_response,
+    student_verification_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+def api_device_disconnected(request):
+    """ESP32 reports device disconnection"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            device_id = data.get('device_id')
+            mac_address = data.get('mac_address')
+            
+            if device_id and mac_address:
+                # Find the ESP32 device
+                try:
+                    esp32_device = ESP32Device.objects.get(device_id=device_id)
+                except ESP32Device.DoesNotExist:
+                    return JsonResponse({'status': 'error', 'message': 'ESP32 device not found'}, status=404)
+                
+                # Find and update connected device record
+                try:
+                    connected_device = ConnectedDevice.objects.get(
+                        network_session__esp32_device=esp32_device,
+                        mac_address=mac_address,
+                        is_connected=True
+                    )
+                    connected_device.is_connected = False
+                    connected_device.disconnected_at = timezone.now()
+                    connected_device.save()
+                    
+                    return JsonResponse({
+                        'status': 'success',
+                        'message': 'Device disconnection recorded',
+                        'mac_address': mac_address
+                    })
+                except ConnectedDevice.DoesNotExist:
+                    return JsonResponse({
+                        'status': 'warning',
+                        'message': 'Device was not found in connected devices',
+                        'mac_address': mac_address
+                    })
+            else:
+                return JsonResponse({'status': 'error', 'message': 'Device ID and MAC address required'}, status=400)
+                
+        except json.JSONDecodeError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+        except Exception as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+# 📦 Batched connect/disconnect/presence events
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+def esp32_events_batch_api(request):
+    """ESP32 uploads an ordered batch of connect/disconnect/presence events in one request"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'status': 'error', 'message': 'Request body must be a JSON object'}, status=400)
+
+    device_id = data.get('device_id')
+    events = data.get('events')
+
+    if not device_id:
+        return JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400)
+    if not isinstance(events, list):
+        return JsonResponse({'status': 'error', 'message': 'events must be a list'}, status=400)
+    if len(events) > MAX_BATCH_EVENTS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Too many events in one batch (max {MAX_BATCH_EVENTS})'
+        }, status=413)
+
+    try:
+        results, summary, active_session = apply_device_events(device_id, events)
+    except ESP32Device.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'ESP32 device not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+    return JsonResponse({
+        'status': 'success',
+        'device_id': device_id,
+        'session_id': active_session.id if active_session else None,
+        'course': active_session.course.code if active_session else None,
+        'summary': summary,
+        'results': results
+    })
+
+# 🔄 Offline buffer reconciliation
+@csrf_exempt
+@require_http_methods(["GET"])
+@device_endpoint
+@device_throttle('sync')
+def esp32_sync_ack_api(request):
+    """Highest buffered event sequence the server has applied for a device stream"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    device_id = request.GET.get('device_id')
+    stream = request.GET.get('stream', 'default')
+    if not device_id:
+        return JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        'device_id': device_id,
+        'stream': stream,
+        'last_sequence': last_sequence(device_id, stream)
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('sync')
+def esp32_sync_upload_api(request):
+    """ESP32 uploads the events it buffered while offline, numbered by sequence"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'status': 'error', 'message': 'Request body must be a JSON object'}, status=400)
+
+    device_id = data.get('device_id')
+    stream = str(data.get('stream') or 'default')
+    events = data.get('events')
+
+    if not device_id:
+        return JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400)
+    if len(stream) > MAX_STREAM_LENGTH:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'stream is longer than {MAX_STREAM_LENGTH} characters'
+        }, status=400)
+    if not isinstance(events, list):
+        return JsonResponse({'status': 'error', 'message': 'events must be a list'}, status=400)
+    if len(events) > MAX_SYNC_EVENTS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Too many events in one upload (max {MAX_SYNC_EVENTS})'
+        }, status=413)
+
+    try:
+        results, summary, applied_up_to = apply_sync_batch(device_id, stream, events)
+    except ESP32Device.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'ESP32 device not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+    return JsonResponse({
+        'status': 'success',
+        'device_id': device_id,
+        'stream': stream,
+        'last_sequence': applied_up_to,
+        'summary': summary,
+        'results': results
+    })
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@device_endpoint
+@device_throttle('session')
+def esp32_roster_api(request):
+    """ESP32 downloads the hashed roster of its active session, or what changed since its copy"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    device_id = request.GET.get('device_id')
+    if not device_id:
+        return JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400)
+    
+    active_session = get_active_session(device_id)
+    if not active_session:
+        return JsonResponse({'status': 'success', 'device_id': device_id, 'session_active': False})
+    
+    try:
+        since = int(request.GET['since']) if request.GET.get('since') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'since must be a roster version'}, status=400)
+    # A version from another session's roster cannot be patched, only replaced
+    if str(request.GET.get('session_id', '')) != str(active_session['id']):
+        since = None
+    
+    etag = roster_etag(active_session, roster_version(
+        active_session['course_id'], active_session['session'], active_session['semester']
+    ))
+    if etag in [tag.strip().removeprefix('W/') for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+    
+    roster = roster_delta(active_session, since) if since is not None else None
+    if roster is None:
+        roster = roster_snapshot(active_session)
+    response = JsonResponse({'status': 'success', 'device_id': device_id, 'session_active': True, **roster})
+    response['ETag'] = roster_etag(active_session, roster['version'])
+    return response
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@device_endpoint
+@device_throttle('stations')
+def esp32_pool_api(request):
+    """Access points serving the device's session, their load, and the one new students should join"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    device_id = request.GET.get('device_id')
+    if not device_id:
+        return JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400)
+    
+    active_session = get_active_session(device_id)
+    if not active_session:
+        return JsonResponse({'status': 'success', 'device_id': device_id, 'session_active': False})
+    
+    return JsonResponse({
+        'status': 'success',
+        'device_id': device_id,
+        'session_active': True,
+        **pool_status(active_session)
+    })
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def api_active_course(request):
+    """ESP32 gets active course information for dynamic configuration"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            base_device_id = data.get('base_device_id', 'ESP32_')
+            
+            # Find active network session
+            active_session = NetworkSession.objects.filter(
+                is_active=True
+            ).first()
+            
+            if active_session:
+                # Generate dynamic device ID and SSID based on course
+                course_code = active_session.course.code
+                course_title = active_session.course.title
+                session = active_session.session
+                semester = active_session.semester
+                
+                # Create dynamic device ID: ESP32_CS101_001
+                device_id = f"{base_device_id}{course_code}_{active_session.id:03d}"
+                
+                # Create dynamic SSID: CS101_Attendance
+                ssid = f"{course_code}_Attendance"
+                
+                return JsonResponse({
+                    'active_course': True,
+                    'course_code': course_code,
+                    'course_title': course_title,
+                    'session': session,
+                    'semester': semester,
+                    'device_id': device_id,
+                    'ssid': ssid,
+                    'lecturer': active_session.lecturer.username,
+                    'esp32_device': active_session.esp32_device.device_name if active_session.esp32_device else 'Unknown Device'
+                })
+            else:
+                return JsonResponse({
+                    'active_course': False,
+                    'message': 'No active network session found'
+                })
+                
+        except json.JSONDecodeError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+        except Exception as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+# ESP32 API Endpoints for device communication
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('heartbeat')
+def api_device_heartbeat(request):
+    """ESP32 device heartbeat endpoint"""
+    if request.method == 'POST':
+        device_id = request.POST.get('device_id')
+        ssid = request.POST.get('ssid')
+        
+        config = get_device_config(device_id)
+        if config is None:
+            return JsonResponse({'status': 'error', 'message': 'Device not found'}, status=404)
+        
+        # Only a changed config is written here; the heartbeat itself is batched
+        if ssid and ssid != config['ssid']:
+            update_device_fields(ESP32Device.objects.get(device_id=device_id), ssid=ssid)
+            config = get_device_config(device_id)
+        record_heartbeat(device_id)
+        
+        return config_response(
+            request, config, request.POST.get('config_version'),
+            status='ok', message='Heartbeat received'
+        )
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+def api_device_connected(request):
+    """ESP32 device connection endpoint"""
+    if request.method == 'POST':
+        device_id = request.POST.get('device_id')
+        course_code = request.POST.get('course_code')
+        
+        try:
+            device = ESP32Device.objects.get(device_id=device_id)
+            course = Course.objects.get(code=course_code)
+            
+            # Find or create active network session
+            network_session, created = NetworkSession.objects.get_or_create(
+                esp32_device=device,
+                course=course,
+                date=timezone.now().date(),
+                is_active=True,
+                defaults={
+                    'lecturer': device.assigned_lecturer if hasattr(device, 'assigned_lecturer') else None,
+                    'session': "2024/2025",
+                    'semester': "1st Semester",
+                    'start_time': timezone.now()
+                }
+            )
+            
+            if not created:
+                network_session.esp32_device = device
+                network_session.is_active = True
+                network_session.save()
+            
+            return JsonResponse({
+                'status': 'ok', 
+                'message': f'Connected to {course.code}',
+                'session_id': network_session.id
+            })
+        except (ESP32Device.DoesNotExist, Course.DoesNotExist):
+            return JsonResponse({'status': 'error', 'message': 'Device or course not found'}, status=404)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+def api_mark_attendance(request):
+    """API endpoint for marking attendance via ESP32"""
+    if request.method == 'POST':
+        matric_no = request.POST.get('matric_no')
+        device_id = request.POST.get('device_id')
+        
+        try:
+            student = Student.objects.get(matric_no=matric_no)
+            
+            # Find active network session for this device
+            network_session = get_active_session(device_id)
+            if not network_session and not ESP32Device.objects.filter(device_id=device_id).exists():
+                raise ESP32Device.DoesNotExist
+            
+            if not network_session or network_session['date'] != timezone.now().date():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'No active session found for this device.'
+                })
+            
+            # Check if student is enrolled
+            if not CourseEnrollment.objects.filter(
+                student=student,
+                course_id=network_session['course_id'],
+                session=network_session['session'],
+                semester=network_session['semester']
+            ).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Student not enrolled in this course.'
+                })
+            
+            # Another access point of the session may be recording this student right now
+            with mark_lock(network_session['id'], student.matric_no) as claimed:
+                if not claimed:
+                    created = False
+                elif spool_enabled():
+                    # Acknowledge now; the record is written by the spool applier
+                    created = spool_mark(
+                        student.matric_no, network_session['course_id'], network_session['lecturer_id'],
+                        network_session['session'], network_session['semester'],
+                        esp32_device_id=network_session['device_pk']
+                    )
+                else:
+                    # Mark attendance
+                    attendance_session, _ = get_or_create_attendance_session(
+                        course_id=network_session['course_id'],
+                        lecturer_id=network_session['lecturer_id'],
+                        session=network_session['session'],
+                        semester=network_session['semester'],
+                        date=timezone.now().date()
+                    )
+                
+                    attendance_record, created = AttendanceRecord.objects.get_or_create(
+                        attendance_session=attendance_session,
+                        student=student,
+                        defaults={
+                            'status': 'present',
+                            'network_verified': True,
+                            'esp32_device_id': network_session['device_pk']
+                        }
+                    )
+            
+            if created:
+                return JsonResponse({
+                    'success': True,
+                    'message': f'Attendance marked for {student.name}',
+                    'student_name': student.name
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Attendance already marked for today.'
+                })
+                
+        except (Student.DoesNotExist, ESP32Device.DoesNotExist):
+            return JsonResponse({
+                'success': False,
+                'message': 'Student or device not found.'
+            })
+    
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def esp32_check_session_api(request):
+    """ESP32 checks for active session"""
+    if request.method == 'POST':
+        device_id = request.POST.get('device_id')
+        
+        try:
+            # Check for active session
+            active_session = get_active_session(device_id)
+            if not active_session and not ESP32Device.objects.filter(device_id=device_id).exists():
+                raise ESP32Device.DoesNotExist
+            
+            if active_session and active_session['date'] == timezone.now().date():
+                return JsonResponse({
+                    'status': 'ok',
+                    'has_session': True,
+                    'session_data': {
+                        'course_code': active_session['course_code'],
+                        'course_name': active_session['course_title'],
+                        'lecturer': active_session['lecturer_name'],
+                        'session': active_session['session'],
+                        'semester': active_session['semester'],
+                        'start_time': active_session['start_time'].isoformat()
+                    }
+                })
+            else:
+                return JsonResponse({
+                    'status': 'ok',
+                    'has_session': False,
+                    'message': 'No active session'
+                })
+                
+        except ESP32Device.DoesNotExist:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Device not registered'
+            }, status=404)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+def esp32_mark_attendance_api(request):
+    """ESP32 submits student attendance"""
+    if request.method == 'POST':
+        matric_no = request.POST.get('matric_no')
+        student_name = request.POST.get('student_name')
+        device_id = request.POST.get('device_id')
+        
+        try:
+            # Find student by matric number or name
+            student = Student.objects.filter(
+                matric_no=matric_no
+            ).first() or Student.objects.filter(
+                name__icontains=student_name
+            ).first()
+            
+            if not student:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Student not found. Please check your details.'
+                })
+            
+            # Find active network session for this device
+            network_session = get_active_session(device_id)
+            if not network_session and not ESP32Device.objects.filter(device_id=device_id).exists():
+                raise ESP32Device.DoesNotExist
+            
+            if not network_session or network_session['date'] != timezone.now().date():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'No active session found. Please contact your lecturer.'
+                })
+            
+            # Check if student is enrolled in the course
+            if not CourseEnrollment.objects.filter(
+                student=student,
+                course_id=network_session['course_id'],
+                session=network_session['session'],
+                semester=network_session['semester']
+            ).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': f"You are not enrolled in {network_session['course_code']}."
+                })
+            
+            # Another access point of the session may be recording this student right now
+            with mark_lock(network_session['id'], student.matric_no) as claimed:
+                if not claimed:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'Attendance already marked for today.'
+                    })
+                
+                # Check if attendance already marked
+                existing_record = AttendanceRecord.objects.filter(
+                    student=student,
+                    attendance_session__course_id=network_session['course_id'],
+                    attendance_session__date=network_session['date']
+                ).first()
+            
+                if existing_record:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'Attendance already marked for today.'
+                    })
+            
+                if spool_enabled():
+                    # Acknowledge now; the record is written by the spool applier
+                    if not spool_mark(
+                        student.matric_no, network_session['course_id'], network_session['lecturer_id'],
+                        network_session['session'], network_session['semester'], day=network_session['date'],
+                        esp32_device_id=network_session['device_pk']
+                    ):
+                        return JsonResponse({
+                            'success': False,
+                            'message': 'Attendance already marked for today.'
+                        })
+                
+                    return JsonResponse({
+                        'success': True,
+                        'message': f'Attendance marked successfully for {student.name}!',
+                        'student_name': student.name,
+                        'course': network_session['course_code'],
+                        'timestamp': timezone.now().isoformat()
+                    })
+            
+                # Create attendance session if not exists
+                attendance_session, created = get_or_create_attendance_session(
+                    course_id=network_session['course_id'],
+                    lecturer_id=network_session['lecturer_id'],
+                    session=network_session['session'],
+                    semester=network_session['semester'],
+                    date=network_session['date'],
+                    defaults={'start_time': network_session['start_time']}
+                )
+            
+                # Mark attendance; a record written since the check above wins
+                attendance_record = create_record(
+                    attendance_session=attendance_session,
+                    student=student,
+                    status='present',
+                    network_verified=True,
+                    esp32_device_id=network_session['device_pk'],
+                    timestamp=timezone.now()
+                )
+                if attendance_record is None:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'Attendance already marked for today.'
+                    })
+            
+                return JsonResponse({
+                    'success': True,
+                    'message': f'Attendance marked successfully for {student.name}!',
+                    'student_name': student.name,
+                    'course': network_session['course_code'],
+                    'timestamp': attendance_record.timestamp.isoformat()
+                })
+                
+        except ESP32Device.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Device not registered'
+            }, status=404)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': f'Error marking attendance: {str(e)}'
+            }, status=500)
+    
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def esp32_register_device_api(request):
+    """Register new ESP32 device"""
+    if request.method == 'POST':
+        device_id = request.POST.get('device_id')
+        device_name = request.POST.get('device_name')
+        lecturer_username = request.POST.get('lecturer_username')
+        
+        try:
+            lecturer = User.objects.get(username=lecturer_username)
+            
+            # Check if lecturer is assigned to any courses
+            if not AssignedCourse.objects.filter(lecturer=lecturer).exists():
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Lecturer not assigned to any courses'
+                }, status=400)
+            
+            # Create or update device
+            device, created = ESP32Device.objects.get_or_create(
+                device_id=device_id,
+                defaults={
+                    'device_name': device_name,
+                    'assigned_lecturer': lecturer,
+                    'is_active': True,
+                    'last_heartbeat': timezone.now()
+                }
+            )
+            
+            if not created:
+                device.assigned_lecturer = lecturer
+                update_device_fields(device, device_name=device_name, is_active=True)
+            
+            return JsonResponse({
+                'status': 'ok',
+                'message': 'Device registered successfully',
+                'device_id': device.device_id,
+                'assigned_lecturer': lecturer.username
+            })
+            
+        except User.DoesNotExist:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Lecturer not found'
+            }, status=404)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+# 📡 ESP32 Session Management API
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def esp32_start_session_api(request):
+    """ESP32 API endpoint to start a network session"""
+    # Verify API key
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+        device_id = data.get('device_id')
+        course_code = data.get('course_code')
+        
+        if not device_id or not course_code:
+            return JsonResponse({'error': 'Missing device_id or course_code'}, status=400)
+        
+        # Get or create ESP32 device
+        esp32_device, created = ESP32Device.objects.get_or_create(
+            device_id=device_id,
+            defaults={
+                'device_name': f"{course_code} Classroom ESP32",
+                'ssid': f"{course_code}_Attendance",
+                'password': 'attendance123',
+                'location': f"Classroom {course_code}",
+                'is_active': True
+            }
+        )
+        
+        # End any existing active sessions for this device
+        NetworkSession.objects.filter(
+            esp32_device=esp32_device,
+            is_active=True
+        ).update(is_active=False, end_time=timezone.now())
+        invalidate_active_session(device_id)
+        invalidate_session_pools(NetworkSession.objects.filter(esp32_device=esp32_device))
+        
+        # Create new network session
+        network_session = NetworkSession.objects.create(
+            esp32_device=esp32_device,
+            course=Course.objects.get(code=course_code),
+            lecturer=User.objects.get(username='lecturer1'),  # Default lecturer
+            session='2024/2025',
+            semester='1st Semester',
+            date=timezone.now().date(),
+            start_time=timezone.now(),
+            is_active=True
+        )
+        
+        return JsonResponse({
+            'success': True,
+            'session_id': network_session.id,
+            'message': f'Session started for {course_code}'
+        })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+def esp32_record_attendance_api(request):
+    """ESP32 API endpoint to record attendance"""
+    # Verify API key
+    if not verify_api_key(request):
+        return invalid_api_key_response()
+    
+    try:
+        data = read_attendance_record(request)
+        
+        # Get course and student
+        try:
+            course = Course.objects.get(code=data['course_code'])
+            student = Student.objects.get(matric_no=data['matric_no'])
+        except (Course.DoesNotExist, Student.DoesNotExist):
+            return error_response('Course or student not found')
+        
+        # Check if student is enrolled in this course
+        if not CourseEnrollment.objects.filter(student=student, course=course, **LEGACY_TERM).exists():
+            return error_response('Student not enrolled in this course')
+        
+        # Check if attendance already marked today
+        today = timezone.now().date()
+        if AttendanceRecord.objects.filter(
+            student=student,
+            attendance_session__course=course,
+            attendance_session__date=today
+        ).exists():
+            return already_marked_response()
+        
+        # Create attendance session if not exists
+        attendance_session, created = get_or_create_attendance_session(
+            course=course,
+            date=today,
+            **LEGACY_TERM,
+            defaults={'lecturer': User.objects.get(username='lecturer1')}
+        )
+        
+        # Record attendance; a record written since the check above wins
+        attendance_record = create_record(
+            student=student,
+            attendance_session=attendance_session,
+            status='present',
+            marked_at=timezone.now(),
+            device_mac=data.get('mac_address') or 'Unknown'
+        )
+        if attendance_record is None:
+            return already_marked_response()
+        
+        return attendance_recorded_response(data, attendance_record)
+        
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('heartbeat')
+def esp32_heartbeat_api(request):
+    """ESP32 API endpoint for heartbeat"""
+    # Verify API key
+    if not verify_api_key(request):
+        return invalid_api_key_response()
+    
+    try:
+        data = read_heartbeat(request)
+        
+        # Update device heartbeat
+        record_heartbeat(data['device_id'])
+        record_station_count(data['device_id'], data.get('station_count'))
+        
+        return heartbeat_response(request, data, get_device_config(data['device_id']))
+        
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def esp32_end_session_api(request):
+    """ESP32 API endpoint to end a network session"""
+    # Verify API key
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+        device_id = data.get('device_id')
+        
+        if not device_id:
+            return JsonResponse({'error': 'Missing device_id'}, status=400)
+        
+        # Find and end active session for this device
+        active_session = get_active_session(device_id)
+        network_session = NetworkSession.objects.select_related('esp32_device').filter(
+            id=active_session['id'],
+            is_active=True
+        ).first() if active_session else None
+        
+        if network_session and active_session['device_id'] != active_session.get('primary_device_id', device_id):
+            # An extra access point only leaves the pool; the session goes on on the others
+            SessionAccessPoint.objects.filter(
+                network_session_id=active_session['id'], esp32_device__device_id=device_id
+            ).delete()
+            
+            return JsonResponse({
+                'success': True,
+                'message': f"Device left the access point pool of {active_session['course_code']}",
+                'session_id': active_session['id']
+            })
+        elif network_session:
+            # Saved (not updated) so the signals notify the device and refresh its configuration
+            network_session.is_active = False
+            network_session.end_time = timezone.now()
+            network_session.save()
+            
+            return JsonResponse({
+                'success': True,
+                'message': f"Session ended for {active_session['course_code']}",
+                'session_id': active_session['id']
+            })
+        else:
+            return JsonResponse({
+                'success': False,
+                'message': 'No active session found for this device'
+            })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+def esp32_device_connected_api(request):
+    """ESP32 API endpoint for device connection notification"""
+    # Verify API key
+    if not verify_api_key(request):
+        return invalid_api_key_response()
+    
+    try:
+        device_id, mac_address, ip_address = read_station_event(request)
+        
+        # Find active session for this device
+        active_session = get_active_session(device_id)
+        
+        if not active_session:
+            return no_session_response()
+        
+        # Create or update connected device record
+        connected_device, created = ConnectedDevice.objects.get_or_create(
+            network_session_id=active_session['id'],
+            mac_address=mac_address,
+            defaults={
+                'ip_address': ip_address,
+                'is_connected': True
+            }
+        )
+        
+        if not created:
+            # Update existing record
+            connected_device.ip_address = ip_address
+            connected_device.is_connected = True
+            connected_device.save()
+        
+        return station_connected_response(connected_device)
+        
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@device_endpoint
+@idempotent
+@device_throttle('session')
+def esp32_session_status_api(request):
+    """ESP32 API endpoint to get session status"""
+    # Verify API key
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        device_id = request.GET.get('device_id')
+        
+        if not device_id:
+            return JsonResponse({'error': 'Missing device_id parameter'}, status=400)
+        
+        # Find active session for this device
+        active_session = get_active_session(device_id)
+        
+        if active_session:
+            # Get connected devices count
+            connected_count = ConnectedDevice.objects.filter(
+                network_session_id=active_session['id'],
+                is_connected=True
+            ).count()
+            
+            return JsonResponse({
+                'success': True,
+                'session_active': True,
+                'course_code': active_session['course_code'],
+                'course_title': active_session['course_title'],
+                'lecturer': active_session['lecturer_username'],
+                'start_time': active_session['start_time'].isoformat(),
+                'connected_devices': connected_count,
+                'session_id': active_session['id']
+            })
+        else:
+            return JsonResponse({
+                'success': True,
+                'session_active': False,
+                'message': 'No active session found'
+            })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def esp32_spool_status_api(request):
+    """Queue depth and lag of the attendance write-behind spool (for monitoring)"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        if not spool_enabled():
+            return JsonResponse({'success': True, 'enabled': False, 'depth': 0, 'lag_seconds': 0.0, 'failed': 0})
+        
+        return JsonResponse({'success': True, 'enabled': True, **get_attendance_spool().stats()})
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def esp32_rate_limit_status_api(request):
+    """Device API throttle and load-shedding counters (for monitoring)"""
+    if not verify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+    
+    try:
+        return JsonResponse({'success': True, **rate_limit_stats()})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+def esp32_verify_student_api(request):
+    """ESP32 API endpoint to verify student enrollment"""
+    # Verify API key
+    if not verify_api_key(request):
+        return invalid_api_key_response()
+    
+    try:
+        matric_no, course_code = read_student_verification(request)
+        
+        # Check if student exists
+        try:
+            student = Student.objects.get(matric_no=matric_no)
+        except Student.DoesNotExist:
+            return not_verified_response('Student not found')
+        
+        # Check if course exists
+        try:
+            course = Course.objects.get(code=course_code)
+        except Course.DoesNotExist:
+            return not_verified_response('Course not found')
+        
+        # Check if student is enrolled in this course
+        is_enrolled = CourseEnrollment.objects.filter(student=student, course=course, **LEGACY_TERM).exists()
+        
+        return student_verification_response(student, course, is_enrolled)
+        
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('presence')
+def esp32_presence_update_api(request):
+    """
+    ESP32 sends its connected devices for presence verification: the full list
+    (connected_devices), or the stations that joined and left since its previous
+    report. This is used with Method 2: Simple presence verification system
+    """
+    if request.method == 'POST':
+        try:
+            device_id, connected_devices, joined, left, seq = read_presence_report(request)
+            
+            # Find or create ESP32 device
+            ESP32Device.objects.get_or_create(device_id=device_id, defaults=presence_device_defaults(device_id))
+            
+            # Update last heartbeat
+            record_heartbeat(device_id)
+            
+            if connected_devices is None:
+                # Delta report: apply only what changed since the previous report
+                outcome = get_presence_store().apply_delta(device_id, joined, left, seq)
+                if outcome['result'] == DELTA_APPLIED:
+                    record_station_count(device_id, outcome['device_count'])
+                    maybe_record_sample(device_id)
+                return presence_delta_response(device_id, outcome)
+            
+            # Store connected devices in the shared presence store
+            get_presence_store().set_members(device_id, connected_devices, seq=seq)
+            record_station_count(device_id, len(connected_devices))
+            maybe_record_sample(device_id)
+            
+            logger.debug('Presence update from %s: %d devices connected', device_id, len(connected_devices))
+            
+            return presence_updated_response(device_id, connected_devices, seq)
+            
+        except PayloadError as e:
+            return e.response
+        except Exception as e:
+            return presence_error_response(e)
+    
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+def verify_student_presence(student_id=None, device_id="ESP32_PRESENCE_001"):
+    """
+    Check if a student is physically present in the classroom
+    Returns (bool, message) tuple
+    """
+    try:
+        presence_data = pool_presence_snapshot(
+            get_presence_store(), pool_device_ids(get_active_session(device_id), device_id)
+        )
+        
+        if not presence_data:
+            return False, "No presence data available from ESP32"
+        
+        device_count = presence_data.get('device_count', 0)
+        
+        if device_count > 0:
+            return True, f"Presence verified - {device_count} devices connected to classroom WiFi"
+        else:
+            return False, "No devices connected to classroom network"
+            
+    except Exception as e:
+        return False, f"Error checking presence: {str(e)}"
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+def esp32_device_disconnected_api(request):
+    """ESP32 API endpoint for device disconnection notification"""
+    # Verify API key
+    if not verify_api_key(request):
+        return invalid_api_key_response()
+    
+    try:
+        device_id, mac_address, _ = read_station_event(request)
+        
+        # Find active session for this device
+        active_session = get_active_session(device_id)
+        
+        if not active_session:
+            return no_session_response()
+        
+        # Update connected device record to disconnected
+        try:
+            connected_device = ConnectedDevice.objects.get(
+                network_session_id=active_session['id'],
+                mac_address=mac_address
+            )
+        except ConnectedDevice.DoesNotExist:
+            return station_not_found_response(mac_address)
+        connected_device.is_connected = False
+        connected_device.save()
+        
+        return station_disconnected_response(connected_device)
+        
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('presence')
+def esp32_presence_verify_api(request):
+    """
+    Verify if a student device was present at a specific time
+    Used by the attendance system to check ESP32 presence
+
+    Send 'student_device_ids' (a list of MACs) instead of 'student_device_id'
+    to verify a whole class roster in one call.
+    """
+    if request.method == 'POST':
+        try:
+            student_device_id, student_device_ids, esp32_device_id = read_presence_query(request)
+            
+            # Check the shared presence store; a student on any access point of the device's session counts
+            device_ids = pool_device_ids(get_active_session(esp32_device_id), esp32_device_id)
+            presence_store = get_presence_store()
+            presence_data = pool_presence_snapshot(presence_store, device_ids)
+            
+            if not presence_data:
+                return no_presence_data_response()
+            
+            # Bulk roster check - one set lookup for every device
+            present_devices = pool_present_members(
+                presence_store, device_ids, student_device_ids if student_device_ids is not None else [student_device_id]
+            )
+            return presence_query_response(esp32_device_id, presence_data, present_devices, student_device_ids)
+            
+        except PayloadError as e:
+            return e.response
+        except Exception as e:
+            return server_error_response(e)
+    
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+# 🔌 ESP32 Student Verification API
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+def esp32_student_verification_api(request):
+    """API for ESP32 to verify student enrollment and mark attendance"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            matric_number = data.get('matric_number')
+            course_code = data.get('course_code')
+            device_mac = data.get('device_mac', 'ESP32_DIRECT')
+            esp32_device_id = data.get('esp32_device_id', 'ESP32_PRESENCE_001')
+            action = data.get('action', 'mark_present')
+            session = data.get('session', '2024/2025')
+            semester = data.get('semester', '1st Semester')
+            
+            if not all([matric_number, course_code]):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Missing required fields: matric_number, course_code'
+                }, status=400)
+            
+            # Find the student
+            try:
+                student = Student.objects.get(matric_no=matric_number)
+            except Student.DoesNotExist:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Student with matric number {matric_number} not found'
+                }, status=404)
+            
+            # Find the course
+            try:
+                course = Course.objects.get(code=course_code)
+            except Course.DoesNotExist:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Course {course_code} not found'
+                }, status=404)
+            
+            # Check if student is enrolled in this course
+            try:
+                # Try to find enrollment with specific session and semester
+                enrollment = CourseEnrollment.objects.filter(
+                    student=student,
+                    course=course,
+                    session=session,
+                    semester=semester
+                ).first()
+                
+                if not enrollment:
+                    # Try to find any enrollment for this course
+                    enrollment = CourseEnrollment.objects.filter(
+                        student=student,
+                        course=course
+                    ).first()
+                
+                if not enrollment:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'Student {matric_number} is not enrolled in course {course_code}'
+                    }, status=403)
+                    
+            except Exception as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Error checking enrollment: {str(e)}'
+                }, status=500)
+            
+            # A device running this course's session today (its own or one whose access point pool it
+            # serves) records into that session; with the spool on, the mark only needs to be queued
+            active_session = get_active_session(esp32_device_id)
+            if not (active_session and active_session['course_id'] == course.id
+                    and active_session['date'] == timezone.now().date()):
+                active_session = None
+            if active_session and spool_enabled():
+                spool_mark(
+                    student.matric_no, course.id, active_session['lecturer_id'],
+                    enrollment.session, enrollment.semester,
+                    esp32_device_id=active_session['device_pk'], device_mac=device_mac, update_existing=True
+                )
+                record_heartbeat(esp32_device_id)
+                
+                return JsonResponse({
+                    'success': True,
+                    'message': f'Attendance recorded for {student.name} in {course.code}',
+                    'student_name': student.name,
+                    'course_code': course.code,
+                    'status': 'present',
+                    'network_verified': True,
+                    'device_mac': device_mac,
+                    'timestamp': timezone.now().isoformat()
+                })
+            
+            # Get or create ESP32 device
+            esp32_device, created = ESP32Device.objects.get_or_create(
+                device_id=esp32_device_id,
+                defaults={
+                    'device_name': f'ESP32_{esp32_device_id}',
+                    'ssid': 'Classroom_Attendance',
+                    'password': '',
+                    'location': 'Classroom',
+                    'is_active': True
+                }
+            )
+            
+            # Create or get active network session for today
+            today = timezone.now().date()
+            if active_session:
+                network_session = NetworkSession.objects.select_related('lecturer').get(id=active_session['id'])
+            else:
+                network_session, created = NetworkSession.objects.get_or_create(
+                    esp32_device=esp32_device,
+                    course=course,
+                    date=today,
+                    is_active=True,
+                    defaults={
+                        'lecturer': User.objects.filter(is_staff=True).first() or User.objects.first(),
+                        'session': enrollment.session,
+                        'semester': enrollment.semester,
+                        'start_time': timezone.now(),
+                        'is_active': True
+                    }
+                )
+            
+            # Create or get attendance session
+            attendance_session, created = get_or_create_attendance_session(
+                course=course,
+                lecturer=network_session.lecturer,
+                session=enrollment.session,
+                semester=enrollment.semester,
+                date=today,
+                defaults={}
+            )
+            
+            # When another access point of the session is recording this student right now, its write stands
+            with mark_lock(network_session.id, student.matric_no) as claimed:
+                if claimed:
+                    # Check if attendance already exists
+                    attendance_record, record_created = AttendanceRecord.objects.get_or_create(
+                        attendance_session=attendance_session,
+                        student=student,
+                        defaults={
+                            'status': 'present',
+                            'network_verified': True,
+                            'device_mac': device_mac,
+                            'esp32_device': esp32_device
+                        }
+                    )
+            
+                    if not record_created:
+                        # Update existing record
+                        attendance_record.status = 'present'
+                        attendance_record.network_verified = True
+                        attendance_record.device_mac = device_mac
+                        attendance_record.esp32_device = esp32_device
+                        attendance_record.save()
+            
+            # Update ESP32 device last seen
+            record_heartbeat(esp32_device.device_id)
+            
+            return JsonResponse({
+                'success': True,
+                'message': f'Attendance recorded for {student.name} in {course.code}',
+                'student_name': student.name,
+                'course_code': course.code,
+                'status': 'present',
+                'network_verified': True,
+                'device_mac': device_mac,
+                'timestamp': timezone.now().isoformat()
+            })
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON data'
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': f'Error recording attendance: {str(e)}'
+            }, status=500)
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Method not allowed'
+    }, status=405)
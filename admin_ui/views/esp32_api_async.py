@@ -0,0 +1,306 @@
+"""
+⚡ ESP32 device API (async)
+
+Native async versions of the hot device endpoints in esp32_api: heartbeat,
+presence update, station connect/disconnect, student/presence verification and
+attendance recording. Both versions parse requests and build responses through
+esp32_payloads, so only the database and cache calls differ here.
+
+Under an ASGI server (see ASGI_SERVING_GUIDE.md) a request waiting on the
+database or cache parks a coroutine instead of a worker thread, so a burst of
+gateways no longer starves lecturer pages. They are routed in place of the sync
+views when ``settings.ESP32_ASYNC_API`` is on.
+"""
+import logging
+
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from ..access_points import apool_presence_snapshot, apool_present_members, arecord_station_count, pool_device_ids
+from ..attendance_service import acreate_record, aget_or_create_attendance_session
+from ..device_config import aget_device_config
+from ..device_rate_limit import device_throttle
+from ..heartbeats import arecord_heartbeat
+from ..idempotency import idempotent
+from ..models import (
+    AttendanceRecord,
+    ConnectedDevice,
+    Course,
+    CourseEnrollment,
+    ESP32Device,
+    Student,
+)
+from ..presence import DELTA_APPLIED, get_presence_store
+from ..presence_history import amaybe_record_sample
+from ..session_registry import aget_active_session
+from .esp32_auth import averify_api_key, device_endpoint
+from .esp32_payloads import (
+    LEGACY_TERM,
+    PayloadError,
+    already_marked_response,
+    attendance_recorded_response,
+    error_response,
+    heartbeat_response,
+    invalid_api_key_response,
+    no_presence_data_response,
+    no_session_response,
+    not_verified_response,
+    presence_delta_response,
+    presence_device_defaults,
+    presence_error_response,
+    presence_query_response,
+    presence_updated_response,
+    read_attendance_record,
+    read_heartbeat,
+    read_presence_query,
+    read_presence_report,
+    read_station_event,
+    read_student_verification,
+    server_error_response,
+    station_connected_response,
+    station_disconnected_response,
+    station_not_found_response,
+    student_verification_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('heartbeat')
+async def esp32_heartbeat_api_async(request):
+    """ESP32 API endpoint for heartbeat"""
+    if not await averify_api_key(request):
+        return invalid_api_key_response()
+
+    try:
+        data = read_heartbeat(request)
+        await arecord_heartbeat(data['device_id'])
+        await arecord_station_count(data['device_id'], data.get('station_count'))
+        return heartbeat_response(request, data, await aget_device_config(data['device_id']))
+
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+async def esp32_device_connected_api_async(request):
+    """ESP32 API endpoint for device connection notification"""
+    if not await averify_api_key(request):
+        return invalid_api_key_response()
+
+    try:
+        device_id, mac_address, ip_address = read_station_event(request)
+        active_session = await aget_active_session(device_id)
+        if not active_session:
+            return no_session_response()
+
+        connected_device, created = await ConnectedDevice.objects.aget_or_create(
+            network_session_id=active_session['id'],
+            mac_address=mac_address,
+            defaults={
+                'ip_address': ip_address,
+                'is_connected': True
+            }
+        )
+        if not created:
+            connected_device.ip_address = ip_address
+            connected_device.is_connected = True
+            await connected_device.asave()
+
+        return station_connected_response(connected_device)
+
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('stations')
+async def esp32_device_disconnected_api_async(request):
+    """ESP32 API endpoint for device disconnection notification"""
+    if not await averify_api_key(request):
+        return invalid_api_key_response()
+
+    try:
+        device_id, mac_address, _ = read_station_event(request)
+        active_session = await aget_active_session(device_id)
+        if not active_session:
+            return no_session_response()
+
+        try:
+            connected_device = await ConnectedDevice.objects.aget(
+                network_session_id=active_session['id'],
+                mac_address=mac_address
+            )
+        except ConnectedDevice.DoesNotExist:
+            return station_not_found_response(mac_address)
+        connected_device.is_connected = False
+        await connected_device.asave()
+
+        return station_disconnected_response(connected_device)
+
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+async def esp32_record_attendance_api_async(request):
+    """ESP32 API endpoint to record attendance"""
+    if not await averify_api_key(request):
+        return invalid_api_key_response()
+
+    try:
+        data = read_attendance_record(request)
+        try:
+            course = await Course.objects.aget(code=data['course_code'])
+            student = await Student.objects.aget(matric_no=data['matric_no'])
+        except (Course.DoesNotExist, Student.DoesNotExist):
+            return error_response('Course or student not found')
+
+        if not await CourseEnrollment.objects.filter(student=student, course=course, **LEGACY_TERM).aexists():
+            return error_response('Student not enrolled in this course')
+
+        today = timezone.now().date()
+        if await AttendanceRecord.objects.filter(
+            student=student,
+            attendance_session__course=course,
+            attendance_session__date=today
+        ).aexists():
+            return already_marked_response()
+
+        attendance_session, created = await aget_or_create_attendance_session(
+            course=course,
+            date=today,
+            **LEGACY_TERM,
+            defaults={'lecturer': await User.objects.aget(username='lecturer1')}
+        )
+
+        # A record written since the check above wins
+        attendance_record = await acreate_record(
+            student=student,
+            attendance_session=attendance_session,
+            status='present',
+            marked_at=timezone.now(),
+            device_mac=data.get('mac_address') or 'Unknown'
+        )
+        if attendance_record is None:
+            return already_marked_response()
+
+        return attendance_recorded_response(data, attendance_record)
+
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@device_endpoint
+@idempotent
+@device_throttle('attendance')
+async def esp32_verify_student_api_async(request):
+    """ESP32 API endpoint to verify student enrollment"""
+    if not await averify_api_key(request):
+        return invalid_api_key_response()
+
+    try:
+        matric_no, course_code = read_student_verification(request)
+        try:
+            student = await Student.objects.aget(matric_no=matric_no)
+        except Student.DoesNotExist:
+            return not_verified_response('Student not found')
+        try:
+            course = await Course.objects.aget(code=course_code)
+        except Course.DoesNotExist:
+            return not_verified_response('Course not found')
+
+        is_enrolled = await CourseEnrollment.objects.filter(student=student, course=course, **LEGACY_TERM).aexists()
+        return student_verification_response(student, course, is_enrolled)
+
+    except PayloadError as e:
+        return e.response
+    except Exception as e:
+        return server_error_response(e)
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('presence')
+async def esp32_presence_update_api_async(request):
+    """ESP32 sends its connected devices (full list or delta) for presence verification"""
+    if request.method == 'POST':
+        try:
+            device_id, connected_devices, joined, left, seq = read_presence_report(request)
+            await ESP32Device.objects.aget_or_create(device_id=device_id, defaults=presence_device_defaults(device_id))
+            await arecord_heartbeat(device_id)
+
+            if connected_devices is None:
+                outcome = await get_presence_store().aapply_delta(device_id, joined, left, seq)
+                if outcome['result'] == DELTA_APPLIED:
+                    await arecord_station_count(device_id, outcome['device_count'])
+                    await amaybe_record_sample(device_id)
+                return presence_delta_response(device_id, outcome)
+
+            await get_presence_store().aset_members(device_id, connected_devices, seq=seq)
+            await arecord_station_count(device_id, len(connected_devices))
+            await amaybe_record_sample(device_id)
+
+            logger.debug('Presence update from %s: %d devices connected', device_id, len(connected_devices))
+
+            return presence_updated_response(device_id, connected_devices, seq)
+
+        except PayloadError as e:
+            return e.response
+        except Exception as e:
+            return presence_error_response(e)
+
+    return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+@device_endpoint
+@idempotent
+@device_throttle('presence')
+async def esp32_presence_verify_api_async(request):
+    """Verify if one student device (or a list of them) is present on an ESP32"""
+    if request.method == 'POST':
+        try:
+            student_device_id, student_device_ids, esp32_device_id = read_presence_query(request)
+
+            # A student on any access point of the device's session counts
+            device_ids = pool_device_ids(await aget_active_session(esp32_device_id), esp32_device_id)
+            presence_store = get_presence_store()
+            presence_data = await apool_presence_snapshot(presence_store, device_ids)
+            if not presence_data:
+                return no_presence_data_response()
+
+            present_devices = await apool_present_members(
+                presence_store, device_ids, student_device_ids if student_device_ids is not None else [student_device_id]
+            )
+            return presence_query_response(esp32_device_id, presence_data, present_devices, student_device_ids)
+
+        except PayloadError as e:
+            return e.response
+        except Exception as e:
+            return server_error_response(e)
+
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -0,0 +1,179 @@
+"""
+🔑 API key helpers for authenticating ESP32 devices
+"""
+import hmac
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from ..device_credentials import (
+    REPLAYED_REQUEST, auth_mode, auth_setting, averify_signed_request, claimed_device_id, is_signed, sign_request,
+    verify_signed_request
+)
+from ..idempotency import areplay_stored_response, replay_stored_response
+from ..models import ESP32Device
+
+
+# API Authentication and Security
+def verify_api_token(request):
+    """Verify the API token for secure ESP32 communication"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return False, "Missing or invalid authorization header"
+    
+    token = auth_header.split(' ')[1]
+    
+    # Check if token exists in ESP32Device
+    try:
+        device = ESP32Device.objects.get(device_id=token, is_active=True)
+        return True, device
+    except ESP32Device.DoesNotExist:
+        return False, "Invalid or inactive device token"
+    
+    return False, "Invalid token"
+
+def verify_request_signature(request, secret_key):
+    """Verify request signature for additional security (see admin_ui/device_credentials.py)"""
+    signature = request.headers.get('X-Signature')
+    timestamp = request.headers.get('X-Timestamp')
+    nonce = request.headers.get('X-Nonce', '')
+    
+    if not signature or not timestamp:
+        return False, "Missing signature or timestamp"
+    
+    # Check if timestamp is recent (within the replay window)
+    try:
+        if abs(int(time.time()) - int(timestamp)) > auth_setting('WINDOW'):
+            return False, "Request timestamp expired"
+    except ValueError:
+        return False, "Invalid timestamp"
+    
+    # Verify signature
+    expected_signature = sign_request(
+        secret_key, request.method, request.get_full_path(), timestamp, nonce, request.body
+    )
+    
+    return hmac.compare_digest(signature, expected_signature), "Signature verified"
+
+# 🔑 API Key Management for ESP32
+def generate_api_key():
+    """Generate a simple API key for ESP32 devices"""
+    import secrets
+    return secrets.token_hex(16)  # 32 character hex string
+
+def get_or_create_api_key():
+    """Get existing API key or create new one"""
+    from django.core.cache import cache
+    
+    # A configured key is the same in every worker and survives restarts
+    if settings.ESP32_API_KEY:
+        return settings.ESP32_API_KEY
+    
+    api_key = cache.get('esp32_api_key')
+    if not api_key:
+        api_key = generate_api_key()
+        cache.set('esp32_api_key', api_key, timeout=31536000)  # 1 year
+    
+    return api_key
+
+def verify_api_key(request):
+    """Verify API key from ESP32 requests"""
+    # Signed requests were already checked against the device's own credential
+    if getattr(request, 'esp32_device_id', None):
+        return True
+    
+    auth_header = request.headers.get('Authorization', '')
+    
+    if not auth_header.startswith('Bearer '):
+        return False
+    
+    api_key = auth_header.split(' ')[1]
+    expected_key = get_or_create_api_key()
+    
+    return api_key == expected_key
+
+
+async def aget_or_create_api_key():
+    """Async version of get_or_create_api_key()"""
+    from django.core.cache import cache
+    
+    if settings.ESP32_API_KEY:
+        return settings.ESP32_API_KEY
+    
+    api_key = await cache.aget('esp32_api_key')
+    if not api_key:
+        api_key = generate_api_key()
+        await cache.aset('esp32_api_key', api_key, timeout=31536000)  # 1 year
+    
+    return api_key
+
+async def averify_api_key(request):
+    """Async version of verify_api_key() for the async device endpoints"""
+    if getattr(request, 'esp32_device_id', None):
+        return True
+    
+    auth_header = request.headers.get('Authorization', '')
+    
+    if not auth_header.startswith('Bearer '):
+        return False
+    
+    api_key = auth_header.split(' ')[1]
+    return api_key == await aget_or_create_api_key()
+
+
+# 🔏 Signed device requests
+def _must_verify(request):
+    mode = auth_mode()
+    return mode == 'required' or (mode == 'optional' and is_signed(request))
+
+
+def _device_auth_result(request, device_id, error):
+    """JsonResponse rejecting the request, or None after recording the authenticated device"""
+    if error:
+        return JsonResponse({'error': error}, status=401)
+    claimed = claimed_device_id(request)
+    if claimed is not None and str(claimed) != device_id:
+        return JsonResponse({'error': 'Request signed by a different device'}, status=403)
+    request.esp32_device_id = device_id
+    return None
+
+
+def device_endpoint(view_func):
+    """Verify HMAC-signed device requests according to settings.DEVICE_AUTH['MODE']
+    
+    'off' leaves authentication to the view, 'optional' verifies requests that carry
+    a signature and lets unsigned ones fall back to the view's API key check, and
+    'required' rejects unsigned requests. A verified request gets ``esp32_device_id``.
+    A retry resent with its first attempt's nonce gets the stored idempotent response.
+    """
+    if iscoroutinefunction(view_func):
+        async def _wrapped_view(request, *args, **kwargs):
+            if _must_verify(request):
+                device_id, error = await averify_signed_request(request)
+                if error == REPLAYED_REQUEST:
+                    # The signature is valid; a retry of a stored request only gets its stored answer
+                    replayed = await areplay_stored_response(request)
+                    if replayed is not None:
+                        return replayed
+                rejected = _device_auth_result(request, device_id, error)
+                if rejected is not None:
+                    return rejected
+            return await view_func(request, *args, **kwargs)
+    else:
+        def _wrapped_view(request, *args, **kwargs):
+            if _must_verify(request):
+                device_id, error = verify_signed_request(request)
+                if error == REPLAYED_REQUEST:
+                    # The signature is valid; a retry of a stored request only gets its stored answer
+                    replayed = replay_stored_response(request)
+                    if replayed is not None:
+                        return replayed
+                rejected = _device_auth_result(request, device_id, error)
+                if rejected is not None:
+                    return rejected
+            return view_func(request, *args, **kwargs)
+
+    return wraps(view_func)(_wrapped_view)
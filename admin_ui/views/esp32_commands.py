@@ -0,0 +1,50 @@
+"""
+📬 ESP32 command long-poll
+
+Gateways park a GET here instead of polling for changes on a fixed interval;
+see admin_ui/device_commands.py for how commands are queued and delivered.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from ..device_commands import command_setting, serialize_command, wait_for_commands
+from ..device_rate_limit import device_throttle
+from .esp32_auth import averify_api_key, device_endpoint
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@device_endpoint
+@device_throttle('commands')
+async def esp32_commands_api(request):
+    """Long-poll: return the device's commands newer than `after`, waiting up to `timeout` seconds"""
+    if not await averify_api_key(request):
+        return JsonResponse({'error': 'Invalid API key'}, status=401)
+
+    device_id = request.GET.get('device_id')
+    if not device_id:
+        return JsonResponse({'error': 'Missing device_id'}, status=400)
+
+    try:
+        after = int(request.GET.get('after', 0))
+        timeout = float(request.GET['timeout']) if request.GET.get('timeout') else None
+    except ValueError:
+        return JsonResponse({'error': 'after and timeout must be numbers'}, status=400)
+
+    if timeout is None:
+        timeout = command_setting('TIMEOUT')
+    if not isinstance(request, ASGIRequest):
+        # Parked under WSGI, the request would hold a sync worker (and outlive its timeout)
+        timeout = min(timeout, command_setting('WSGI_TIMEOUT'))
+
+    commands = await wait_for_commands(device_id, after=after, timeout=timeout)
+    return JsonResponse({
+        'success': True,
+        'commands': [serialize_command(command) for command in commands],
+        # Send this back as `after` to acknowledge the commands
+        'next_after': max((command.id for command in commands), default=after),
+        # Seconds to wait before the next poll: 0 after a long-poll, TIMEOUT after a short-poll
+        'poll_after': 0 if timeout > 0 else command_setting('TIMEOUT'),
+    })
@@ -0,0 +1,843 @@
+"""
+🛰️ ESP32 device and network session management pages
+"""
+from datetime import datetime, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from ..access_points import (
+    add_access_points,
+    busy_device_ids,
+    invalidate_session_pools,
+    pool_size_for,
+    session_pool_status,
+)
+from ..attendance_stats import get_course_summaries, get_session_summaries
+from ..heartbeats import apply_heartbeats, online_devices, update_device_fields
+from ..models import (
+    AssignedCourse,
+    AttendanceRecord,
+    AttendanceSession,
+    ConnectedDevice,
+    Course,
+    CourseEnrollment,
+    ESP32Device,
+    NetworkSession,
+)
+from ..presence import get_presence_store
+from ..session_registry import invalidate_active_session
+from .esp32_auth import get_or_create_api_key
+
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def esp32_device_list(request):
+    """List ESP32 devices for Admins and lecturers"""
+    devices = apply_heartbeats(ESP32Device.objects.all().order_by('-created_at'))
+    return render(request, 'admin_ui/esp32_device_list.html', {
+        'devices': devices
+    })
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def esp32_device_create(request):
+    """Create a new ESP32 device"""
+    if request.method == 'POST':
+        device_id = request.POST.get('device_id')
+        device_name = request.POST.get('device_name')
+        ssid = request.POST.get('ssid')
+        password = request.POST.get('password')
+        location = request.POST.get('location')
+        
+        if ESP32Device.objects.filter(device_id=device_id).exists():
+            messages.error(request, 'Device ID already exists!')
+        elif ESP32Device.objects.filter(ssid=ssid).exists():
+            messages.error(request, 'SSID already exists!')
+        else:
+            ESP32Device.objects.create(
+                device_id=device_id,
+                device_name=device_name,
+                ssid=ssid,
+                password=password,
+                location=location
+            )
+            messages.success(request, 'ESP32 device created successfully!')
+            return redirect('admin_ui:esp32_device_list')
+    
+    return render(request, 'admin_ui/esp32_device_create.html')
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def esp32_device_edit(request, device_id):
+    """Edit an existing ESP32 device"""
+    device = get_object_or_404(ESP32Device, device_id=device_id)
+    
+    if request.method == 'POST':
+        device.device_name = request.POST.get('device_name')
+        device.ssid = request.POST.get('ssid')
+        device.password = request.POST.get('password')
+        device.location = request.POST.get('location')
+        device.is_active = 'is_active' in request.POST
+        device.save()
+        
+        messages.success(request, 'ESP32 device updated successfully!')
+        return redirect('admin_ui:esp32_device_list')
+    
+    return render(request, 'admin_ui/esp32_device_edit.html', {
+        'device': device
+    })
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def esp32_device_delete(request, device_id):
+    """Delete an ESP32 device"""
+    device = get_object_or_404(ESP32Device, device_id=device_id)
+    device.delete()
+    messages.success(request, 'ESP32 device deleted successfully!')
+    return redirect('admin_ui:esp32_device_list')
+
+# 🌐 Network Session List
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def network_session_list(request):
+    """List network sessions for lecturers and Admins"""
+    if request.user.is_superuser:
+        all_sessions = NetworkSession.objects.all().order_by('-date', '-start_time')
+    else:
+        all_sessions = NetworkSession.objects.filter(lecturer=request.user).order_by('-date', '-start_time')
+    
+    # Separate active and past sessions
+    active_sessions = all_sessions.filter(is_active=True)
+    past_sessions = all_sessions.filter(is_active=False)
+    
+    # Calculate duration for each session
+    for session in all_sessions:
+        if session.end_time and session.start_time:
+            # Calculate duration in minutes using DateTimeField
+            duration = session.end_time - session.start_time
+            session.duration_minutes = int(duration.total_seconds() / 60)
+            session.duration_formatted = f"{session.duration_minutes} min"
+        elif session.start_time and not session.end_time:
+            # Session is still active, calculate duration from start to now
+            current_time = timezone.now()
+            duration = current_time - session.start_time
+            session.duration_minutes = int(duration.total_seconds() / 60)
+            session.duration_formatted = f"{session.duration_minutes} min (Ongoing)"
+        else:
+            # Fallback case
+            session.duration_minutes = 0
+            session.duration_formatted = "N/A"
+    
+    return render(request, 'admin_ui/network_session_list.html', {
+        'active_sessions': active_sessions,
+        'past_sessions': past_sessions
+    })
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def network_session_create(request):
+    """Create a new network session"""
+    if request.method == 'POST':
+        course_id = request.POST.get('course')
+        session = request.POST.get('session')
+        semester = request.POST.get('semester')
+        esp32_device_id = request.POST.get('esp32_device')
+        
+        if course_id and session and semester and esp32_device_id:
+            try:
+                course = Course.objects.get(id=course_id)
+                esp32_device = ESP32Device.objects.get(id=esp32_device_id)
+                duration_minutes = int(request.POST.get('duration', 90))
+                
+                # Get current time in local timezone (GMT+1)
+                current_time = timezone.now()
+                end_time = current_time + timedelta(minutes=duration_minutes)
+                
+                network_session = NetworkSession.objects.create(
+                    course=course,
+                    lecturer=request.user,
+                    session=session,
+                    semester=semester,
+                    esp32_device=esp32_device,
+                    date=current_time.date(),
+                    start_time=current_time,  # Store full datetime instead of just time
+                    end_time=end_time,  # Calculate end time based on duration
+                    is_active=True
+                )
+                
+                messages.success(request, f'Network session for {course.code} created successfully! Duration: {duration_minutes} minutes')
+                return redirect('admin_ui:network_session_list')
+                
+            except (Course.DoesNotExist, ESP32Device.DoesNotExist):
+                messages.error(request, 'Invalid course or ESP32 device selected!')
+            except ValueError:
+                messages.error(request, 'Invalid duration value! Please enter a valid number of minutes.')
+        else:
+            messages.error(request, 'Please fill in all required fields!')
+    
+    # Get assigned courses for this lecturer
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    esp32_devices = ESP32Device.objects.filter(is_active=True)
+    
+    return render(request, 'admin_ui/network_session_create.html', {
+        'assigned_courses': assigned_courses,
+        'esp32_devices': esp32_devices
+    })
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.groups.filter(name='Lecturers').exists())
+def network_session_end(request, session_id):
+    """End a network session"""
+    network_session = get_object_or_404(NetworkSession, id=session_id)
+    
+    # Check if user has permission to end this session
+    if not request.user.is_superuser and network_session.lecturer != request.user:
+        messages.error(request, 'You do not have permission to end this session!')
+        return redirect('admin_ui:network_session_list')
+    
+    # Get current time in the same timezone as the session
+    current_time = timezone.now()
+    network_session.end_time = current_time  # Store full datetime instead of just time
+    network_session.is_active = False
+    network_session.save()
+    
+    messages.success(request, f'Network session for {network_session.course.code} ended!')
+    return redirect('admin_ui:network_session_list')
+
+@login_required
+def start_network_session_view(request):
+    """Start a new network attendance session with automatic ESP32 configuration"""
+    if request.method == 'POST':
+        course_id = request.POST.get('course_id')
+        session = request.POST.get('session')
+        semester = request.POST.get('semester')
+        
+        try:
+            course = Course.objects.get(id=course_id)
+            # Check if lecturer is assigned to this course
+            if not AssignedCourse.objects.filter(
+                lecturer=request.user, 
+                course=course, 
+                session=session, 
+                semester=semester
+            ).exists():
+                messages.error(request, "❌ You are not assigned to this course for the specified session/semester.")
+                return redirect('admin_ui:dashboard')
+            
+            # 🔌 AUTOMATIC ESP32 CONFIGURATION
+            # Find available ESP32 devices that are online (have recent heartbeat)
+            available_devices = online_devices()  # Online in last 5 minutes
+            
+            if not available_devices:
+                messages.error(request, "❌ No ESP32 devices are currently online. Please check device connectivity.")
+                return redirect('admin_ui:dashboard')
+            
+            # Select the most recently active ESP32 device
+            selected_device = available_devices[0]
+            
+            # Generate dynamic configuration for the ESP32
+            course_code = course.code
+            session_id = f"{session}_{semester}".replace(" ", "_").replace("/", "_")
+            
+            # Create dynamic device ID: ESP32_CS101_2024_2025_1st_Semester
+            dynamic_device_id = f"ESP32_{course_code}_{session_id}"
+            
+            # Create dynamic SSID: CS101_Attendance_2024_2025
+            dynamic_ssid = f"{course_code}_Attendance_{session.replace('/', '_')}"
+            
+            # Update ESP32 device with dynamic configuration
+            device_fields = {
+                'device_name': f"{course_code} - {course.title}",
+                'ssid': dynamic_ssid,
+                'password': "",  # Open network for easy student access
+                'location': f"{course_code} Classroom - {session} {semester}",
+            }
+            update_device_fields(selected_device, **device_fields)
+            
+            # Create network session with the configured ESP32 device
+            network_session = NetworkSession.objects.create(
+                esp32_device=selected_device,  # Now automatically configured
+                course=course,
+                lecturer=request.user,
+                session=session,
+                semester=semester,
+                date=timezone.now().date(),
+                start_time=timezone.now(),
+                is_active=True
+            )
+            
+            # 📶 Large classes get extra access points from online devices no other session is using
+            enrolled_count = CourseEnrollment.objects.filter(
+                course=course, session=session, semester=semester
+            ).count()
+            busy = busy_device_ids()
+            extra_devices = [
+                device for device in available_devices[1:] if device.id not in busy
+            ][:pool_size_for(enrolled_count) - 1]
+            add_access_points(network_session, extra_devices, **device_fields)
+            
+            pool_note = f" with {len(extra_devices)} extra access point(s)" if extra_devices else ""
+            messages.success(request, f"✅ Network session started for {course.code}! ESP32 '{selected_device.device_name}' configured and ready{pool_note}.")
+            return redirect('admin_ui:network_session_active', session_id=network_session.id)
+            
+        except Course.DoesNotExist:
+            messages.error(request, "❌ Course not found.")
+        except Exception as e:
+            messages.error(request, f"❌ Error starting session: {str(e)}")
+    
+    # Get lecturer's assigned courses
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    
+    # Get available ESP32 devices for display
+    total_devices = ESP32Device.objects.filter(is_active=True).count()
+    available_devices = online_devices()
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'current_session': "2024/2025",
+        'current_semester': "1st Semester",
+        'available_esp32_devices': available_devices,  # Show available devices
+        'esp32_status': {
+            'total_devices': total_devices,
+            'online_devices': len(available_devices),
+            'offline_devices': total_devices - len(available_devices)
+        }
+    }
+    return render(request, 'admin_ui/start_network_session.html', context)
+
+@login_required
+def network_session_active_view(request, session_id):
+    """Active network session dashboard"""
+    network_session = get_object_or_404(NetworkSession, id=session_id, lecturer=request.user)
+    
+    # Get connected devices
+    connected_devices = ConnectedDevice.objects.filter(
+        network_session=network_session,
+        is_connected=True
+    ).order_by('-connected_at')
+    
+    # Get attendance records for this session
+    attendance_records = AttendanceRecord.objects.filter(
+        attendance_session__course=network_session.course,
+        attendance_session__date=network_session.date
+    ).select_related('student')
+    
+    # Counts come from the materialized summaries
+    term = (network_session.course_id, network_session.session, network_session.semester)
+    day_session_ids = AttendanceSession.objects.filter(
+        course=network_session.course,
+        date=network_session.date
+    ).values_list('id', flat=True)
+    
+    context = {
+        'network_session': network_session,
+        'connected_devices': connected_devices,
+        'attendance_records': attendance_records,
+        'pool': session_pool_status(network_session),
+        'total_enrolled': get_course_summaries([term])[term].enrolled_count,
+        'present_count': sum(
+            summary.present_count for summary in get_session_summaries(day_session_ids).values()
+        )
+    }
+    return render(request, 'admin_ui/network_session_active.html', context)
+
+@login_required
+def end_network_session_view(request, session_id):
+    """End the network session"""
+    network_session = get_object_or_404(NetworkSession, id=session_id, lecturer=request.user)
+    
+    if request.method == 'POST':
+        network_session.end_time = timezone.now()
+        network_session.is_active = False
+        network_session.save()
+        
+        # Disconnect all devices
+        ConnectedDevice.objects.filter(network_session=network_session).update(
+            is_connected=False,
+            disconnected_at=timezone.now()
+        )
+        
+        messages.success(request, f"✅ Network session ended for {network_session.course.code}")
+        return redirect('admin_ui:dashboard')
+    
+    return render(request, 'admin_ui/end_network_session.html', {'network_session': network_session})
+
+@login_required
+def start_esp32_session_view(request):
+    """Start an ESP32-based attendance session"""
+    try:
+        # Get lecturer's assigned courses
+        assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+        
+        if request.method == 'POST':
+            course_id = request.POST.get('course_id')
+            session_name = request.POST.get('session_name')
+            semester = request.POST.get('semester')
+            
+            if course_id and session_name and semester:
+                course = Course.objects.get(id=course_id)
+                
+                # Create or get ESP32 device for this lecturer
+                esp32_device, created = ESP32Device.objects.get_or_create(
+                    assigned_lecturer=request.user,
+                    defaults={
+                        'device_id': f'ESP32_{request.user.username}_{course.code}',
+                        'device_name': f'{course.code}_Attendance_Device',
+                        'location': 'Classroom',
+                        'is_active': True
+                    }
+                )
+                
+                # Create network session
+                network_session = NetworkSession.objects.create(
+                    course=course,
+                    lecturer=request.user,
+                    session=session_name,
+                    semester=semester,
+                    date=timezone.now().date(),
+                    start_time=timezone.now(),
+                    is_active=True,
+                    esp32_device=esp32_device
+                )
+                
+                messages.success(request, f'ESP32 session started for {course.code}! Students can now connect to the ESP32 WiFi network.')
+                return redirect('admin_ui:esp32_session_active', session_id=network_session.id)
+        
+        context = {
+            'assigned_courses': assigned_courses,
+            'semesters': ['1st Semester', '2nd Semester', 'Summer'],
+            'current_session': f"{timezone.now().year}/{timezone.now().year + 1}"
+        }
+        return render(request, 'admin_ui/start_esp32_session.html', context)
+        
+    except Exception as e:
+        messages.error(request, f'Error starting ESP32 session: {str(e)}')
+        return redirect('admin_ui:dashboard')
+
+@login_required
+def end_esp32_session_view(request, session_id):
+    """End ESP32 attendance session"""
+    try:
+        network_session = NetworkSession.objects.get(
+            id=session_id,
+            lecturer=request.user,
+            is_active=True
+        )
+        
+        if request.method == 'POST':
+            # End the session
+            network_session.is_active = False
+            network_session.end_time = timezone.now()
+            network_session.save()
+            
+            # Deactivate ESP32 device
+            if network_session.esp32_device:
+                network_session.esp32_device.is_active = False
+                network_session.esp32_device.save()
+            
+            messages.success(request, f'ESP32 session ended for {network_session.course.code}.')
+            return redirect('admin_ui:dashboard')
+        
+        context = {'network_session': network_session}
+        return render(request, 'admin_ui/end_esp32_session.html', context)
+        
+    except NetworkSession.DoesNotExist:
+        messages.error(request, 'Session not found.')
+        return redirect('admin_ui:dashboard')
+
+@login_required
+def esp32_device_management_view(request):
+    """Manage ESP32 devices"""
+    try:
+        # Get lecturer's ESP32 devices
+        esp32_devices = ESP32Device.objects.filter(assigned_lecturer=request.user)
+        
+        if request.method == 'POST':
+            action = request.POST.get('action')
+            device_id = request.POST.get('device_id')
+            
+            if action == 'activate' and device_id:
+                device = ESP32Device.objects.get(id=device_id, assigned_lecturer=request.user)
+                device.is_active = True
+                device.save()
+                messages.success(request, f'Device {device.device_name} activated.')
+            elif action == 'deactivate' and device_id:
+                device = ESP32Device.objects.get(id=device_id, assigned_lecturer=request.user)
+                device.is_active = False
+                device.save()
+                messages.success(request, f'Device {device.device_name} deactivated.')
+        
+        context = {'esp32_devices': esp32_devices}
+        return render(request, 'admin_ui/esp32_device_management.html', context)
+        
+    except Exception as e:
+        messages.error(request, f'Error managing ESP32 devices: {str(e)}')
+        return redirect('admin_ui:dashboard')
+
+def dynamic_esp32_session_view(request):
+    """Dynamic ESP32 session management - creates sessions with real-time ESP32 configuration"""
+    if not request.user.is_authenticated:
+        return redirect('admin_ui:lecturer_login')
+    
+    # Get lecturer's assigned courses
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    
+    if request.method == 'POST':
+        course_id = request.POST.get('course')
+        session = request.POST.get('session')
+        semester = request.POST.get('semester')
+        start_time = request.POST.get('start_time')
+        
+        if course_id and session and semester and start_time:
+            course = get_object_or_404(Course, id=course_id)
+            
+            # Find available ESP32 device (online within last 5 minutes)
+            available_device = next(iter(online_devices()), None)
+            
+            if available_device:
+                # Generate dynamic configuration
+                device_id = f"ESP32_{course.code}_{timezone.now().strftime('%Y%m%d_%H%M')}"
+                ssid = f"Attendance_{course.code}_{request.user.username}_{timezone.now().strftime('%H%M')}"
+                device_name = f"{course.code}_{request.user.username}_{timezone.now().strftime('%H%M')}"
+                location = f"{course.title} - {request.user.get_full_name() or request.user.username}"
+                
+                # Update ESP32 device with dynamic config
+                update_device_fields(
+                    available_device,
+                    device_id=device_id,
+                    device_name=device_name,
+                    ssid=ssid,
+                    password="12345678",  # Default password
+                    location=location
+                )
+                
+                # Create network session
+                start_datetime = datetime.strptime(f"{timezone.now().date()} {start_time}", "%Y-%m-%d %H:%M")
+                start_datetime = timezone.make_aware(start_datetime)
+                
+                network_session = NetworkSession.objects.create(
+                    esp32_device=available_device,
+                    course=course,
+                    lecturer=request.user,
+                    session=session,
+                    semester=semester,
+                    date=timezone.now().date(),
+                    start_time=start_datetime,
+                    is_active=True
+                )
+                
+                messages.success(request, f'✅ Dynamic ESP32 session created! WiFi: {ssid}')
+                return redirect('admin_ui:esp32_session_active', session_id=network_session.id)
+            else:
+                messages.error(request, '❌ No available ESP32 devices. Please check device status.')
+    
+    # Get ESP32 device status
+    total_devices = ESP32Device.objects.filter(is_active=True).count()
+    
+    # Get available devices
+    available_devices = online_devices()
+    offline_devices = total_devices - len(available_devices)
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'total_devices': total_devices,
+        'online_devices': len(available_devices),
+        'offline_devices': offline_devices,
+        'available_devices': available_devices,
+    }
+    
+    return render(request, 'admin_ui/dynamic_esp32_session.html', context)
+
+def correct_esp32_session_view(request):
+    """Correct ESP32 flow: Lecturer provides WiFi credentials for ESP32 internet access"""
+    if not request.user.is_authenticated:
+        return redirect('admin_ui:lecturer_login')
+    
+    # Get lecturer's assigned courses
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    
+    if request.method == 'POST':
+        course_id = request.POST.get('course')
+        session = request.POST.get('session')
+        semester = request.POST.get('semester')
+        start_time = request.POST.get('start_time')
+        lecturer_wifi_ssid = request.POST.get('lecturer_wifi_ssid')
+        lecturer_wifi_password = request.POST.get('lecturer_wifi_password')
+        
+        if course_id and session and semester and start_time and lecturer_wifi_ssid:
+            course = get_object_or_404(Course, id=course_id)
+            
+            # Find available ESP32 device (online within last 5 minutes)
+            available_device = next(iter(online_devices()), None)
+            
+            if available_device:
+                # Generate dynamic configuration
+                device_id = f"ESP32_{course.code}_{timezone.now().strftime('%Y%m%d_%H%M')}"
+                ssid = f"Attendance_{course.code}_{request.user.username}_{timezone.now().strftime('%H%M')}"
+                device_name = f"{course.code}_{request.user.username}_{timezone.now().strftime('%H%M')}"
+                location = f"{course.title} - {request.user.get_full_name() or request.user.username}"
+                
+                # Update ESP32 device with dynamic config
+                update_device_fields(
+                    available_device,
+                    device_id=device_id,
+                    device_name=device_name,
+                    ssid=ssid,
+                    password="12345678",  # Student WiFi password
+                    location=location
+                )
+                
+                # Create network session
+                start_datetime = datetime.strptime(f"{timezone.now().date()} {start_time}", "%Y-%m-%d %H:%M")
+                start_datetime = timezone.make_aware(start_datetime)
+                
+                network_session = NetworkSession.objects.create(
+                    esp32_device=available_device,
+                    course=course,
+                    lecturer=request.user,
+                    session=session,
+                    semester=semester,
+                    date=timezone.now().date(),
+                    start_time=start_datetime,
+                    is_active=True
+                )
+                
+                messages.success(request, f'✅ ESP32 session created! Students connect to WiFi: {ssid}')
+                return redirect('admin_ui:esp32_session_active', session_id=network_session.id)
+            else:
+                messages.error(request, '❌ No available ESP32 devices. Please check device status.')
+    
+    # Get ESP32 device status
+    total_devices = ESP32Device.objects.filter(is_active=True).count()
+    
+    # Get available devices
+    available_devices = online_devices()
+    offline_devices = total_devices - len(available_devices)
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'total_devices': total_devices,
+        'online_devices': len(available_devices),
+        'offline_devices': offline_devices,
+        'available_devices': available_devices,
+    }
+    
+    return render(request, 'admin_ui/correct_esp32_session.html', context)
+
+# 🔧 ESP32 Setup and Management Views
+def esp32_setup_view(request):
+    """ESP32 WiFi setup and configuration for lecturers"""
+    if not request.user.is_authenticated:
+        return redirect('admin_ui:lecturer_login')
+    
+    # Check if user is a lecturer
+    if not AssignedCourse.objects.filter(lecturer=request.user).exists():
+        messages.error(request, "❌ Access denied. You are not assigned to any courses.")
+        return redirect('admin_ui:lecturer_login')
+    
+    # Get lecturer's assigned courses
+    assigned_courses = AssignedCourse.objects.filter(lecturer=request.user)
+    
+    # Check if ESP32 is already configured
+    esp32_status = check_esp32_status(request.user)
+    
+    # Get or generate API key
+    api_key = get_or_create_api_key()
+    
+    context = {
+        'lecturer': request.user,
+        'assigned_courses': assigned_courses,
+        'esp32_status': esp32_status,
+        'esp32_ip': '192.168.4.1',  # ESP32 default IP
+        'setup_ssid': 'ESP32_Setup',
+        'setup_password': 'setup123',
+        'api_key': api_key,  # Add API key to context
+    }
+    
+    return render(request, 'admin_ui/esp32_setup.html', context)
+
+def check_esp32_status(lecturer):
+    """Check ESP32 connection status for lecturer"""
+    try:
+        # Check if there's an active ESP32 session for this lecturer
+        active_session = NetworkSession.objects.filter(
+            lecturer=lecturer,
+            is_active=True
+        ).first()
+        
+        if active_session:
+            return {
+                'connected': True,
+                'device_name': active_session.esp32_device.device_name,
+                'course': active_session.course.code,
+                'session_id': active_session.id,
+                'connected_devices': active_session.connecteddevice_set.filter(is_connected=True).count()
+            }
+        else:
+            return {
+                'connected': False,
+                'message': 'No active ESP32 session'
+            }
+    except Exception as e:
+        return {
+            'connected': False,
+            'message': f'Error checking status: {str(e)}'
+        }
+
+def esp32_start_session_view(request):
+    """Start ESP32 attendance session"""
+    if request.method == 'POST':
+        course_id = request.POST.get('course_id')
+        session = request.POST.get('session', '2024/2025')
+        semester = request.POST.get('semester', '1st Semester')
+        
+        try:
+            course = Course.objects.get(id=course_id)
+            
+            # Check if lecturer is assigned to this course
+            if not AssignedCourse.objects.filter(
+                lecturer=request.user,
+                course=course,
+                session=session,
+                semester=semester
+            ).exists():
+                messages.error(request, "❌ You are not assigned to this course.")
+                return redirect('admin_ui:esp32_setup')
+            
+            # Create or get ESP32 device for this location
+            device_location = f"Classroom {course.code}"
+            esp32_device, created = ESP32Device.objects.get_or_create(
+                device_id=f"ESP32_{course.code}_001",
+                defaults={
+                    'device_name': f"{course.code} Classroom ESP32",
+                    'ssid': f"{course.code}_Attendance",
+                    'password': 'attendance123',
+                    'location': device_location,
+                    'is_active': True
+                }
+            )
+            
+            # End any existing active sessions for this device
+            NetworkSession.objects.filter(
+                esp32_device=esp32_device,
+                is_active=True
+            ).update(is_active=False, end_time=timezone.now())
+            invalidate_active_session(esp32_device.device_id)
+            invalidate_session_pools(NetworkSession.objects.filter(esp32_device=esp32_device))
+            
+            # Create new network session
+            network_session = NetworkSession.objects.create(
+                esp32_device=esp32_device,
+                course=course,
+                lecturer=request.user,
+                session=session,
+                semester=semester,
+                date=timezone.now().date(),
+                start_time=timezone.now(),
+                is_active=True
+            )
+            
+            messages.success(request, f"✅ ESP32 session started for {course.code}!")
+            return redirect('admin_ui:esp32_session_active', session_id=network_session.id)
+            
+        except Course.DoesNotExist:
+            messages.error(request, "❌ Course not found.")
+        except Exception as e:
+            messages.error(request, f"❌ Error starting session: {str(e)}")
+    
+    return redirect('admin_ui:esp32_setup')
+
+def esp32_session_active_view(request, session_id):
+    """Active ESP32 session monitoring"""
+    try:
+        network_session = NetworkSession.objects.get(
+            id=session_id,
+            lecturer=request.user,
+            is_active=True
+        )
+        
+        # Get connected devices
+        connected_devices = ConnectedDevice.objects.filter(
+            network_session=network_session,
+            is_connected=True
+        )
+        
+        # Get attendance records for today
+        today = timezone.now().date()
+        attendance_records = AttendanceRecord.objects.filter(
+            attendance_session__course=network_session.course,
+            attendance_session__date=today
+        )
+        
+        context = {
+            'session': network_session,
+            'connected_devices': connected_devices,
+            'attendance_records': attendance_records,
+            'total_enrolled': CourseEnrollment.objects.filter(
+                course=network_session.course,
+                session=network_session.session,
+                semester=network_session.semester
+            ).count()
+        }
+        
+        return render(request, 'admin_ui/esp32_session_active.html', context)
+        
+    except NetworkSession.DoesNotExist:
+        messages.error(request, "❌ Session not found or not active.")
+        return redirect('admin_ui:esp32_setup')
+
+def esp32_end_session_view(request, session_id):
+    """End ESP32 attendance session"""
+    try:
+        network_session = NetworkSession.objects.get(
+            id=session_id,
+            lecturer=request.user,
+            is_active=True
+        )
+        
+        # End the session
+        network_session.is_active = False
+        network_session.end_time = timezone.now()
+        network_session.save()
+        
+        messages.success(request, f"✅ ESP32 session ended for {network_session.course.code}")
+        return redirect('admin_ui:esp32_setup')
+        
+    except NetworkSession.DoesNotExist:
+        messages.error(request, "❌ Session not found.")
+    
+    return redirect('admin_ui:esp32_setup')
+
+def esp32_device_management(request):
+    """
+    Admin interface for managing ESP32 devices and viewing presence data
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return redirect('admin:login')
+    
+    # Get all ESP32 devices
+    esp32_devices = ESP32Device.objects.all()
+    total_devices = len(esp32_devices)
+    active_devices = sum(1 for device in esp32_devices if device.is_active)
+    esp32_devices = sorted(
+        apply_heartbeats(esp32_devices),
+        key=lambda device: device.last_heartbeat.timestamp() if device.last_heartbeat else 0,
+        reverse=True
+    )
+    
+    # Get presence data from the shared presence store
+    presence_data = get_presence_store().get_snapshots(
+        [device.device_id for device in esp32_devices]
+    )
+    
+    context = {
+        'esp32_devices': esp32_devices,
+        'presence_data': presence_data,
+        'total_devices': total_devices,
+        'active_devices': active_devices
+    }
+    
+    return render(request, 'admin_ui/esp32_management.html', context)
@@ -0,0 +1,256 @@
+"""
+📦 Request parsing and responses of the device endpoints
+
+The hot device endpoints exist twice: sync in esp32_api and async in
+esp32_api_async. Only their database and cache calls differ, so both read the
+request body and build every response through the helpers here, and the two
+versions answer alike.
+
+A read_*() helper returns the fields a view needs, or raises PayloadError
+carrying the response for a request the view should not run.
+"""
+import json
+
+from django.http import JsonResponse
+from django.utils import timezone
+
+from ..device_config import config_response
+from ..presence import DELTA_RESYNC, parse_presence_report
+
+# The legacy record/verify endpoints only know this term
+LEGACY_TERM = {'session': '2024/2025', 'semester': '1st Semester'}
+
+PRESENCE_DEVICE_DEFAULTS = {
+    'ssid': 'Classroom_Attendance',
+    'password': '',
+    'location': 'Classroom',
+    'is_active': True,
+}
+
+
+class PayloadError(Exception):
+    """A request a device view answers without running; response is that answer"""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def error_response(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def invalid_api_key_response():
+    return error_response('Invalid API key', status=401)
+
+
+def server_error_response(exception):
+    return error_response(str(exception), status=500)
+
+
+def no_session_response():
+    return error_response('No active session found for this device')
+
+
+# 💓 Heartbeat
+
+def read_heartbeat(request):
+    data = json.loads(request.body)
+    if not data.get('device_id'):
+        raise PayloadError(error_response('Missing device_id'))
+    return data
+
+
+def heartbeat_response(request, data, config):
+    if config is None:
+        return JsonResponse({'success': True, 'message': 'Heartbeat received'})
+    return config_response(
+        request, config, data.get('config_version'),
+        success=True, message='Heartbeat received'
+    )
+
+
+# 📶 Station connect/disconnect
+
+def read_station_event(request):
+    """(device_id, mac_address, ip_address) of a connect/disconnect notification"""
+    data = json.loads(request.body)
+    device_id, mac_address = data.get('device_id'), data.get('mac_address')
+    if not device_id or not mac_address:
+        raise PayloadError(error_response('Missing device_id or mac_address'))
+    return device_id, mac_address, data.get('ip_address')
+
+
+def station_connected_response(connected_device):
+    return JsonResponse({
+        'success': True,
+        'message': f'Device {connected_device.mac_address} connected',
+        'device_id': connected_device.id
+    })
+
+
+def station_disconnected_response(connected_device):
+    return JsonResponse({
+        'success': True,
+        'message': f'Device {connected_device.mac_address} disconnected',
+        'device_id': connected_device.id
+    })
+
+
+def station_not_found_response(mac_address):
+    return JsonResponse({
+        'success': False,
+        'message': f'Device {mac_address} not found in active session'
+    }, status=404)
+
+
+# ✅ Attendance recording and student verification
+
+def read_attendance_record(request):
+    data = json.loads(request.body)
+    if not all(data.get(field) for field in ('matric_no', 'student_name', 'course_code', 'device_id')):
+        raise PayloadError(error_response('Missing required fields'))
+    return data
+
+
+def already_marked_response():
+    return error_response('Attendance already marked today')
+
+
+def attendance_recorded_response(data, attendance_record):
+    return JsonResponse({
+        'success': True,
+        'message': f"Attendance recorded for {data['student_name']}",
+        'attendance_id': attendance_record.id
+    })
+
+
+def read_student_verification(request):
+    """(matric_no, course_code) of a student verification request"""
+    data = json.loads(request.body)
+    matric_no, course_code = data.get('matric_no'), data.get('course_code')
+    if not matric_no or not course_code:
+        raise PayloadError(error_response('Missing matric_no or course_code'))
+    return matric_no, course_code
+
+
+def not_verified_response(message):
+    return JsonResponse({'success': False, 'message': message, 'enrolled': False})
+
+
+def student_verification_response(student, course, is_enrolled):
+    if is_enrolled:
+        return JsonResponse({
+            'success': True,
+            'message': 'Student verified and enrolled',
+            'enrolled': True,
+            'student_name': student.name,
+            'matric_no': student.matric_no,
+            'course_code': course.code,
+            'course_title': course.title
+        })
+    return JsonResponse({
+        'success': False,
+        'message': 'Student not enrolled in this course',
+        'enrolled': False,
+        'student_name': student.name,
+        'matric_no': student.matric_no
+    })
+
+
+# 📡 Presence reports and checks
+
+def read_presence_report(request):
+    """
+    (device_id, connected_devices, joined, left, seq) of a presence report;
+    connected_devices is None for a delta report (see presence.parse_presence_report)
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        raise PayloadError(JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400))
+    device_id = data.get('device_id')
+    if not device_id:
+        raise PayloadError(JsonResponse({'status': 'error', 'message': 'Device ID required'}, status=400))
+    try:
+        return (device_id, *parse_presence_report(data))
+    except ValueError as e:
+        raise PayloadError(JsonResponse({'status': 'error', 'message': str(e)}, status=400))
+
+
+def presence_device_defaults(device_id):
+    """ESP32Device fields for a gateway first seen through a presence report"""
+    return {'device_name': f'Presence Verification Device {device_id}', **PRESENCE_DEVICE_DEFAULTS}
+
+
+def presence_delta_response(device_id, outcome):
+    if outcome['result'] == DELTA_RESYNC:
+        return JsonResponse({
+            'status': 'resync',
+            'message': 'Send a full presence report',
+            'device_id': device_id,
+            'last_sequence': outcome['last_sequence'],
+        }, status=409)
+    return JsonResponse({
+        'status': 'success',
+        'message': f"Presence delta {outcome['result']}",
+        'device_id': device_id,
+        'device_count': outcome['device_count'],
+        'last_sequence': outcome['last_sequence'],
+        'checkpoint_due': outcome['checkpoint_due'],
+        'timestamp': timezone.now().isoformat()
+    })
+
+
+def presence_updated_response(device_id, connected_devices, seq):
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Presence data updated for {len(connected_devices)} devices',
+        'device_id': device_id,
+        'device_count': len(connected_devices),
+        'last_sequence': seq,
+        'checkpoint_due': False,
+        'timestamp': timezone.now().isoformat()
+    })
+
+
+def presence_error_response(exception):
+    return JsonResponse({'status': 'error', 'message': str(exception)}, status=500)
+
+
+def read_presence_query(request):
+    """
+    (student_device_id, student_device_ids, esp32_device_id) of a presence check;
+    student_device_ids is None unless a whole roster is checked
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        raise PayloadError(error_response('Invalid JSON'))
+    student_device_id = data.get('student_device_id')
+    student_device_ids = data.get('student_device_ids')
+    esp32_device_id = data.get('esp32_device_id')
+    if not all([student_device_id or student_device_ids, data.get('timestamp'), esp32_device_id]):
+        raise PayloadError(error_response('Missing required parameters'))
+    if student_device_ids is not None and not isinstance(student_device_ids, list):
+        raise PayloadError(error_response('student_device_ids must be a list'))
+    return student_device_id, student_device_ids, esp32_device_id
+
+
+def no_presence_data_response():
+    return JsonResponse({'present': False, 'reason': 'No ESP32 presence data available'})
+
+
+def presence_query_response(esp32_device_id, presence_data, present_devices, student_device_ids):
+    """present_devices: the checked MACs found in the pool (one MAC unless a roster was checked)"""
+    response = {
+        'timestamp': presence_data.get('timestamp'),
+        'esp32_device': esp32_device_id,
+        'total_devices': presence_data.get('device_count', 0)
+    }
+    if student_device_ids is not None:
+        response['results'] = {device: device in present_devices for device in student_device_ids}
+        response['present_count'] = len(present_devices)
+    else:
+        response['present'] = bool(present_devices)
+    return JsonResponse(response)
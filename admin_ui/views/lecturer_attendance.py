@@ -0,0 +1,555 @@
+"""
+📋 Lecturer attendance: taking, marking and reviewing attendance sessions
+"""
+from datetime import timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db import models
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from ..attendance_service import (
+    bulk_mark_attendance,
+    enrolled_students,
+    get_network_state,
+    save_roster_attendance,
+)
+from ..attendance_stats import attach_session_stats, get_course_summaries, get_session_summaries
+from ..models import (
+    AssignedCourse,
+    AttendanceRecord,
+    AttendanceSession,
+    ConnectedDevice,
+    Course,
+    CourseEnrollment,
+    ESP32Device,
+    NetworkSession,
+)
+
+
+def verify_network_attendance(student, course, date):
+    """Verify if a student was connected to the ESP32 network during attendance"""
+    try:
+        # Find active network session for this course and date
+        network_session = NetworkSession.objects.filter(
+            course=course,
+            date=date,
+            is_active=True
+        ).first()
+        
+        if not network_session:
+            return False, None
+        
+        # Check if student's device was connected
+        # For now, we'll use a simple approach - check if any device was connected
+        # In a real implementation, you'd need to map student devices to MAC addresses
+        connected_devices = ConnectedDevice.objects.filter(
+            network_session=network_session,
+            is_connected=True
+        )
+        
+        return connected_devices.exists(), network_session.esp32_device
+        
+    except Exception as e:
+        print(f"Error verifying network attendance: {e}")
+        return False, None
+
+# Update the existing course_attendance view to use network verification
+@login_required
+@user_passes_test(lambda u: u.groups.filter(name='Lecturers').exists())
+def course_attendance(request, assigned_id):
+    """Take attendance for a course with network verification"""
+    assigned_course = get_object_or_404(AssignedCourse, id=assigned_id)
+    
+    # Check if user is assigned to this course
+    if assigned_course.lecturer != request.user and not request.user.is_superuser:
+        messages.error(request, "You are not assigned to this course.")
+        return redirect('admin_ui:dashboard')
+    
+    if request.method == 'POST':
+        if 'take_attendance' in request.POST:
+            # Get time from form and parse it
+            time_from_form = request.POST.get('time', '09:00:00')
+            
+            # Parse the time string to a time object
+            try:
+                from datetime import datetime
+                if ':' in time_from_form:
+                    # Handle both "09:00" and "09:00:00" formats
+                    if time_from_form.count(':') == 1:
+                        time_from_form += ':00'
+                    parsed_time = datetime.strptime(time_from_form, '%H:%M:%S').time()
+                else:
+                    parsed_time = datetime.strptime(time_from_form, '%H:%M:%S').time()
+            except ValueError:
+                # Default to 09:00 if parsing fails
+                parsed_time = datetime.strptime('09:00:00', '%H:%M:%S').time()
+            
+            # Create attendance session with time
+            attendance_session, created = AttendanceSession.objects.get_or_create(
+                course=assigned_course.course,
+                lecturer=request.user,
+                session=assigned_course.session,
+                semester=assigned_course.semester,
+                date=timezone.now().date(),
+                time=parsed_time
+            )
+            
+            # Load the roster and network state once, then write every record in bulk
+            enrolled = enrolled_students(
+                assigned_course.course,
+                assigned_course.session,
+                assigned_course.semester
+            )
+            statuses = {
+                student.matric_no: request.POST.get(f'status_{student.matric_no}', 'absent')
+                for student in enrolled
+            }
+            network_state = (False, None)
+            if 'present' in statuses.values():
+                network_state = get_network_state(assigned_course.course, timezone.now().date())
+            save_roster_attendance(attendance_session, enrolled, statuses, request.user, network_state)
+            
+            # Check if this is an AJAX request
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                # Return updated attendance data for real-time table update
+                today = timezone.now().date()
+                attendance_records = AttendanceRecord.objects.filter(
+                    attendance_session__course=assigned_course.course,
+                    attendance_session__session=assigned_course.session,
+                    attendance_session__semester=assigned_course.semester
+                ).select_related('student', 'attendance_session', 'marked_by', 'esp32_device').order_by('-attendance_session__date', '-attendance_session__time', 'student__name')
+                
+                # Prepare data for JSON response
+                records_data = []
+                for record in attendance_records:
+                    records_data.append({
+                        'date': record.attendance_session.date.strftime('%b %d, %Y'),
+                        'time': record.attendance_session.time.strftime('%I:%M %p'),
+                        'student_name': record.student.name,
+                        'matric_no': record.student.matric_no,
+                        'status': record.status,
+                        'network_verified': record.network_verified,
+                        'esp32_device': record.esp32_device.device_name if record.esp32_device else '-',
+                        'marked_by': record.marked_by.username if record.marked_by else 'System',
+                        'marked_at': record.marked_at.strftime('%I:%M %p') if record.marked_at else '-'
+                    })
+                
+                return JsonResponse({
+                    'success': True,
+                    'message': f"Attendance taken for {assigned_course.course.code}",
+                    'attendance_records': records_data,
+                    'total_records': len(records_data)
+                })
+            
+            messages.success(request, f"Attendance taken for {assigned_course.course.code}")
+            return redirect('admin_ui:course_attendance', assigned_id=assigned_id)
+    
+    # Get existing attendance for today
+    today = timezone.now().date()
+    existing_attendance = {}
+    
+    try:
+        # Get the most recent attendance session for today (in case there are multiple)
+        attendance_session = AttendanceSession.objects.filter(
+            course=assigned_course.course,
+            date=today
+        ).order_by('-created_at').first()
+        
+        if attendance_session:
+            for record in AttendanceRecord.objects.filter(attendance_session=attendance_session):
+                existing_attendance[record.student_id] = record
+    except Exception as e:
+        print(f"Error getting existing attendance: {e}")
+        pass
+    
+    # Get enrolled students (use distinct to avoid duplicates)
+    students = enrolled_students(
+        assigned_course.course,
+        assigned_course.session,
+        assigned_course.semester
+    )
+    
+    # Network verification is per course and day, so check it once for the whole roster
+    network_verified, _ = get_network_state(assigned_course.course, today)
+    network_status = {student.matric_no: network_verified for student in students}
+    
+    # Get all attendance records for this course (for the records table)
+    attendance_records = AttendanceRecord.objects.filter(
+        attendance_session__course=assigned_course.course,
+        attendance_session__session=assigned_course.session,
+        attendance_session__semester=assigned_course.semester
+    ).select_related('student', 'attendance_session', 'marked_by').order_by('-attendance_session__date', '-attendance_session__time', 'student__name')
+    
+    return render(request, 'admin_ui/course_attendance.html', {
+        'assigned_course': assigned_course,
+        'students': students,
+        'existing_attendance': existing_attendance,
+        'network_status': network_status,
+        'today': today,
+        'attendance_records': attendance_records
+    })
+
+@login_required
+def start_attendance_session(request):
+    """Allow lecturers to start an attendance session with ESP32"""
+    if request.method == 'POST':
+        course_id = request.POST.get('course_id')
+        session = request.POST.get('session', '2024/2025')
+        semester = request.POST.get('semester', '1st Semester')
+        
+        try:
+            course = Course.objects.get(id=course_id)
+            
+            # Check if lecturer is assigned to this course
+            if not AssignedCourse.objects.filter(lecturer=request.user, course=course).exists():
+                messages.error(request, "❌ You are not assigned to this course.")
+                return redirect('admin_ui:dashboard')
+            
+            # Create or get attendance session
+            attendance_session, created = AttendanceSession.objects.get_or_create(
+                course=course,
+                lecturer=request.user,
+                session=session,
+                semester=semester,
+                date=timezone.now().date(),
+                defaults={}
+            )
+            
+            # Create network session for ESP32
+            esp32_device = ESP32Device.objects.filter(is_active=True).first()
+            if esp32_device:
+                network_session, created = NetworkSession.objects.get_or_create(
+                    esp32_device=esp32_device,
+                    course=course,
+                    lecturer=request.user,
+                    session=session,
+                    semester=semester,
+                    date=timezone.now().date(),
+                    start_time=timezone.now(),
+                    is_active=True
+                )
+                
+                messages.success(request, f"✅ Attendance session started for {course.code}!")
+                messages.info(request, f"📱 Students can now connect to ESP32 WiFi: {esp32_device.ssid}")
+                messages.info(request, f"🌐 ESP32 will automatically serve attendance page")
+                
+            else:
+                messages.warning(request, "⚠️ No active ESP32 device found. Attendance session created but ESP32 integration disabled.")
+            
+            return redirect('admin_ui:dashboard')
+            
+        except Course.DoesNotExist:
+            messages.error(request, "❌ Course not found.")
+        except Exception as e:
+            messages.error(request, f"❌ Error starting session: {str(e)}")
+    
+    # Get courses assigned to this lecturer
+    assigned_courses = Course.objects.filter(
+        assignedcourse__lecturer=request.user
+    ).distinct()
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'current_session': '2024/2025',
+        'current_semester': '1st Semester'
+    }
+    
+    return render(request, 'admin_ui/start_attendance_session.html', context)
+
+@login_required
+def lecturer_attendance_dashboard(request):
+    """Dashboard for lecturers to manage attendance"""
+    # Get courses assigned to this lecturer with enrollment counts
+    assigned_courses = AssignedCourse.objects.filter(
+        lecturer=request.user
+    ).select_related('course').order_by('session', 'semester', 'course__code')
+    course_summaries = get_course_summaries(
+        {(assigned.course_id, assigned.session, assigned.semester) for assigned in assigned_courses}
+    )
+    for assigned in assigned_courses:
+        assigned.enrolled_count = course_summaries[
+            (assigned.course_id, assigned.session, assigned.semester)
+        ].enrolled_count
+    
+    # Get today's attendance sessions
+    today = timezone.now().date()
+    today_sessions = AttendanceSession.objects.filter(
+        lecturer=request.user,
+        date=today
+    ).select_related('course')
+    
+    # Get active sessions (sessions from today that haven't been completed)
+    active_sessions = AttendanceSession.objects.filter(
+        lecturer=request.user,
+        date=today
+    ).select_related('course')
+    
+    # Get recent sessions (last 5 sessions)
+    recent_sessions = AttendanceSession.objects.filter(
+        lecturer=request.user
+    ).select_related('course').order_by('-date', '-id')[:5]
+    
+    # Add attendance statistics to recent sessions
+    recent_sessions = attach_session_stats(recent_sessions)
+    for session in recent_sessions:
+        session.is_active = session.date == today
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'today_sessions': today_sessions,
+        'active_sessions': active_sessions,
+        'recent_sessions': recent_sessions,
+        'today': today
+    }
+    
+    return render(request, 'admin_ui/lecturer_attendance_dashboard.html', context)
+
+@login_required
+def start_attendance_session_view(request):
+    """View to start a new attendance session"""
+    if request.method == 'POST':
+        course_id = request.POST.get('course')
+        session = request.POST.get('session')
+        semester = request.POST.get('semester')
+        date = request.POST.get('date')
+        time = request.POST.get('time')
+        session_type = request.POST.get('session_type', 'manual')
+        
+        if not all([course_id, session, semester, date, time]):
+            messages.error(request, "❌ Please fill in all required fields.")
+            return redirect('admin_ui:start_attendance_session_new')
+        
+        try:
+            course = Course.objects.get(id=course_id)
+            
+            # Check if lecturer is assigned to this course
+            if not AssignedCourse.objects.filter(lecturer=request.user, course=course).exists():
+                messages.error(request, "❌ You are not assigned to this course.")
+                return redirect('admin_ui:lecturer_attendance_dashboard')
+            
+            # Check if session already exists for this course, date, and time
+            existing_session = AttendanceSession.objects.filter(
+                course=course,
+                lecturer=request.user,
+                date=date,
+                time=time
+            ).first()
+            
+            if existing_session:
+                messages.info(request, f"ℹ️ Attendance session already exists for {course.code} on {date} at {time}.")
+                return redirect('admin_ui:mark_attendance', session_id=existing_session.id)
+            
+            # Create attendance session
+            attendance_session = AttendanceSession.objects.create(
+                course=course,
+                lecturer=request.user,
+                session=session,
+                semester=semester,
+                date=date,
+                time=time
+            )
+            
+            messages.success(request, f"✅ Attendance session started for {course.code} on {date} at {time}!")
+            return redirect('admin_ui:mark_attendance', session_id=attendance_session.id)
+            
+        except Course.DoesNotExist:
+            messages.error(request, "❌ Course not found.")
+        except Exception as e:
+            messages.error(request, f"❌ Error starting session: {str(e)}")
+    
+    # Get courses assigned to this lecturer with session and semester info
+    assigned_courses = AssignedCourse.objects.filter(
+        lecturer=request.user
+    ).select_related('course').order_by('course__code')
+    
+    context = {
+        'assigned_courses': assigned_courses,
+        'today_date': timezone.now().date()
+    }
+    
+    return render(request, 'admin_ui/start_attendance_session.html', context)
+
+@login_required
+def mark_attendance_view(request, session_id):
+    """View for lecturers to mark student attendance"""
+    try:
+        attendance_session = AttendanceSession.objects.get(
+            id=session_id,
+            lecturer=request.user
+        )
+    except AttendanceSession.DoesNotExist:
+        messages.error(request, "❌ Attendance session not found.")
+        return redirect('admin_ui:lecturer_attendance_dashboard')
+    
+    if request.method == 'POST':
+        # Handle attendance marking: validate and upsert the whole form in bulk
+        submitted = {
+            key[len('student_'):]: value
+            for key, value in request.POST.items()
+            if key.startswith('student_')
+        }
+        diff = bulk_mark_attendance(attendance_session, submitted, request.user)
+        
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': True, 'changes': diff})
+        
+        if diff['rejected']:
+            messages.warning(request, f"⚠️ {len(diff['rejected'])} submitted student(s) were skipped (not enrolled or invalid status).")
+        messages.success(request, "✅ Attendance marked successfully!")
+        return redirect('admin_ui:view_attendance_session', session_id=session_id)
+    
+    # Get enrolled students for this course
+    enrolled_students = CourseEnrollment.objects.filter(
+        course=attendance_session.course,
+        session=attendance_session.session,
+        semester=attendance_session.semester
+    ).select_related('student').order_by('student__name')
+    
+    # Get existing attendance records
+    existing_records = AttendanceRecord.objects.filter(
+        attendance_session=attendance_session
+    ).select_related('student')
+    
+    # Create a dictionary of existing records for easy lookup
+    attendance_dict = {record.student.matric_no: record.status for record in existing_records}
+    
+    context = {
+        'attendance_session': attendance_session,
+        'enrolled_students': enrolled_students,
+        'attendance_dict': attendance_dict
+    }
+    
+    return render(request, 'admin_ui/mark_attendance.html', context)
+
+@login_required
+def view_attendance_session_view(request, session_id):
+    """View to see attendance results for a session"""
+    try:
+        attendance_session = AttendanceSession.objects.get(
+            id=session_id,
+            lecturer=request.user
+        )
+    except AttendanceSession.DoesNotExist:
+        messages.error(request, "❌ Attendance session not found.")
+        return redirect('admin_ui:lecturer_dashboard')
+    
+    # Get attendance records
+    attendance_records = AttendanceRecord.objects.filter(
+        attendance_session=attendance_session
+    ).select_related('student').order_by('student__name')
+    
+    # Statistics from the session summary
+    summary = get_session_summaries([attendance_session.id])[attendance_session.id]
+    
+    context = {
+        'attendance_session': attendance_session,
+        'attendance_records': attendance_records,
+        'total_students': summary.total_count,
+        'present_count': summary.present_count,
+        'absent_count': summary.absent_count
+    }
+    
+    return render(request, 'admin_ui/view_attendance_session.html', context)
+
+@login_required
+def lecturer_attendance_history_view(request):
+    """View to see all attendance sessions by this lecturer"""
+    from django.core.paginator import Paginator
+    from django.db.models import Q
+    
+    # Get filter parameters
+    selected_course = request.GET.get('course')
+    selected_session = request.GET.get('session')
+    selected_semester = request.GET.get('semester')
+    selected_date_range = request.GET.get('date_range')
+    
+    # Base query
+    attendance_sessions = AttendanceSession.objects.filter(
+        lecturer=request.user
+    ).select_related('course')
+    
+    # Apply filters
+    if selected_course:
+        attendance_sessions = attendance_sessions.filter(course_id=selected_course)
+    
+    if selected_session:
+        attendance_sessions = attendance_sessions.filter(session=selected_session)
+    
+    if selected_semester:
+        attendance_sessions = attendance_sessions.filter(semester=selected_semester)
+    
+    if selected_date_range:
+        today = timezone.now().date()
+        if selected_date_range == 'today':
+            attendance_sessions = attendance_sessions.filter(date=today)
+        elif selected_date_range == 'week':
+            week_ago = today - timedelta(days=7)
+            attendance_sessions = attendance_sessions.filter(date__gte=week_ago)
+        elif selected_date_range == 'month':
+            month_ago = today - timedelta(days=30)
+            attendance_sessions = attendance_sessions.filter(date__gte=month_ago)
+        elif selected_date_range == 'semester':
+            # Assuming semester is roughly 4 months
+            semester_ago = today - timedelta(days=120)
+            attendance_sessions = attendance_sessions.filter(date__gte=semester_ago)
+    
+    # Order by date (newest first)
+    attendance_sessions = attendance_sessions.order_by('-date', '-id')
+    
+    # Pagination
+    paginator = Paginator(attendance_sessions, 20)  # 20 sessions per page
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    # Add attendance statistics to the sessions on this page only
+    page_obj.object_list = attach_session_stats(page_obj.object_list)
+    
+    # Get available filter options
+    available_courses = Course.objects.filter(
+        assignedcourse__lecturer=request.user
+    ).distinct().order_by('code')
+    
+    available_sessions = AttendanceSession.objects.filter(
+        lecturer=request.user
+    ).values_list('session', flat=True).distinct().order_by('-session')
+    
+    available_semesters = AttendanceSession.objects.filter(
+        lecturer=request.user
+    ).values_list('semester', flat=True).distinct().order_by('semester')
+    
+    # Calculate overall statistics
+    all_records = AttendanceRecord.objects.filter(
+        attendance_session__lecturer=request.user
+    )
+    
+    total_sessions = paginator.count
+    totals = all_records.aggregate(
+        present=models.Count('id', filter=models.Q(status='present')),
+        absent=models.Count('id', filter=models.Q(status='absent'))
+    )
+    total_students_present = totals['present']
+    total_students_absent = totals['absent']
+    overall_attendance_rate = (total_students_present / (total_students_present + total_students_absent) * 100) if (total_students_present + total_students_absent) > 0 else 0
+    
+    context = {
+        'attendance_sessions': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'available_courses': available_courses,
+        'available_sessions': available_sessions,
+        'available_semesters': available_semesters,
+        'selected_course': selected_course,
+        'selected_session': selected_session,
+        'selected_semester': selected_semester,
+        'selected_date_range': selected_date_range,
+        'total_sessions': total_sessions,
+        'total_students_present': total_students_present,
+        'total_students_absent': total_students_absent,
+        'overall_attendance_rate': overall_attendance_rate,
+        'today_date': timezone.now().date()
+    }
+    
+    return render(request, 'admin_ui/lecturer_attendance_history.html', context)
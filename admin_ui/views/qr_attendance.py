@@ -0,0 +1,52 @@
+"""
+🔳 Rotating QR code attendance (see admin_ui/qr_tokens.py)
+"""
+from django.contrib.auth.decorators import login_required
+from django.core import signing
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.cache import never_cache
+
+from ..models import NetworkSession
+from ..qr_tokens import issue_token, mark_from_token, qr_setting, read_token, seconds_to_next_slot
+
+
+@never_cache
+@login_required
+def network_session_qr_token_view(request, session_id):
+    """Current QR token of the lecturer's active network session, polled by the active-session page"""
+    network_session = get_object_or_404(
+        NetworkSession.objects.select_related('esp32_device'), id=session_id, lecturer=request.user
+    )
+    if not network_session.is_active:
+        return JsonResponse({'error': 'Session is not active'}, status=409)
+
+    token = issue_token(network_session)
+    return JsonResponse({
+        'token': token,
+        'url': request.build_absolute_uri(f"{reverse('admin_ui:qr_attendance')}?{urlencode({'t': token})}"),
+        'slot_seconds': qr_setting('SLOT_SECONDS'),
+        'refresh_in': round(seconds_to_next_slot(), 1),
+    })
+
+
+@never_cache
+@login_required(login_url='admin_ui:student_login')
+def qr_attendance_view(request):
+    """Mark the logged-in student present from a scanned QR code"""
+    try:
+        claims = read_token(request.GET.get('t', ''))
+    except signing.SignatureExpired:
+        marked, message = False, 'This QR code has expired. Scan the code on screen again.'
+    except signing.BadSignature:
+        marked, message = False, 'This QR code is not valid.'
+    else:
+        # Students log in with their matric number
+        marked, message = mark_from_token(claims, request.user.username)
+
+    return render(request, 'admin_ui/qr_attendance_result.html', {
+        'marked': marked,
+        'message': message,
+    }, status=200 if marked else 400)
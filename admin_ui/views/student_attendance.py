@@ -0,0 +1,165 @@
+"""
+🎯 Student self-service attendance marking over the ESP32 network
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from ..models import (
+    AttendanceRecord,
+    AttendanceSession,
+    ConnectedDevice,
+    CourseEnrollment,
+    NetworkSession,
+    Student,
+)
+
+
+# 🎯 Student Attendance Marking System - ESP32 Integration
+@login_required
+def student_attendance_marking_view(request):
+    """Student view to mark attendance for active sessions"""
+    try:
+        # Get the student profile for the current user
+        student = Student.objects.get(matric_no=request.user.username)
+    except Student.DoesNotExist:
+        messages.error(request, "Student profile not found. Please contact administrator.")
+        return redirect('admin_ui:dashboard')
+    
+    # Get all active network sessions where this student is enrolled
+    active_sessions = NetworkSession.objects.filter(
+        is_active=True,
+        course__courseenrollment__student=student
+    ).select_related('course', 'lecturer', 'esp32_device').distinct()
+    
+    # Get today's date
+    today = timezone.now().date()
+    
+    # Get existing attendance records for today
+    existing_attendance = {}
+    try:
+        attendance_sessions = AttendanceSession.objects.filter(
+            course__courseenrollment__student=student,
+            date=today
+        )
+        for session in attendance_sessions:
+            try:
+                record = AttendanceRecord.objects.get(
+                    attendance_session=session,
+                    student=student
+                )
+                existing_attendance[session.course.code] = record
+            except AttendanceRecord.DoesNotExist:
+                pass
+    except Exception as e:
+        print(f"Error getting existing attendance: {e}")
+    
+    # Check network connectivity status for each active session
+    network_status = {}
+    for session in active_sessions:
+        # Check if student's device was connected to ESP32 network
+        connected_device = ConnectedDevice.objects.filter(
+            network_session=session,
+            is_connected=True
+        ).first()
+        
+        network_status[session.id] = {
+            'connected': connected_device is not None,
+            'device_mac': connected_device.mac_address if connected_device else None,
+            'connected_at': connected_device.connected_at if connected_device else None
+        }
+    
+    if request.method == 'POST':
+        session_id = request.POST.get('session_id')
+        action = request.POST.get('action')
+        
+        if session_id and action:
+            try:
+                network_session = NetworkSession.objects.get(id=session_id)
+                
+                # Verify student is enrolled in this course
+                if not CourseEnrollment.objects.filter(
+                    student=student,
+                    course=network_session.course
+                ).exists():
+                    messages.error(request, "You are not enrolled in this course.")
+                    return redirect('admin_ui:student_attendance_marking')
+                
+                if action == 'mark_present':
+                    # 🚨 ENFORCE ESP32 CONNECTION - Block attendance without physical presence
+                    if not network_status[network_session.id]['connected']:
+                        messages.error(request, f"❌ CANNOT MARK ATTENDANCE: You must connect to ESP32 WiFi network '{network_session.esp32_device.wifi_ssid if network_session.esp32_device else 'Classroom_Attendance'}' to verify physical presence. Please connect to the classroom WiFi first, then try again.")
+                        return redirect('admin_ui:student_attendance_marking')
+                    
+                    # Check if attendance already exists for today
+                    attendance_session, created = AttendanceSession.objects.get_or_create(
+                        course=network_session.course,
+                        lecturer=network_session.lecturer,
+                        session=network_session.session,
+                        semester=network_session.semester,
+                        date=today
+                    )
+                    
+                    # Check if attendance record already exists
+                    attendance_record, record_created = AttendanceRecord.objects.get_or_create(
+                        attendance_session=attendance_session,
+                        student=student,
+                        defaults={
+                            'status': 'present',
+                            'network_verified': True,  # Always True since we enforced connection
+                            'device_mac': network_status[network_session.id]['device_mac'],
+                            'esp32_device': network_session.esp32_device
+                        }
+                    )
+                    
+                    if not record_created:
+                        # Update existing record
+                        attendance_record.status = 'present'
+                        attendance_record.network_verified = True  # Always True since we enforced connection
+                        attendance_record.device_mac = network_status[network_session.id]['device_mac']
+                        attendance_record.esp32_device = network_session.esp32_device
+                        attendance_record.save()
+                    
+                    messages.success(request, f"✅ Attendance marked as PRESENT for {network_session.course.code} - ESP32 Network Verified!")
+                    
+                elif action == 'mark_absent':
+                    # Mark as absent
+                    attendance_session, created = AttendanceSession.objects.get_or_create(
+                        course=network_session.course,
+                        lecturer=network_session.lecturer,
+                        session=network_session.session,
+                        semester=network_session.semester,
+                        date=today
+                    )
+                    
+                    attendance_record, record_created = AttendanceRecord.objects.get_or_create(
+                        attendance_session=attendance_session,
+                        student=student,
+                        defaults={
+                            'status': 'absent',
+                            'network_verified': False
+                        }
+                    )
+                    
+                    if not record_created:
+                        attendance_record.status = 'absent'
+                        attendance_record.network_verified = False
+                        attendance_record.save()
+                    
+                    messages.success(request, f"❌ Attendance marked as ABSENT for {network_session.course.code}")
+                
+                return redirect('admin_ui:student_attendance_marking')
+                
+            except NetworkSession.DoesNotExist:
+                messages.error(request, "Session not found.")
+            except Exception as e:
+                messages.error(request, f"Error marking attendance: {str(e)}")
+    
+    return render(request, 'admin_ui/student_attendance_marking.html', {
+        'student': student,
+        'active_sessions': active_sessions,
+        'existing_attendance': existing_attendance,
+        'network_status': network_status,
+        'today': today
+    })
@@ -8,5 +8,5 @@ pip install -r requirements.txt
 # Collect static files
 python manage.py collectstatic --no-input
 
-# Run database migrations
-python manage.py migrate
+# Apply migrations and create the default admin (idempotent, lock-protected)
+python manage.py bootstrap
@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for serving the project over ASGI with uvicorn workers.
+
+    gunicorn config.asgi:application -c config/gunicorn_asgi.py
+
+Each worker runs one event loop, so a worker keeps serving lecturer pages while
+hundreds of ESP32 requests (and parked command long-polls) wait on the database.
+See ASGI_SERVING_GUIDE.md.
+"""
+import os
+
+# Route the hot device endpoints to their async views
+os.environ.setdefault('ESP32_ASYNC_API', 'True')
+# Persistent connections are not reused across async requests; keep them per request
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Must outlast the longest command long-poll (DEVICE_COMMANDS['MAX_TIMEOUT'])
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 90))
+graceful_timeout = 30
+# Gateways reuse their connection between heartbeats
+keepalive = 75
+
+errorlog = '-'
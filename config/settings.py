@@ -128,7 +128,7 @@ elif DATABASE_URL and 'postgresql' in DATABASE_URL:
             print("🎯 Using Supabase PostgreSQL database")
             # Optimize for Supabase
             db_config.update({
-                'CONN_MAX_AGE': 60,  # Connection pooling
+                'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),  # Connection pooling (0 under ASGI)
                 'OPTIONS': {
                     'sslmode': 'require',  # Supabase requires SSL
                     'connect_timeout': 10,  # Connection timeout
@@ -179,28 +179,9 @@ else:
     }
     print("📁 Using SQLite database (default fallback)")
 
-# Auto-create database tables if they don't exist
-import os
-if os.environ.get('AUTO_CREATE_DB', 'True') == 'True':
-    print("Auto-creating database tables...")
-    try:
-        from django.core.management import execute_from_command_line
-        import sys
-        # Run migrations silently
-        execute_from_command_line(['manage.py', 'migrate', '--noinput'])
-        print("Database tables created successfully!")
-        
-        # Create superuser if none exists
-        from django.contrib.auth.models import User
-        if not User.objects.exists():
-            User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
-            print("Superuser 'admin' created with password 'admin123'")
-        else:
-            print("Superuser already exists")
-            
-    except Exception as e:
-        print(f"Auto-creation failed: {e}")
-        print("You may need to run migrations manually")
+# Schema migrations and the default admin account are set up once per deploy by
+# `python manage.py bootstrap` (see build.sh / Procfile), never at import time,
+# so worker startup and management commands do not touch the database here.
 
 
 # Password validation
@@ -262,6 +243,127 @@ SUPERUSER_PASSKEY = 'super123'  # 🛡️ Replace with your real secret
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 
+# 🗄️ Default cache (Django's per-process local memory cache unless configured). With several workers use
+# a shared backend, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and CACHE_LOCATION=redis://...
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# 📡 ESP32 presence store shared by all workers (see admin_ui/presence.py)
+# Use 'admin_ui.presence.RedisPresenceStore' with PRESENCE_REDIS_URL to keep presence in Redis
+PRESENCE_STORE = {
+    'BACKEND': os.environ.get('PRESENCE_STORE_BACKEND', 'admin_ui.presence.DatabasePresenceStore'),
+    'TTL': int(os.environ.get('PRESENCE_TTL', 300)),
+    'CHECKPOINT_INTERVAL': int(os.environ.get('PRESENCE_CHECKPOINT_INTERVAL', 120)),
+    'OPTIONS': {
+        'url': os.environ.get('PRESENCE_REDIS_URL', 'redis://localhost:6379/0'),
+    },
+}
+
+# 🕒 Presence history: per-station connection intervals of each session (see admin_ui/presence_history.py)
+PRESENCE_HISTORY = {
+    'ENABLED': os.environ.get('PRESENCE_HISTORY', 'True') == 'True',
+    'SAMPLE_INTERVAL': int(os.environ.get('PRESENCE_HISTORY_SAMPLE_INTERVAL', 60)),
+    'MERGE_GAP': int(os.environ.get('PRESENCE_HISTORY_MERGE_GAP', 180)),
+}
+
+# 💓 ESP32 heartbeats are batched and flushed to the database every FLUSH_INTERVAL seconds
+# (see admin_ui/heartbeats.py). Use 'admin_ui.heartbeats.RedisHeartbeatRecorder' to share them between workers
+HEARTBEAT_RECORDER = {
+    'BACKEND': os.environ.get('HEARTBEAT_RECORDER_BACKEND', 'admin_ui.heartbeats.LocalHeartbeatRecorder'),
+    'FLUSH_INTERVAL': int(os.environ.get('HEARTBEAT_FLUSH_INTERVAL', 30)),
+    'OPTIONS': {
+        'url': os.environ.get('HEARTBEAT_REDIS_URL', os.environ.get('PRESENCE_REDIS_URL', 'redis://localhost:6379/0')),
+    },
+}
+
+# 🗂️ Cached active network session per ESP32 (see admin_ui/session_registry.py)
+# Point CACHE at a shared cache so that starting/ending a session is seen by every worker at once
+ACTIVE_SESSION_REGISTRY = {
+    'CACHE': os.environ.get('ACTIVE_SESSION_CACHE', 'default'),
+    'TTL': int(os.environ.get('ACTIVE_SESSION_TTL', 60)),
+}
+
+# 📶 Access point pools for large classes (see admin_ui/access_points.py)
+# A session gets one access point per CAPACITY enrolled students, up to MAX_SIZE
+ACCESS_POINT_POOL = {
+    'CAPACITY': int(os.environ.get('ACCESS_POINT_CAPACITY', 8)),
+    'MAX_SIZE': int(os.environ.get('ACCESS_POINT_POOL_SIZE', 4)),
+    'LOAD_TTL': int(os.environ.get('ACCESS_POINT_LOAD_TTL', 120)),
+    'MARK_LOCK_TIMEOUT': 10,
+}
+
+# 📥 Write-behind spool for device attendance marks (see admin_ui/attendance_spool.py)
+# Marks are acknowledged once on local disk and applied to the database in batches; APPLIER='command'
+# leaves draining to `manage.py apply_attendance_spool` running on the same host
+ATTENDANCE_SPOOL = {
+    'ENABLED': os.environ.get('ATTENDANCE_SPOOL', 'False') == 'True',
+    'PATH': os.environ.get('ATTENDANCE_SPOOL_PATH', str(BASE_DIR / 'attendance_spool.sqlite3')),
+    'BATCH_SIZE': int(os.environ.get('ATTENDANCE_SPOOL_BATCH_SIZE', 200)),
+    'INTERVAL': float(os.environ.get('ATTENDANCE_SPOOL_INTERVAL', 1)),
+    'APPLIER': os.environ.get('ATTENDANCE_SPOOL_APPLIER', 'thread'),
+    'RETENTION': int(os.environ.get('ATTENDANCE_SPOOL_RETENTION', 86400)),
+}
+
+# 🔳 Rotating QR check-in codes (see admin_ui/qr_tokens.py)
+# PRESENCE: 'off' (token only), 'record' (note ESP32 presence) or 'required' (refuse students not connected)
+ATTENDANCE_QR = {
+    'SLOT_SECONDS': int(os.environ.get('ATTENDANCE_QR_SLOT_SECONDS', 10)),
+    'GRACE_SLOTS': int(os.environ.get('ATTENDANCE_QR_GRACE_SLOTS', 6)),
+    'PRESENCE': os.environ.get('ATTENDANCE_QR_PRESENCE', 'off'),
+}
+
+# ⚡ Serve the hot ESP32 endpoints with their async views (admin_ui/views/esp32_api_async.py).
+# Turn on when running under an ASGI server (see ASGI_SERVING_GUIDE.md); under WSGI the sync views are faster
+ESP32_ASYNC_API = os.environ.get('ESP32_ASYNC_API', 'False') == 'True'
+
+# 📬 Long-poll command channel for ESP32 gateways (see admin_ui/device_commands.py)
+# Parked requests are cheap under ASGI; under WSGI each one holds a worker, so there
+# requests park at most WSGI_TIMEOUT seconds (0 = short-poll), kept well below gunicorn's timeout
+DEVICE_COMMANDS = {
+    'TIMEOUT': int(os.environ.get('DEVICE_COMMAND_TIMEOUT', 25)),
+    'MAX_TIMEOUT': int(os.environ.get('DEVICE_COMMAND_MAX_TIMEOUT', 55)),
+    'POLL_INTERVAL': float(os.environ.get('DEVICE_COMMAND_POLL_INTERVAL', 1)),
+    'TTL': int(os.environ.get('DEVICE_COMMAND_TTL', 600)),
+    'WSGI_TIMEOUT': int(os.environ.get('DEVICE_COMMAND_WSGI_TIMEOUT', 0)),
+}
+
+# 🔑 Shared ESP32 API key. When unset a key is generated into the default cache,
+# which is lost on restart and differs per worker with the local memory cache
+ESP32_API_KEY = os.environ.get('ESP32_API_KEY', '')
+
+# 🔏 Per-device HMAC-signed requests (see admin_ui/device_credentials.py)
+# MODE: 'off', 'optional' (verify signed requests, unsigned ones use the API key) or 'required'
+DEVICE_AUTH = {
+    'MODE': os.environ.get('DEVICE_AUTH_MODE', 'optional'),
+    'WINDOW': int(os.environ.get('DEVICE_AUTH_WINDOW', 300)),
+    'NONCE_CACHE': 'default',
+    'SECRET_CACHE_SIZE': int(os.environ.get('DEVICE_AUTH_SECRET_CACHE_SIZE', 1024)),
+    'SECRET_CACHE_TTL': int(os.environ.get('DEVICE_AUTH_SECRET_CACHE_TTL', 300)),
+    'REFRESH_INTERVAL': float(os.environ.get('DEVICE_AUTH_REFRESH_INTERVAL', 5)),
+}
+
+# 🚦 Per-device rate limits and load shedding on the device API (see admin_ui/device_rate_limit.py)
+# CLASSES overrides the per-class limits, e.g. {'heartbeat': {'RATE': 12, 'BURST': 5}} (RATE per minute)
+DEVICE_RATE_LIMIT = {
+    'ENABLED': os.environ.get('DEVICE_RATE_LIMIT', 'True') == 'True',
+    'CACHE': 'default',
+    'SHED_LATENCY_MS': int(os.environ.get('DEVICE_SHED_LATENCY_MS', 1000)),
+    'SHED_RETRY_AFTER': int(os.environ.get('DEVICE_SHED_RETRY_AFTER', 15)),
+    'SHED_STALE_AFTER': 10,
+    'CLASSES': {},
+}
+
+# 🔁 Replay stored responses to retried device POSTs carrying an Idempotency-Key (see admin_ui/idempotency.py)
+DEVICE_IDEMPOTENCY = {
+    'CACHE': 'default',
+    'TTL': int(os.environ.get('DEVICE_IDEMPOTENCY_TTL', 600)),
+    'LOCK_TIMEOUT': int(os.environ.get('DEVICE_IDEMPOTENCY_LOCK_TIMEOUT', 60)),
+}
+
 # Logging configuration for production debugging
 if not DEBUG:
     LOGGING = {
@@ -64,6 +64,7 @@ LOGGING = {
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Console backend for testing
 
 # Cache configuration
+# LocMemCache is per process; ESP32 presence data lives in PRESENCE_STORE instead
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+ESP32 Fleet Load Test for Django Attendance System
+
+Simulates N classrooms (one ESP32 gateway each) with M students per class
+against a running server, using the same calls as ESP32TestClient. Each
+classroom replays a class-start burst: students join the access point within
+a few seconds, the gateway reports every connection, pushes presence updates
+and records attendance, while heartbeats keep flowing for the whole run.
+
+Requests are issued concurrently from asyncio (blocking `requests` calls run
+in a thread pool) and the report lists p50/p95/p99 latency and throughput per
+endpoint, so it can be used to size gunicorn workers and to catch regressions.
+
+Usage:
+    # Seed LOAD* devices, credentials, students, enrollments and active sessions in the local DB
+    python esp32_load_test.py --setup --classrooms 10 --students 60 --secrets load_secrets.json
+
+    # Run the load against a local server
+    python esp32_load_test.py --host 127.0.0.1:8000 --token <esp32 api key> \\
+        --classrooms 10 --students 60 --duration 60 --secrets load_secrets.json --json load_report.json
+
+The API key is shown on the ESP32 setup page (/admin-panel/esp32-setup/). With
+--secrets every gateway signs its requests with its device credential, which
+DEVICE_AUTH_MODE=required needs.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from esp32_test_client import DeviceSignatureAuth, ESP32TestClient
+
+LOAD_COURSE_CODE = "LOAD101"
+LOAD_SESSION = "2024/2025"
+LOAD_SEMESTER = "1st Semester"
+
+
+def device_id_for(classroom):
+    return f"LOAD_ESP32_{classroom:03d}"
+
+
+def matric_for(classroom, student):
+    return f"LOAD{classroom:03d}{student:04d}"
+
+
+def mac_for(classroom, student):
+    return "02:%02x:%02x:%02x:%02x:%02x" % (
+        (classroom >> 8) & 0xff, classroom & 0xff, (student >> 16) & 0xff, (student >> 8) & 0xff, student & 0xff
+    )
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyRecorder:
+    """Collects per-endpoint latencies and error counts"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, status_code):
+        self.latencies[endpoint].append(seconds * 1000)
+        self.status_codes[endpoint][status_code] += 1
+        if not isinstance(status_code, int) or status_code >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, wall_seconds):
+        rows = {}
+        all_latencies = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            all_latencies.extend(values)
+            rows[endpoint] = self._row(values, self.errors[endpoint], wall_seconds)
+            rows[endpoint]['status_codes'] = dict(self.status_codes[endpoint])
+        rows['TOTAL'] = self._row(sorted(all_latencies), sum(self.errors.values()), wall_seconds)
+        return rows
+
+    @staticmethod
+    def _row(values, errors, wall_seconds):
+        return {
+            'requests': len(values),
+            'errors': errors,
+            'throughput_rps': round(len(values) / wall_seconds, 1) if wall_seconds else 0,
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+            'max_ms': round(values[-1], 1) if values else 0,
+        }
+
+
+class AsyncESP32Client(ESP32TestClient):
+    """
+    ESP32TestClient with the same calls, made awaitable and timed.
+
+    Blocking requests run in the event loop's thread pool; every thread keeps its
+    own requests.Session so connections are reused across calls. The sessions are
+    shared by all gateways, so each request carries its gateway's signature auth.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, host, token, device_id, recorder, use_https=False, base_path="/admin-panel", secret=None):
+        super().__init__(host, token, use_https, device_id=device_id, secret=secret)
+        self.base_url = f"{self.protocol}://{host}{base_path}"
+        self.device_id = device_id
+        self.recorder = recorder
+        self.auth = DeviceSignatureAuth(device_id, secret) if secret else None
+
+    def _http(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _post(self, endpoint, data):
+        start = time.perf_counter()
+        try:
+            response = self._http().post(
+                f"{self.base_url}{endpoint}", headers=self.headers, json=data, auth=self.auth, timeout=30
+            )
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        self.recorder.record(endpoint, time.perf_counter() - start, status)
+        return status
+
+    async def post(self, endpoint, data):
+        return await asyncio.to_thread(self._post, endpoint, data)
+
+    async def send_heartbeat(self):
+        return await self.post("/api/esp32/heartbeat/", {
+            "device_id": self.device_id,
+            "timestamp": int(time.time())
+        })
+
+    async def report_device_connected(self, mac_address, device_name="", ip_address=""):
+        return await self.post("/api/esp32/device-connected/", {
+            "device_id": self.device_id,
+            "mac_address": mac_address,
+            "device_name": device_name,
+            "ip_address": ip_address
+        })
+
+    async def report_presence(self, connected_devices):
+        return await self.post("/api/esp32/presence-update/", {
+            "device_id": self.device_id,
+            "connected_devices": connected_devices,
+            "timestamp": int(time.time())
+        })
+
+    async def record_attendance(self, student_matric_no, mac_address, student_name="", course_code=LOAD_COURSE_CODE):
+        return await self.post("/api/esp32/record-attendance/", {
+            "matric_no": student_matric_no,
+            "student_name": student_name or student_matric_no,
+            "course_code": course_code,
+            "device_id": self.device_id,
+            "mac_address": mac_address
+        })
+
+
+async def simulate_classroom(client, classroom, args, stop_at):
+    """Class-start burst for one classroom followed by steady heartbeats and presence updates"""
+    connected = []
+    ramp = max(args.ramp, 0.001)
+
+    async def heartbeats():
+        # Devices boot at slightly different times
+        await asyncio.sleep(random.uniform(0, args.heartbeat_interval))
+        while time.monotonic() < stop_at:
+            await client.send_heartbeat()
+            await asyncio.sleep(args.heartbeat_interval)
+
+    async def student_arrives(student):
+        await asyncio.sleep(random.uniform(0, ramp))
+        mac_address = mac_for(classroom, student)
+        await client.report_device_connected(mac_address, f"Phone_{student}", f"192.168.4.{2 + student % 250}")
+        connected.append(mac_address)
+        await client.record_attendance(matric_for(classroom, student), mac_address)
+
+    async def presence_updates():
+        while time.monotonic() < stop_at:
+            await asyncio.sleep(args.presence_interval)
+            await client.report_presence(list(connected))
+
+    tasks = [asyncio.create_task(heartbeats()), asyncio.create_task(presence_updates())]
+    await asyncio.gather(*(student_arrives(student) for student in range(args.students)))
+    await asyncio.gather(*tasks)
+
+
+async def run_load(args):
+    recorder = LatencyRecorder()
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+
+    secrets = getattr(args, 'secrets', None) or {}
+    clients = [
+        AsyncESP32Client(args.host, args.token, device_id_for(classroom), recorder,
+                         use_https=args.https, base_path=args.base_path,
+                         secret=secrets.get(device_id_for(classroom)))
+        for classroom in range(args.classrooms)
+    ]
+
+    start = time.monotonic()
+    stop_at = start + args.duration
+    await asyncio.gather(*(
+        simulate_classroom(client, classroom, args, stop_at)
+        for classroom, client in enumerate(clients)
+    ))
+    return recorder.report(time.monotonic() - start)
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<34} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    print("-" * 95)
+    for endpoint, row in report.items():
+        print(f"{endpoint:<34} {row['requests']:>7} {row['errors']:>6} {row['throughput_rps']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}")
+    print("(latencies in ms)")
+
+
+def setup_fixtures(args):
+    """
+    Create the LOAD* course, devices, credentials, students, enrollments and active
+    sessions (idempotent); returns the devices' signing secrets by device_id
+    """
+    import os
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from admin_ui.attendance_stats import invalidate_summaries
+    from admin_ui.models import Course, Student, CourseEnrollment, DeviceCredential, ESP32Device, NetworkSession
+
+    # record-attendance attributes auto-created sessions to 'lecturer1'
+    lecturer, _ = User.objects.get_or_create(username='lecturer1')
+    course, _ = Course.objects.get_or_create(code=LOAD_COURSE_CODE, defaults={'title': 'Load Test Course'})
+    secrets = {}
+
+    for classroom in range(args.classrooms):
+        device, _ = ESP32Device.objects.get_or_create(
+            device_id=device_id_for(classroom),
+            defaults={
+                'device_name': f'Load Test Classroom {classroom}',
+                'ssid': f'LOAD_{classroom:03d}',
+                'password': '',
+                'location': f'Load Test Room {classroom}',
+            }
+        )
+        credential, _ = DeviceCredential.objects.get_or_create(esp32_device=device)
+        secrets[device.device_id] = credential.secret
+        NetworkSession.objects.get_or_create(
+            esp32_device=device,
+            course=course,
+            is_active=True,
+            defaults={
+                'lecturer': lecturer,
+                'session': LOAD_SESSION,
+                'semester': LOAD_SEMESTER,
+                'date': timezone.now().date(),
+                'start_time': timezone.now(),
+            }
+        )
+
+        Student.objects.bulk_create([
+            Student(matric_no=matric_for(classroom, student), name=f'Load Student {classroom}-{student}')
+            for student in range(args.students)
+        ], ignore_conflicts=True)
+        CourseEnrollment.objects.bulk_create([
+            CourseEnrollment(student_id=matric_for(classroom, student), course=course,
+                             session=LOAD_SESSION, semester=LOAD_SEMESTER)
+            for student in range(args.students)
+        ], ignore_conflicts=True)
+
+    # bulk_create skips the signals that keep the enrolled counts current
+    invalidate_summaries(terms=[(course.id, LOAD_SESSION, LOAD_SEMESTER)])
+    print(f"✅ Fixtures ready: {args.classrooms} classrooms × {args.students} students in {LOAD_COURSE_CODE}")
+    return secrets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ESP32 fleet load test for Django Attendance System")
+    parser.add_argument("--host", default="127.0.0.1:8000", help="Django backend host (default: 127.0.0.1:8000)")
+    parser.add_argument("--token", default="", help="ESP32 API key")
+    parser.add_argument("--https", action="store_true", help="Use HTTPS (default: HTTP for a local server)")
+    parser.add_argument("--base-path", default="/admin-panel", help="URL prefix of the admin_ui app")
+    parser.add_argument("--classrooms", type=int, default=5, help="Number of simulated ESP32 gateways")
+    parser.add_argument("--students", type=int, default=40, help="Students per classroom")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to keep heartbeats/presence running")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds over which students arrive")
+    parser.add_argument("--heartbeat-interval", type=float, default=5, help="Seconds between heartbeats")
+    parser.add_argument("--presence-interval", type=float, default=10, help="Seconds between presence updates")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--setup", action="store_true", help="Create load test fixtures in the local DB and exit")
+    parser.add_argument("--secrets", help="JSON file of device secrets: written by --setup, used to sign requests")
+
+    args = parser.parse_args()
+
+    if args.setup:
+        secrets = setup_fixtures(args)
+        if args.secrets:
+            with open(args.secrets, "w") as f:
+                json.dump(secrets, f, indent=2)
+            print(f"🔑 Device secrets written to {args.secrets}")
+        return
+
+    if args.secrets:
+        with open(args.secrets) as f:
+            args.secrets = json.load(f)
+
+    print("🚀 ESP32 Fleet Load Test")
+    print(f"🌐 Backend: {args.host}{args.base_path}")
+    print(f"🏫 {args.classrooms} classrooms × {args.students} students, {args.duration:.0f}s, "
+          f"concurrency {args.concurrency}")
+    print("=" * 50)
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+
+    print("\n🏁 Load test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ESP32 Serving Profile Benchmark for Django Attendance System
+
+Starts the app under each serving profile with the same number of gunicorn
+workers and replays the fleet load from esp32_load_test.py at increasing
+concurrency (one simulated classroom per concurrent gateway):
+
+    wsgi   gunicorn config.wsgi:application (sync workers, sync device views)
+    asgi   gunicorn config.asgi:application -c config/gunicorn_asgi.py
+           (uvicorn workers, async device views)
+
+While the devices hammer the API, a probe keeps loading a lecturer-facing page
+so the report shows whether people queue behind the gateways.
+
+Usage:
+    python esp32_serving_benchmark.py --workers 2 --levels 8,32,128 --duration 20
+
+The server processes use the same database as `manage.py`. SQLite serializes
+writers, so run against PostgreSQL (DATABASE_URL, FORCE_SQLITE=false) for
+numbers that mean something. The workers share the API key through a
+file-based cache unless CACHE_BACKEND is already set. Gateways sign their
+requests with the credentials the fixtures issue, so DEVICE_AUTH_MODE=required
+works as well.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import requests
+
+from esp32_load_test import LatencyRecorder, run_load
+
+PROFILES = {
+    'wsgi': ['gunicorn', 'config.wsgi:application'],
+    'asgi': ['gunicorn', 'config.asgi:application', '-c', 'config/gunicorn_asgi.py'],
+}
+
+# Page a lecturer opens while a class is running
+PROBE_PATH = '/admin-panel/lecturer-login/'
+
+
+def server_env():
+    env = dict(os.environ)
+    if 'CACHE_BACKEND' not in env:
+        env['CACHE_BACKEND'] = 'django.core.cache.backends.filebased.FileBasedCache'
+        env['CACHE_LOCATION'] = os.path.join(tempfile.gettempdir(), 'esp32_benchmark_cache')
+    return env
+
+
+def prepare(args, env):
+    """Seed the load test fixtures; returns the API key the workers will accept and the device secrets"""
+    os.environ.update(env)
+    from esp32_load_test import setup_fixtures
+    secrets = setup_fixtures(argparse.Namespace(classrooms=max(args.levels), students=args.students))
+
+    from admin_ui.views.esp32_auth import get_or_create_api_key
+    return get_or_create_api_key(), secrets
+
+
+def reset_attendance():
+    """Drop the load test's attendance and station records so every level marks from scratch"""
+    from admin_ui.models import AttendanceRecord, ConnectedDevice
+    from esp32_load_test import LOAD_COURSE_CODE
+    AttendanceRecord.objects.filter(attendance_session__course__code=LOAD_COURSE_CODE).delete()
+    ConnectedDevice.objects.filter(network_session__course__code=LOAD_COURSE_CODE).delete()
+
+
+def start_server(profile, args, env):
+    command = PROFILES[profile] + ['--workers', str(args.workers), '--bind', f'127.0.0.1:{args.port}']
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'{profile} server exited with code {server.returncode}')
+        try:
+            requests.get(f'http://127.0.0.1:{args.port}{PROBE_PATH}', timeout=2)
+            return server
+        except requests.RequestException:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f'{profile} server did not start within 30s')
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def probe_pages(url, recorder, stop_at, interval=0.5):
+    """Load a lecturer page every `interval` seconds and record how long it takes"""
+    def get():
+        start = time.perf_counter()
+        try:
+            status = requests.get(url, timeout=30).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        recorder.record('lecturer page', time.perf_counter() - start, status)
+
+    while time.monotonic() < stop_at:
+        await asyncio.to_thread(get)
+        await asyncio.sleep(interval)
+
+
+async def run_level(args, token, secrets, level):
+    load_args = argparse.Namespace(
+        host=f'127.0.0.1:{args.port}', token=token, secrets=secrets, https=False, base_path='/admin-panel',
+        classrooms=level, students=args.students, duration=args.duration, ramp=args.ramp,
+        heartbeat_interval=args.heartbeat_interval, presence_interval=args.presence_interval,
+        concurrency=level
+    )
+    probe = LatencyRecorder()
+    stop_at = time.monotonic() + args.duration
+    report, _ = await asyncio.gather(
+        run_load(load_args),
+        probe_pages(f'http://127.0.0.1:{args.port}{PROBE_PATH}', probe, stop_at)
+    )
+    # The probe records a single endpoint, so its TOTAL row is the lecturer page
+    report['lecturer page'] = probe.report(args.duration)['TOTAL']
+    return report
+
+
+def print_comparison(results):
+    print(f"\n{'profile':<8} {'gateways':>8} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'page p95':>9}")
+    print("-" * 80)
+    for profile, levels in results.items():
+        for level, report in levels.items():
+            total, page = report['TOTAL'], report['lecturer page']
+            print(f"{profile:<8} {level:>8} {total['requests']:>7} {total['errors']:>6} {total['throughput_rps']:>8} "
+                  f"{total['p50_ms']:>8} {total['p95_ms']:>8} {total['p99_ms']:>8} {page['p95_ms']:>9}")
+    print("(latencies in ms; 'page p95' is the lecturer page loaded during the run)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI serving of the ESP32 API at equal worker count")
+    parser.add_argument("--profiles", default="wsgi,asgi", help="Comma-separated profiles to run (wsgi, asgi)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers for every profile")
+    parser.add_argument("--levels", default="8,32,128", help="Comma-separated numbers of concurrent gateways")
+    parser.add_argument("--students", type=int, default=20, help="Students per classroom")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--ramp", type=float, default=5, help="Seconds over which students arrive")
+    parser.add_argument("--heartbeat-interval", type=float, default=5, help="Seconds between heartbeats")
+    parser.add_argument("--presence-interval", type=float, default=10, help="Seconds between presence updates")
+    parser.add_argument("--port", type=int, default=8765, help="Port the servers listen on")
+    parser.add_argument("--json", help="Write all reports to this file")
+
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(',')]
+    profiles = [profile.strip() for profile in args.profiles.split(',')]
+    unknown = set(profiles) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(sorted(unknown))}")
+
+    env = server_env()
+    token, secrets = prepare(args, env)
+
+    print("🚀 ESP32 Serving Profile Benchmark")
+    print(f"⚙️ {args.workers} workers per profile, gateways: {', '.join(map(str, args.levels))}, "
+          f"{args.duration:.0f}s per level")
+    print("=" * 50)
+
+    results = {}
+    for profile in profiles:
+        server = start_server(profile, args, env)
+        try:
+            results[profile] = {}
+            for level in args.levels:
+                print(f"▶️ {profile}: {level} gateways")
+                reset_attendance()
+                results[profile][level] = asyncio.run(run_level(args, token, secrets, level))
+        finally:
+            stop_server(server)
+
+    print_comparison(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+
+    print("\n🏁 Benchmark completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,53 @@ to test the attendance API endpoints.
 Usage:
     python esp32_test_client.py --host your-domain.com --token your_device_token
 
+    # Sign every request with a device's own credential (manage.py issue_device_credential)
+    python esp32_test_client.py --host your-domain.com --token your_device_token \
+        --device-id ESP32_TEST_CLIENT --secret <device secret>
+
 Author: Okechi Onyema
 Date: 2024
 """
 
 import requests
+import hashlib
+import hmac
 import json
+import secrets
 import time
 import argparse
 import random
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+
+class DeviceSignatureAuth(requests.auth.AuthBase):
+    """Signs requests the way admin_ui/device_credentials.py verifies them"""
+
+    def __init__(self, device_id, secret):
+        self.device_id = device_id
+        self.secret = secret
+
+    def __call__(self, request):
+        url = urlsplit(request.url)
+        path = f"{url.path}?{url.query}" if url.query else url.path
+        timestamp = str(int(time.time()))
+        nonce = secrets.token_hex(8)
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        message = f"{request.method}\n{path}\n{timestamp}\n{nonce}\n{hashlib.sha256(body).hexdigest()}"
+        request.headers.update({
+            "X-Device-Id": self.device_id,
+            "X-Timestamp": timestamp,
+            "X-Nonce": nonce,
+            "X-Signature": hmac.new(self.secret.encode(), message.encode(), hashlib.sha256).hexdigest(),
+        })
+        return request
+
 
 class ESP32TestClient:
-    def __init__(self, host, token, use_https=True):
+    def __init__(self, host, token, use_https=True, device_id=None, secret=None):
         self.host = host
         self.token = token
         self.protocol = "https" if use_https else "http"
@@ -29,12 +63,16 @@ class ESP32TestClient:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        self.http = requests.Session()
+        if device_id and secret:
+            self.http.auth = DeviceSignatureAuth(device_id, secret)
         self.session_id = None
+        self.config_version = None
         
     def test_connection(self):
         """Test basic connection to Django backend"""
         try:
-            response = requests.get(f"{self.base_url}/", headers=self.headers, timeout=10)
+            response = self.http.get(f"{self.base_url}/", headers=self.headers, timeout=10)
             print(f"✅ Connection test: {response.status_code}")
             return True
         except Exception as e:
@@ -51,7 +89,7 @@ class ESP32TestClient:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/start-session/",
                 headers=self.headers,
                 json=data,
@@ -80,7 +118,7 @@ class ESP32TestClient:
         data = {"session_id": self.session_id}
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/end-session/",
                 headers=self.headers,
                 json=data,
@@ -109,7 +147,7 @@ class ESP32TestClient:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/device-connected/",
                 headers=self.headers,
                 json=data,
@@ -133,7 +171,7 @@ class ESP32TestClient:
         data = {"mac_address": mac_address}
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/device-disconnected/",
                 headers=self.headers,
                 json=data,
@@ -161,7 +199,7 @@ class ESP32TestClient:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/record-attendance/",
                 headers=self.headers,
                 json=data,
@@ -185,7 +223,7 @@ class ESP32TestClient:
         data = {"student_matric_no": student_matric_no}
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/verify-student/",
                 headers=self.headers,
                 json=data,
@@ -208,7 +246,7 @@ class ESP32TestClient:
     def get_session_status(self):
         """Get current session status"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/api/esp32/session-status/",
                 headers=self.headers,
                 timeout=10
@@ -237,11 +275,12 @@ class ESP32TestClient:
         """Send heartbeat to Django backend"""
         data = {
             "device_id": "ESP32_TEST_CLIENT",
-            "timestamp": int(time.time())
+            "timestamp": int(time.time()),
+            "config_version": self.config_version
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/api/esp32/heartbeat/",
                 headers=self.headers,
                 json=data,
@@ -250,7 +289,11 @@ class ESP32TestClient:
             
             if response.status_code == 200:
                 result = response.json()
-                print(f"💓 Heartbeat sent: {result.get('message')}")
+                if result.get('unchanged'):
+                    print(f"💓 Heartbeat sent: configuration v{self.config_version} unchanged")
+                else:
+                    self.config_version = result.get('config_version')
+                    print(f"💓 Heartbeat sent: {result.get('message')} (config v{self.config_version})")
                 return True
             else:
                 print(f"❌ Failed to send heartbeat: {response.status_code} - {response.text}")
@@ -315,11 +358,13 @@ def main():
     parser.add_argument("--https", action="store_true", default=True, help="Use HTTPS (default: True)")
     parser.add_argument("--test", choices=["connection", "session", "attendance", "full"], 
                        default="full", help="Type of test to run")
+    parser.add_argument("--device-id", help="Device the signing secret belongs to")
+    parser.add_argument("--secret", help="Device signing secret; signs every request when given")
     
     args = parser.parse_args()
     
     # Create test client
-    client = ESP32TestClient(args.host, args.token, args.https)
+    client = ESP32TestClient(args.host, args.token, args.https, args.device_id, args.secret)
     
     print(f"🚀 ESP32 Test Client")
     print(f"🌐 Backend: {args.host}")
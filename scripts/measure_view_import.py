@@ -0,0 +1,59 @@
+# scripts/measure_view_import.py
+#
+# Measures what a fresh worker pays to load the URLconf and serve its first
+# request: wall time and resident memory after django.setup(), after importing
+# the root URLconf, and after resolving one URL and loading its view.
+#
+#   python scripts/measure_view_import.py                       # default: ESP32 heartbeat API
+#   python scripts/measure_view_import.py /admin-panel/dashboard/
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux), falling back to peak RSS"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else '/admin-panel/api/esp32/heartbeat/'
+    steps = []
+
+    start = time.perf_counter()
+    import django
+    django.setup()
+    steps.append(('django.setup()', time.perf_counter() - start, rss_mb()))
+
+    start = time.perf_counter()
+    from django.conf import settings
+    from django.urls import get_resolver
+    __import__(settings.ROOT_URLCONF)
+    steps.append(('import URLconf', time.perf_counter() - start, rss_mb()))
+
+    start = time.perf_counter()
+    match = get_resolver().resolve(path)
+    # Lazily routed views load their module on first use; force that here
+    getattr(match.func, 'csrf_exempt', None)
+    steps.append((f'resolve {path}', time.perf_counter() - start, rss_mb()))
+
+    view_modules = sorted(name for name in sys.modules if name.startswith('admin_ui.views'))
+    for label, seconds, rss in steps:
+        print(f'{label:<55} {seconds * 1000:8.1f} ms   RSS {rss:6.1f} MB')
+    print(f'admin_ui view modules loaded: {", ".join(view_modules)}')
+
+
+if __name__ == '__main__':
+    main()
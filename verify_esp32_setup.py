@@ -156,7 +156,7 @@ def check_django_views():
     """Check if Django views are properly implemented"""
     print("\n👁️ Checking Django Views...")
     
-    views_file = 'admin_ui/views.py'
+    views_file = 'admin_ui/views/esp32_api.py'
     
     try:
         with open(views_file, 'r', encoding='utf-8', errors='ignore') as f: